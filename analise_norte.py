@@ -1,10 +1,18 @@
+import os
+import time
+import uuid
 from pathlib import Path
-from datetime import datetime, time
 
 import numpy as np
 import pandas as pd
 import streamlit as st
 
+import conversao_tempo
+import intervalos
+import regras
+import simulacao_norte
+import tarefas
+
 
 st.set_page_config(
     page_title="Análise de Estrutura Operacional",
@@ -14,28 +22,8 @@ st.set_page_config(
 
 PASTA_APP = Path(__file__).resolve().parent
 ARQUIVO = PASTA_APP / "ANALISE_NORTE.xlsx"
-
-
-def converter_hora(valor):
-    if pd.isna(valor):
-        return pd.NaT
-    if isinstance(valor, time):
-        return pd.Timedelta(
-            hours=valor.hour,
-            minutes=valor.minute,
-            seconds=valor.second,
-            microseconds=valor.microsecond,
-        )
-    if isinstance(valor, (datetime, pd.Timestamp)):
-        return pd.Timedelta(
-            hours=valor.hour,
-            minutes=valor.minute,
-            seconds=valor.second,
-            microseconds=valor.microsecond,
-        )
-    if isinstance(valor, (int, float)):
-        return pd.to_timedelta(valor, unit="D")
-    return pd.to_timedelta(str(valor).replace(",", "."), errors="coerce")
+PROCESSOS_SIMULACAO = os.cpu_count() or 1
+INTERVALO_ATUALIZACAO_S = 0.5
 
 
 def converter_preco(valor):
@@ -50,14 +38,27 @@ def converter_preco(valor):
 
 
 def minutos_fora_turno(inicio, fim, inicio_turno, fim_turno):
-    if pd.isna(inicio) or pd.isna(fim) or pd.isna(inicio_turno) or pd.isna(fim_turno):
-        return np.nan
-    duracao = max((fim - inicio).total_seconds() / 60, 0)
-    sobreposicao = max(
-        (min(fim, fim_turno) - max(inicio, inicio_turno)).total_seconds() / 60,
-        0,
+    # duração menos a sobreposição com [inicio_turno, fim_turno], separada
+    # em antes e depois do turno; NaN quando falta qualquer horário
+    inicio, fim, inicio_turno, fim_turno = (
+        pd.to_datetime(serie).to_numpy(dtype="datetime64[ns]")
+        for serie in (inicio, fim, inicio_turno, fim_turno)
     )
-    return max(duracao - sobreposicao, 0)
+    minuto = np.timedelta64(1, "m")
+    with np.errstate(invalid="ignore"):
+        duracao = np.maximum((fim - inicio) / minuto, 0)
+        sobreposicao = np.maximum(
+            (np.minimum(fim, fim_turno) - np.maximum(inicio, inicio_turno)) / minuto,
+            0,
+        )
+        total = np.maximum(duracao - sobreposicao, 0)
+        antes = np.maximum((np.minimum(fim, inicio_turno) - inicio) / minuto, 0)
+        depois = np.maximum((fim - np.maximum(inicio, fim_turno)) / minuto, 0)
+
+    faltante = np.isnat(inicio) | np.isnat(fim) | np.isnat(inicio_turno) | np.isnat(fim_turno)
+    for valores in (total, antes, depois):
+        valores[faltante] = np.nan
+    return total, antes, depois
 
 
 @st.cache_data(show_spinner=False)
@@ -90,8 +91,8 @@ def carregar_e_preparar(caminho):
     df["12h"] = pd.to_numeric(df["12h"], errors="coerce").fillna(0).astype(int)
     df["preco_a_cobrar"] = df["preco_a_cobrar"].apply(converter_preco).fillna(0.0)
 
-    df["inicio_td"] = df["inicio"].apply(converter_hora)
-    df["fim_td"] = df["fim"].apply(converter_hora)
+    df["inicio_td"] = conversao_tempo.para_timedelta(df["inicio"])
+    df["fim_td"] = conversao_tempo.para_timedelta(df["fim"])
 
     inicio_turno_td = df["inicio_turno"] - df["inicio_turno"].dt.normalize()
     turno_cruza_meia_noite = (
@@ -129,6 +130,7 @@ def carregar_e_preparar(caminho):
     if pd.isna(mediana_global):
         mediana_global = 30.0
 
+    df["duracao_valida_min"] = duracao_valida
     df["duracao_modelo_min"] = (
         duracao_valida
         .fillna(mediana_detalhada)
@@ -141,20 +143,16 @@ def carregar_e_preparar(caminho):
         df["equipe"].astype("string").str.slice(3, 6).str.upper()
     )
     df["fim_turno_proposto"] = df["fim_turno"] + pd.to_timedelta(
-        df["12h"].eq(1).astype(int) * 2, unit="h"
+        df["12h"].eq(1).astype(int) * simulacao_norte.EXTENSAO_TURNO_12H_MIN, unit="min"
     )
 
     df = df.sort_values(["equipe", "data_turno", "inicio_atividade", "os"])
     chaves = ["equipe", "data_turno"]
     df["ordem_execucao"] = df.groupby(chaves).cumcount() + 1
-    df["fim_anterior"] = df.groupby(chaves)["fim_atividade"].shift(1)
-    df["intervalo_entre_atividades_min"] = (
-        df["inicio_atividade"] - df["fim_anterior"]
-    ).dt.total_seconds().div(60)
-    df["sobreposicao"] = df["intervalo_entre_atividades_min"].lt(0)
-    df["intervalo_entre_atividades_min"] = df[
-        "intervalo_entre_atividades_min"
-    ].clip(lower=0)
+    _, por_atividade = intervalos.varrer_intervalos(
+        df, chaves, "inicio_atividade", "fim_atividade"
+    )
+    df[por_atividade.columns] = por_atividade
 
     df["primeira_atividade"] = df["ordem_execucao"].eq(1)
     df["tempo_primeiro_servico_min"] = np.where(
@@ -166,121 +164,103 @@ def carregar_e_preparar(caminho):
         "tempo_primeiro_servico_min"
     ].clip(lower=0)
 
-    df["hora_extra_atual_min"] = df.apply(
-        lambda r: minutos_fora_turno(
-            r["inicio_atividade"], r["fim_atividade"],
-            r["inicio_turno"], r["fim_turno"]
-        ),
-        axis=1,
-    ).fillna(0)
+    for sufixo, fim_turno in [("atual", "fim_turno"), ("proposta", "fim_turno_proposto")]:
+        total, antes, depois = minutos_fora_turno(
+            df["inicio_atividade"], df["fim_atividade"],
+            df["inicio_turno"], df[fim_turno],
+        )
+        df[f"hora_extra_{sufixo}_min"] = np.nan_to_num(total)
+        df[f"hora_extra_antes_turno_{sufixo}_min"] = np.nan_to_num(antes)
+        df[f"hora_extra_apos_turno_{sufixo}_min"] = np.nan_to_num(depois)
 
     return df
 
 
-def criar_base_equipe_dia(df):
-    base = (
-        df.groupby(
-            ["cidade_equipe", "data_turno", "equipe", "desmobilizar", "12h"],
-            as_index=False,
-        )
-        .agg(
-            atividades=("os", "count"),
-            carga_min=("duracao_modelo_min", "sum"),
-            receita=("preco_a_cobrar", "sum"),
-            hora_extra_min=("hora_extra_atual_min", "sum"),
-            primeiro_servico_min=("tempo_primeiro_servico_min", "max"),
-            intervalo_medio_min=("intervalo_entre_atividades_min", "mean"),
+@st.cache_data(show_spinner=False)
+def carregar_capacidades(caminho, intervalo_min, deslocamento_min):
+    # capacidade por equipe-dia da base inteira, completada pelo perfil
+    # da equipe; os filtros da página só fazem o merge
+    dados = carregar_e_preparar(caminho)
+    observadas = simulacao_norte.capacidade_observada(dados, intervalo_min, deslocamento_min)
+    perfil = simulacao_norte.perfil_capacidade(observadas)
+    return simulacao_norte.completar_capacidade(observadas, perfil), perfil
+
+
+@st.cache_resource
+def pool_simulacao():
+    # um pool por servidor, reaproveitado por todas as tarefas; só é usado
+    # pela busca local com trabalho suficiente (compensa_paralelo)
+    if PROCESSOS_SIMULACAO < 2:
+        return None
+    return simulacao_norte.criar_executor(PROCESSOS_SIMULACAO)
+
+
+def simular_redistribuicao(
+    df, modo="gulosa", orcamento_s=simulacao_norte.ORCAMENTO_BUSCA_S, capacidades=None,
+    progresso=None, cancelar=None,
+):
+    # sem cache do frame inteiro: a simulação reaproveita as partições
+    # (cidade, dia) já calculadas em filtros anteriores
+    base, redistribuicao, carga_proposta = simulacao_norte.simular_redistribuicao(
+        df, processos=PROCESSOS_SIMULACAO, modo=modo, orcamento_s=orcamento_s,
+        capacidades=capacidades, progresso=progresso, cancelar=cancelar,
+        executor=pool_simulacao(),
+    )
+    redistribuicao_gulosa = None
+    if modo != "gulosa":
+        _, redistribuicao_gulosa, _ = simulacao_norte.simular_redistribuicao(
+            df, capacidades=capacidades, cancelar=cancelar,
         )
+    return base, redistribuicao, carga_proposta, redistribuicao_gulosa
+
+
+def simular_absorcao(df, ensaios, capacidades=None, progresso=None, cancelar=None):
+    ensaios_absorcao = simulacao_norte.simular_monte_carlo(
+        df, ensaios=ensaios, capacidades=capacidades,
+        progresso=progresso, cancelar=cancelar,
+    )
+    # mesmas regras com a duração do modelo: tem de bater com a gulosa
+    absorcao_fixa = simulacao_norte.simular_monte_carlo(
+        df, capacidades=capacidades, sortear=False, cancelar=cancelar,
     )
-    base["capacidade_atual_min"] = 480.0
-    base["capacidade_proposta_min"] = np.where(base["12h"].eq(1), 720.0, 480.0)
-    base["utilizacao_atual"] = base["carga_min"] / base["capacidade_atual_min"]
-    base["tempo_sem_execucao_atual_min"] = (
-        base["capacidade_atual_min"] - base["carga_min"]
-    ).clip(lower=0)
-    return base
+    return ensaios_absorcao, absorcao_fixa
 
 
-@st.cache_data(show_spinner=False)
-def simular_redistribuicao(df):
-    base = criar_base_equipe_dia(df)
-    mantidas = base[base["desmobilizar"].eq(0)].copy()
-    removidas = df[df["desmobilizar"].eq(1)].copy()
-
-    cargas = {
-        (r.cidade_equipe, r.data_turno, r.equipe): float(r.carga_min)
-        for r in mantidas.itertuples()
-    }
-    capacidades = {
-        (r.cidade_equipe, r.data_turno, r.equipe): float(r.capacidade_proposta_min)
-        for r in mantidas.itertuples()
-    }
+@st.cache_resource
+def gerenciador_tarefas():
+    # compartilhado entre sessões; cada sessão cancela só as próprias tarefas
+    return tarefas.GerenciadorTarefas(trabalhadores=2)
 
-    resultados = []
-    removidas = removidas.sort_values(
-        ["data_turno", "cidade_equipe", "data_atribuicao", "inicio_atividade"]
-    )
 
-    for r in removidas.itertuples():
-        chaves = [
-            chave for chave in cargas
-            if chave[0] == r.cidade_equipe and chave[1] == r.data_turno
-        ]
-        duracao = float(r.duracao_modelo_min)
-        elegiveis = [
-            chave for chave in chaves
-            if cargas[chave] + duracao <= capacidades[chave]
-        ]
+def cancelar_tarefa(nome):
+    anterior = st.session_state.pop(nome, None)
+    if anterior is not None:
+        gerenciador_tarefas().cancelar(anterior["id"])
 
-        if elegiveis:
-            destino = min(
-                elegiveis,
-                key=lambda chave: (
-                    cargas[chave] / capacidades[chave],
-                    cargas[chave],
-                    chave[2],
-                ),
-            )
-            cargas[destino] += duracao
-            status = "Absorvida"
-            equipe_destino = destino[2]
-        else:
-            status = "Não absorvida"
-            equipe_destino = None
-
-        resultados.append({
-            "os": r.os,
-            "cidade_equipe": r.cidade_equipe,
-            "data_turno": r.data_turno,
-            "equipe_origem": r.equipe,
-            "equipe_destino": equipe_destino,
-            "duracao_min": duracao,
-            "receita": float(r.preco_a_cobrar),
-            "status": status,
-        })
-
-    redistribuicao = pd.DataFrame(resultados)
-    carga_final = pd.DataFrame([
-        {
-            "cidade_equipe": chave[0],
-            "data_turno": chave[1],
-            "equipe": chave[2],
-            "carga_proposta_min": carga,
-            "capacidade_proposta_min": capacidades[chave],
-        }
-        for chave, carga in cargas.items()
-    ])
-    if not carga_final.empty:
-        carga_final["utilizacao_proposta"] = (
-            carga_final["carga_proposta_min"] /
-            carga_final["capacidade_proposta_min"]
-        )
-        carga_final["tempo_sem_execucao_proposto_min"] = (
-            carga_final["capacidade_proposta_min"] -
-            carga_final["carga_proposta_min"]
-        ).clip(lower=0)
 
-    return base, redistribuicao, carga_final
+def acompanhar_tarefa(sessao, nome, assinatura, funcao, *args):
+    # uma tarefa por seção da página: assinatura nova cancela a anterior
+    # e submete outra; devolve a tarefa e a situação atual
+    gerenciador = gerenciador_tarefas()
+    anterior = st.session_state.get(nome)
+    if anterior is not None and anterior["assinatura"] != assinatura:
+        cancelar_tarefa(nome)
+        anterior = None
+    tarefa = gerenciador.obter(anterior["id"]) if anterior else None
+    situacao = tarefa.situacao() if tarefa is not None else None
+
+    if situacao is not None and situacao["estado"] == "erro":
+        # na próxima interação a tarefa é submetida de novo
+        st.session_state.pop(nome)
+        st.error("A simulação falhou.")
+        st.exception(tarefa.erro)
+        st.stop()
+
+    if tarefa is None or situacao["estado"] == "cancelada":
+        tarefa = gerenciador.submeter((sessao, nome), funcao, *args)
+        st.session_state[nome] = {"id": tarefa.id, "assinatura": assinatura}
+        situacao = tarefa.situacao()
+    return tarefa, situacao
 
 
 def moeda(valor):
@@ -291,12 +271,12 @@ def percentual(valor):
     return f"{valor:.1%}" if pd.notna(valor) else "–"
 
 
-def classificar_risco(utilizacao, nao_absorvida):
-    if nao_absorvida > 0 or utilizacao > 0.95:
-        return "Alto"
-    if utilizacao > 0.85:
-        return "Moderado"
-    return "Baixo"
+def ler_equipes(texto):
+    return {
+        equipe.strip()
+        for equipe in str(texto or "").replace(";", ",").replace("\n", ",").split(",")
+        if equipe.strip()
+    }
 
 
 st.title("Análise de Estrutura Operacional")
@@ -307,7 +287,7 @@ if not ARQUIVO.exists():
     st.stop()
 
 try:
-    with st.spinner("Processando a operação e simulando a redistribuição..."):
+    with st.spinner("Processando a operação..."):
         dados = carregar_e_preparar(ARQUIVO)
 except Exception as erro:
     st.error("Não foi possível carregar ou preparar o arquivo.")
@@ -325,6 +305,40 @@ with st.sidebar:
     data_inicial = st.date_input("Data inicial", datas_validas.min().date())
     data_final = st.date_input("Data final", datas_validas.max().date())
 
+    st.header("Redistribuição")
+    modo_redistribuicao = st.selectbox(
+        "Modo",
+        list(simulacao_norte.MODOS_REDISTRIBUICAO),
+        format_func=simulacao_norte.MODOS_REDISTRIBUICAO.get,
+    )
+    orcamento_busca_ms = st.number_input(
+        "Tempo de busca local por cidade-dia (ms)",
+        min_value=0,
+        max_value=1000,
+        value=int(simulacao_norte.ORCAMENTO_BUSCA_S * 1000),
+        step=10,
+        disabled=modo_redistribuicao == "gulosa",
+    )
+
+    st.header("Capacidade")
+    capacidade_por_turno = st.toggle("Usar turno observado de cada equipe", value=True)
+    intervalo_refeicao_min = st.number_input(
+        "Intervalo de refeição (min)",
+        min_value=0,
+        max_value=180,
+        value=int(simulacao_norte.INTERVALO_REFEICAO_MIN),
+        step=5,
+        disabled=not capacidade_por_turno,
+    )
+    deslocamento_atividade_min = st.number_input(
+        "Deslocamento por atividade (min)",
+        min_value=0,
+        max_value=120,
+        value=int(simulacao_norte.DESLOCAMENTO_POR_ATIVIDADE_MIN),
+        step=5,
+        disabled=not capacidade_por_turno,
+    )
+
 if data_inicial > data_final:
     st.error("A data inicial não pode ser posterior à data final.")
     st.stop()
@@ -339,9 +353,67 @@ if df.empty:
     st.warning("Não existem dados para os filtros selecionados.")
     st.stop()
 
-base, redistribuicao, carga_proposta = simular_redistribuicao(df)
+capacidades, perfil_capacidade = (
+    carregar_capacidades(ARQUIVO, intervalo_refeicao_min, deslocamento_atividade_min)
+    if capacidade_por_turno else (None, None)
+)
+
+# simulação em segundo plano: um filtro novo cancela a tarefa anterior
+# da sessão e a página acompanha o progresso por cidade
+assinatura = (
+    tuple(sorted(cidades_selecionadas)), data_inicial, data_final,
+    modo_redistribuicao, orcamento_busca_ms,
+    capacidade_por_turno, intervalo_refeicao_min, deslocamento_atividade_min,
+)
+sessao = st.session_state.setdefault("sessao_norte", uuid.uuid4().hex)
+anterior = st.session_state.get("tarefa_norte")
+if anterior is not None and anterior["assinatura"] != assinatura:
+    # cenários e Monte Carlo dependem dos mesmos filtros
+    cancelar_tarefa("tarefa_cenarios")
+    cancelar_tarefa("tarefa_monte_carlo")
+tarefa, situacao = acompanhar_tarefa(
+    sessao, "tarefa_norte", assinatura, simular_redistribuicao,
+    df, modo_redistribuicao, orcamento_busca_ms / 1000, capacidades,
+)
+# seções abaixo com tarefa ainda em execução pedem um novo rerun no fim
+pendentes = False
+
+if situacao["estado"] != "concluída":
+    feitas, total = situacao["feitas"], situacao["total"]
+    st.progress(
+        feitas / total if total else 0.0,
+        text=f"Simulando a redistribuição: {feitas:,} de {total:,} cidades-dia".replace(",", ".")
+        if total else "Simulando a redistribuição...",
+    )
+    if situacao["parciais"]:
+        st.caption("Resultados parciais por cidade (partições já simuladas)")
+        parciais = pd.DataFrame(situacao["parciais"])
+        parciais["taxa_absorcao"] = (
+            parciais["os_absorvidas"] / parciais["os_removidas"].where(parciais["os_removidas"] > 0)
+        )
+        st.dataframe(
+            parciais.rename(columns={
+                "cidade_equipe": "Cidade",
+                "os_removidas": "OS a redistribuir",
+                "os_absorvidas": "OS absorvidas",
+                "os_nao_absorvidas": "OS não absorvidas",
+                "receita_em_risco": "Receita em risco",
+                "taxa_absorcao": "Taxa de absorção",
+            }).style.format({
+                "Taxa de absorção": "{:.1%}",
+                "Receita em risco": lambda v: moeda(v),
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
+    time.sleep(INTERVALO_ATUALIZACAO_S)
+    st.rerun()
+
+base, redistribuicao, carga_proposta, redistribuicao_gulosa = tarefa.resultado
 
-cap_atual = base["capacidade_atual_min"].sum()
+# equipes-dia consolidadas: linhas que diferem só nas flags são uma equipe-dia
+equipes_dia_atual = simulacao_norte.consolidar_equipe_dia(base)
+cap_atual = equipes_dia_atual["capacidade_atual_min"].sum()
 carga_atual = base["carga_min"].sum()
 util_atual = carga_atual / cap_atual if cap_atual else np.nan
 he_atual = base["hora_extra_min"].sum()
@@ -376,13 +448,19 @@ comparacao = pd.DataFrame({
         "Carga executada/absorvida (h)",
         "Utilização",
         "Tempo sem execução estimado (h)",
+        "Sobreposição entre atividades (h)",
+        "Hora extra antes do turno (h)",
+        "Hora extra após o turno (h)",
     ],
     "Estrutura atual": [
-        len(base),
+        len(equipes_dia_atual),
         cap_atual / 60,
         carga_atual / 60,
         util_atual,
-        base["tempo_sem_execucao_atual_min"].sum() / 60,
+        (equipes_dia_atual["capacidade_atual_min"] - equipes_dia_atual["carga_min"]).clip(lower=0).sum() / 60,
+        base["sobreposicao_min"].sum() / 60,
+        base["hora_extra_antes_min"].sum() / 60,
+        base["hora_extra_apos_min"].sum() / 60,
     ],
     "Estrutura proposta": [
         len(carga_proposta),
@@ -390,6 +468,9 @@ comparacao = pd.DataFrame({
         carga_prop / 60,
         util_prop,
         carga_proposta["tempo_sem_execucao_proposto_min"].sum() / 60 if not carga_proposta.empty else 0,
+        base.loc[base["desmobilizar"].eq(0), "sobreposicao_min"].sum() / 60,
+        base.loc[base["desmobilizar"].eq(0), "hora_extra_antes_proposta_min"].sum() / 60,
+        base.loc[base["desmobilizar"].eq(0), "hora_extra_apos_proposta_min"].sum() / 60,
     ],
 })
 
@@ -402,15 +483,39 @@ st.dataframe(
     use_container_width=True,
 )
 
+if perfil_capacidade is not None:
+    with st.expander("Perfil de capacidade por equipe"):
+        st.dataframe(
+            perfil_capacidade[perfil_capacidade["equipe"].isin(df["equipe"])].rename(columns={
+                "equipe": "Equipe",
+                "capacidade_atual_min": "Capacidade típica (min)",
+                "capacidade_12h_min": "Capacidade em 12h (min)",
+            }).style.format({
+                "Capacidade típica (min)": "{:,.0f}",
+                "Capacidade em 12h (min)": "{:,.0f}",
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
+
 st.subheader("Impacto por cidade")
 atual_cidade = base.groupby("cidade_equipe", as_index=False).agg(
-    capacidade_atual_min=("capacidade_atual_min", "sum"),
     carga_atual_min=("carga_min", "sum"),
     hora_extra_atual_min=("hora_extra_min", "sum"),
     primeiro_servico_medio_min=("primeiro_servico_min", "mean"),
     intervalo_medio_min=("intervalo_medio_min", "mean"),
+    ociosidade_turno_media_min=("ociosidade_turno_min", "mean"),
+    sobreposicao_min=("sobreposicao_min", "sum"),
+    concorrencia_max=("concorrencia_max", "max"),
     receita_atual=("receita", "sum"),
 )
+# capacidade uma vez por equipe-dia, mesmo com linhas repetidas por flag
+atual_cidade = atual_cidade.merge(
+    equipes_dia_atual
+    .groupby("cidade_equipe", as_index=False)["capacidade_atual_min"].sum(),
+    on="cidade_equipe",
+    how="left",
+)
 atual_cidade["utilizacao_atual"] = (
     atual_cidade["carga_atual_min"] / atual_cidade["capacidade_atual_min"]
 )
@@ -430,7 +535,7 @@ else:
         "utilizacao_proposta"
     ])
 
-1if not redistribuicao.empty:
+if not redistribuicao.empty:
     red_cidade = redistribuicao.groupby("cidade_equipe", as_index=False).agg(
         os_redistribuidas=("status", lambda s: s.eq("Absorvida").sum()),
         os_nao_absorvidas=("status", lambda s: s.eq("Não absorvida").sum()),
@@ -449,15 +554,17 @@ impacto = (
     .merge(red_cidade, on="cidade_equipe", how="left")
     .fillna(0)
 )
-impacto["risco"] = impacto.apply(
-    lambda r: classificar_risco(r["utilizacao_proposta"], r["os_nao_absorvidas"]),
-    axis=1,
+impacto["risco"] = regras.aplicar_regras(
+    impacto["utilizacao_proposta"],
+    regras.RISCO_UTILIZACAO,
+    prioridades=[(impacto["os_nao_absorvidas"].gt(0), "Alto")],
 )
 
 exibicao = impacto[[
     "cidade_equipe", "utilizacao_atual", "utilizacao_proposta",
     "os_redistribuidas", "os_nao_absorvidas", "hora_extra_atual_min",
-    "primeiro_servico_medio_min", "intervalo_medio_min", "receita_em_risco", "risco"
+    "primeiro_servico_medio_min", "intervalo_medio_min", "ociosidade_turno_media_min",
+    "sobreposicao_min", "concorrencia_max", "receita_em_risco", "risco"
 ]].rename(columns={
     "cidade_equipe": "Cidade",
     "utilizacao_atual": "Utilização atual",
@@ -467,6 +574,9 @@ exibicao = impacto[[
     "hora_extra_atual_min": "HE atual (min)",
     "primeiro_servico_medio_min": "Primeiro serviço (min)",
     "intervalo_medio_min": "Intervalo médio (min)",
+    "ociosidade_turno_media_min": "Ociosidade no turno (min)",
+    "sobreposicao_min": "Sobreposição (min)",
+    "concorrencia_max": "Atividades simultâneas (máx.)",
     "receita_em_risco": "Receita em risco",
     "risco": "Risco",
 })
@@ -480,6 +590,9 @@ st.dataframe(
         "HE atual (min)": "{:,.0f}",
         "Primeiro serviço (min)": "{:,.1f}",
         "Intervalo médio (min)": "{:,.1f}",
+        "Ociosidade no turno (min)": "{:,.1f}",
+        "Sobreposição (min)": "{:,.0f}",
+        "Atividades simultâneas (máx.)": "{:,.0f}",
         "Receita em risco": lambda v: moeda(v),
     }),
     hide_index=True,
@@ -502,9 +615,209 @@ g1.metric("Taxa de absorção", percentual(taxa_absorcao))
 g2.metric("Carga não absorvida", f"{min_nao_absorvidos / 60:,.1f} h".replace(",", "X").replace(".", ",").replace("X", "."))
 g3.metric("Receita em risco", moeda(receita_nao_absorvida))
 
+if redistribuicao_gulosa is not None:
+    resumos_modos = pd.DataFrame([
+        {"Modo": simulacao_norte.MODOS_REDISTRIBUICAO[modo], **simulacao_norte.resumir_redistribuicao(resultado)}
+        for modo, resultado in [
+            ("gulosa", redistribuicao_gulosa),
+            (modo_redistribuicao, redistribuicao),
+        ]
+    ])
+    st.dataframe(
+        resumos_modos[[
+            "Modo", "taxa_absorcao", "os_nao_absorvidas",
+            "horas_extras_necessarias", "receita_em_risco",
+        ]].rename(columns={
+            "taxa_absorcao": "Taxa de absorção",
+            "os_nao_absorvidas": "OS não absorvidas",
+            "horas_extras_necessarias": "HE necessária (h)",
+            "receita_em_risco": "Receita em risco",
+        }).style.format({
+            "Taxa de absorção": "{:.1%}",
+            "OS não absorvidas": "{:,.0f}",
+            "HE necessária (h)": "{:,.1f}",
+            "Receita em risco": lambda v: moeda(v),
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+st.subheader("Comparação de cenários")
+st.caption(
+    "Cada linha é um plano alternativo aplicado à mesma base filtrada. "
+    "Informe as equipes separadas por vírgula. Capacidade em branco usa a "
+    "capacidade de cada equipe-dia (turno observado ou valor fixo, conforme a barra lateral)."
+)
+
+
+planilha = simulacao_norte.cenario_planilha(df)
+cenarios_editados = st.data_editor(
+    pd.DataFrame({
+        "Cenário": ["Planilha", "Sem desmobilização"],
+        "Desmobilizar": [", ".join(sorted(planilha["desmobilizar"])), ""],
+        "Turno 12h": [", ".join(sorted(planilha["12h"]))] * 2,
+        "Capacidade (min)": pd.Series([np.nan] * 2, dtype=float),
+        "Capacidade 12h (min)": pd.Series([np.nan] * 2, dtype=float),
+    }),
+    num_rows="dynamic",
+    hide_index=True,
+    use_container_width=True,
+    key="cenarios_norte",
+)
+
+cenarios = [
+    {
+        "nome": str(linha["Cenário"] or f"Cenário {i + 1}"),
+        "desmobilizar": ler_equipes(linha["Desmobilizar"]),
+        "12h": ler_equipes(linha["Turno 12h"]),
+        "capacidade_min": None if pd.isna(linha["Capacidade (min)"]) else float(linha["Capacidade (min)"]),
+        "capacidade_12h_min": None if pd.isna(linha["Capacidade 12h (min)"]) else float(linha["Capacidade 12h (min)"]),
+    }
+    for i, linha in cenarios_editados.fillna({"Cenário": ""}).reset_index(drop=True).iterrows()
+]
+
+assinatura_cenarios = assinatura + tuple(
+    (
+        cenario["nome"], tuple(sorted(cenario["desmobilizar"])), tuple(sorted(cenario["12h"])),
+        cenario["capacidade_min"], cenario["capacidade_12h_min"],
+    )
+    for cenario in cenarios
+)
+
+if not cenarios:
+    cancelar_tarefa("tarefa_cenarios")
+else:
+    tarefa_cenarios, situacao_cenarios = acompanhar_tarefa(
+        sessao, "tarefa_cenarios", assinatura_cenarios, simulacao_norte.simular_cenarios,
+        df, cenarios, capacidades,
+    )
+
+if cenarios and situacao_cenarios["estado"] != "concluída":
+    pendentes = True
+    st.progress(
+        situacao_cenarios["feitas"] / situacao_cenarios["total"] if situacao_cenarios["total"] else 0.0,
+        text="Avaliando os cenários...",
+    )
+elif cenarios:
+    comparacao_cenarios = tarefa_cenarios.resultado
+    st.dataframe(
+        comparacao_cenarios.rename(columns={
+            "cenario": "Cenário",
+            "equipes_desmobilizadas": "Equipes desmobilizadas",
+            "equipes_12h": "Equipes 12h",
+            "equipes_dia": "Equipes-dia",
+            "capacidade_h": "Capacidade (h)",
+            "utilizacao_proposta": "Utilização",
+            "os_removidas": "OS a redistribuir",
+            "os_nao_absorvidas": "OS não absorvidas",
+            "taxa_absorcao": "Taxa de absorção",
+            "horas_nao_absorvidas": "Carga não absorvida (h)",
+            "receita_em_risco": "Receita em risco",
+        }).style.format({
+            "Capacidade (h)": "{:,.1f}",
+            "Utilização": "{:.1%}",
+            "Taxa de absorção": "{:.1%}",
+            "Carga não absorvida (h)": "{:,.1f}",
+            "Receita em risco": lambda v: moeda(v),
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+st.subheader("Incerteza da absorção (Monte Carlo)")
+mc1, mc2 = st.columns(2)
+ensaios_mc = mc1.number_input("Ensaios", min_value=100, max_value=20000, value=1000, step=100)
+confianca_mc = mc2.select_slider("Confiança", options=[0.8, 0.9, 0.95, 0.99], value=0.95, format_func=lambda v: f"{v:.0%}")
+
+executar_mc = st.toggle("Executar simulação Monte Carlo", value=False)
+if not executar_mc:
+    cancelar_tarefa("tarefa_monte_carlo")
+else:
+    tarefa_mc, situacao_mc = acompanhar_tarefa(
+        sessao, "tarefa_monte_carlo", assinatura + (int(ensaios_mc),), simular_absorcao,
+        df, int(ensaios_mc), capacidades,
+    )
+
+if executar_mc and situacao_mc["estado"] != "concluída":
+    pendentes = True
+    feitos, total = situacao_mc["feitas"], situacao_mc["total"]
+    st.progress(
+        feitos / total if total else 0.0,
+        text=f"Sorteando durações: {feitos:,} de {total:,} ensaios".replace(",", ".")
+        if total else "Sorteando durações...",
+    )
+elif executar_mc:
+    ensaios_absorcao, absorcao_fixa = tarefa_mc.resultado
+    resumo_mc = simulacao_norte.resumir_monte_carlo(ensaios_absorcao, confianca_mc)
+    resumo_gulosa = simulacao_norte.resumir_redistribuicao(
+        redistribuicao if redistribuicao_gulosa is None else redistribuicao_gulosa
+    )
+
+    t1, t2, t3 = st.columns(3)
+    t1.metric("Taxa de absorção (gulosa)", percentual(resumo_gulosa["taxa_absorcao"]))
+    t2.metric(
+        "Taxa de absorção (Monte Carlo, duração do modelo)",
+        percentual(absorcao_fixa["taxa_absorcao"].iloc[0]) if len(absorcao_fixa) else "—",
+    )
+    t3.metric(
+        "Taxa de absorção (Monte Carlo, mediana)",
+        percentual(resumo_mc.loc["taxa_absorcao", "mediana"]),
+        help=(
+            f"IC {confianca_mc:.0%}: {percentual(resumo_mc.loc['taxa_absorcao', 'limite_inferior'])} a "
+            f"{percentual(resumo_mc.loc['taxa_absorcao', 'limite_superior'])}"
+        ),
+    )
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric(
+        "OS absorvidas (mediana)",
+        f"{resumo_mc.loc['os_absorvidas', 'mediana']:,.0f}".replace(",", "."),
+        help=(
+            f"IC {confianca_mc:.0%}: {resumo_mc.loc['os_absorvidas', 'limite_inferior']:,.0f} a "
+            f"{resumo_mc.loc['os_absorvidas', 'limite_superior']:,.0f}"
+        ).replace(",", "."),
+    )
+    m2.metric(
+        "Carga não absorvida (mediana)",
+        f"{resumo_mc.loc['horas_nao_absorvidas', 'mediana']:,.1f} h".replace(",", "X").replace(".", ",").replace("X", "."),
+    )
+    m3.metric("Receita em risco (mediana)", moeda(resumo_mc.loc["receita_em_risco", "mediana"]))
+
+    st.dataframe(
+        resumo_mc.rename(
+            index={
+                "os_absorvidas": "OS absorvidas",
+                "os_nao_absorvidas": "OS não absorvidas",
+                "horas_nao_absorvidas": "Carga não absorvida (h)",
+                "receita_em_risco": "Receita em risco",
+                "taxa_absorcao": "Taxa de absorção",
+            },
+            columns={
+                "limite_inferior": "Limite inferior",
+                "mediana": "Mediana",
+                "limite_superior": "Limite superior",
+                "media": "Média",
+            },
+        ).style.format("{:,.2f}"),
+        use_container_width=True,
+    )
+    st.caption(
+        "Durações sorteadas da distribuição observada por cidade, grupo e tipo de OS. "
+        "Em cada ensaio as OS removidas seguem a regra da gulosa, equipe a equipe; com a "
+        "duração do modelo o resultado é o da gulosa."
+    )
+
 st.caption(
-    "Premissas: equipes da mesma cidade são intercambiáveis; turnos regulares possuem "
-    "8 horas produtivas e turnos marcados como 12h possuem 12 horas produtivas. "
+    "Premissas: equipes da mesma cidade são intercambiáveis. Com o turno observado, a "
+    "capacidade de cada equipe-dia é a duração do turno (mais 2 horas para turnos 12h) "
+    "menos o intervalo de refeição e o deslocamento informado por atividade; sem turno "
+    "válido usa-se a mediana da equipe e, na falta dela, 8 horas (12 horas para 12h). "
     "Deslocamento não é estimado por falta de coordenadas. Equipes-dia sem qualquer "
-    "atividade não aparecem na fonte e, portanto, não entram na capacidade observada."
+    "atividade não aparecem na fonte e, portanto, não entram na capacidade observada. "
+    "A carga de cada equipe-dia é a união dos intervalos modelados: atividades "
+    "sobrepostas não são contadas duas vezes."
 )
+
+if pendentes:
+    time.sleep(INTERVALO_ATUALIZACAO_S)
+    st.rerun()
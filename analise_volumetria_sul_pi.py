@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 
+import distribuicao_minutos
+import regras
+import volumetria
+
 st.set_page_config(page_title="Análise de Volumetria", layout="wide")
 
 ARQUIVO = "ANALISE_VOLUMETRIA_SUL_PI.xlsx"
@@ -83,24 +87,15 @@ def carregar_dados():
 
 @st.cache_data
 def carregar_histograma():
-    df = pd.read_excel(ARQUIVO_HISTOGRAMA)
-
-    df.columns = (
-        df.columns
-        .str.lower()
-        .str.strip()
-        .str.replace(" ", "_", regex=False)
-    )
+    return volumetria.ler_histograma(ARQUIVO_HISTOGRAMA)
 
-    for col in ["mes", "regional_id", "atribuicoes"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    return df
+@st.cache_data
+def carregar_equipes_mensais():
+    return volumetria.equipes_mensais(carregar_dados())
 
 df = carregar_dados()
 
-df_hist = carregar_histograma()
+df_hist, minutos_hist = carregar_histograma()
 
 colunas_numericas = [
     "vol_mensal",
@@ -405,16 +400,14 @@ df_mensal_plot["indicador"] = df_mensal_plot["indicador"].map({
     "demanda_mensal": "Demanda mensal"
 })
 
-df_mensal_plot["cor"] = df_mensal_plot.apply(
-    lambda row:
-        "Chuvoso"
-        if row["indicador"] == "Volumetria mensal"
-        and row["periodo_climatico"] == "Período Chuvoso"
-        else "Seco"
-        if row["indicador"] == "Volumetria mensal"
-        and row["periodo_climatico"] == "Período Seco"
-        else "Demanda",
-    axis=1
+eh_volumetria = df_mensal_plot["indicador"].eq("Volumetria mensal")
+
+df_mensal_plot["cor"] = regras.selecionar(
+    [
+        (eh_volumetria & df_mensal_plot["periodo_climatico"].eq("Período Chuvoso"), "Chuvoso"),
+        (eh_volumetria & df_mensal_plot["periodo_climatico"].eq("Período Seco"), "Seco"),
+    ],
+    padrao="Demanda"
 )
 
 graf_mensal = (
@@ -602,8 +595,8 @@ df_cidade = df_cidade[
     (df_cidade["demanda"] > 0)
 ]
 
-df_cidade["limite_80"] = df_cidade["volumetria"] * 0.8
-df_cidade["limite_120"] = df_cidade["volumetria"] * 1.2
+df_cidade["limite_80"] = df_cidade["volumetria"] * regras.FAIXA_CONTRATUAL_MIN
+df_cidade["limite_120"] = df_cidade["volumetria"] * regras.FAIXA_CONTRATUAL_MAX
 
 df_cidade["aderencia"] = (
     df_cidade["demanda"] /
@@ -617,32 +610,16 @@ df_cidade["gap"] = (
     df_cidade["volumetria"]
 )
 
-df_cidade["diagnostico"] = df_cidade.apply(
-    lambda row:
-        "Demanda insuficiente"
-        if row["demanda"] < row["limite_80"]
-        else "Dentro da faixa contratual"
-        if row["demanda"] <= row["limite_120"]
-        else "Demanda acima da volumetria",
-    axis=1
+df_cidade["diagnostico"] = regras.aplicar_regras(
+    df_cidade["demanda"],
+    regras.DIAGNOSTICO_DEMANDA,
+    referencia=df_cidade["volumetria"]
 )
 
-
-
-def classificar_situacao(x):
-    if pd.isna(x):
-        return "⚪ Sem volumetria"
-
-    if x > 1.2:
-        return "🔴 Alta demanda"
-
-    if x >= 0.8:
-        return "🟢 Demanda adequada"
-
-    return "🟡 Baixa demanda"
-
-
-df_cidade["situacao"] = df_cidade["aderencia"].apply(classificar_situacao)
+df_cidade["situacao"] = regras.aplicar_regras(
+    df_cidade["aderencia"],
+    regras.SITUACAO_ADERENCIA
+)
 
 df_cidade = df_cidade[
     df_cidade["situacao"].isin(situacoes_sel)
@@ -728,6 +705,23 @@ with st.sidebar:
         value=90
     )
 
+    meses_equipes = sorted(int(m) for m in df["mes"].dropna().unique())
+
+    mes_equipes = st.selectbox(
+        "Mês de referência das equipes",
+        options=meses_equipes,
+        index=meses_equipes.index(4) if 4 in meses_equipes else len(meses_equipes) - 1,
+        format_func=lambda x: MESES.get(int(x), str(x))
+    )
+
+    janela_equipes = st.slider(
+        "Média móvel de equipes (meses)",
+        min_value=1,
+        max_value=12,
+        value=1,
+        help="1 = quantidade de equipes apenas no mês de referência."
+    )
+
 limite_ups = meta_ups * (faixa_aceitacao / 100)
 
 df_ups_base = df_filtrado[
@@ -738,10 +732,10 @@ df_ups_base["dias_uteis"] = df_ups_base["mes"].map(DIAS_UTEIS_MES)
 
 qtd_meses_periodo = max(df_ups_base["mes"].nunique(), 1)
 
-df_equipes_atual = (
-    df_filtrado[df_filtrado["mes"] == 4]
-    .groupby(["regional_nome", "cidade"], as_index=False)
-    .agg(qtd_equipe_atual=("qtd_equipe", "mean"))
+df_equipes_atual = volumetria.equipes_referencia(
+    carregar_equipes_mensais(),
+    mes_equipes,
+    janela_equipes
 )
 
 df_ups_cidade = (
@@ -793,35 +787,24 @@ df_ups_cidade["pct_meta"] = pd.to_numeric(
 
 
 
-def classificar_nota_ups(x):
-    if pd.isna(x):
-        return "Sem dados"
-    if x >= 0.90:
-        return "A"
-    if x >= 0.80:
-        return "B"
-    if x >= 0.70:
-        return "C"
-    return "D"
-
-def classificar_situacao_ups(x):
-    if pd.isna(x):
-        return "⚪ Sem dados"
-    if x >= limite_ups:
-        return "🟢 Saudável"
-    return "🔴 Abaixo do aceitável"
-
-df_ups_cidade["nota_ups"] = df_ups_cidade["pct_meta"].apply(classificar_nota_ups)
+df_ups_cidade["nota_ups"] = regras.aplicar_faixas(
+    df_ups_cidade["pct_meta"],
+    regras.NOTA_UPS
+)
 df_ups_cidade["pct_meta"] = (
     df_ups_cidade["pct_meta"] * 100
 ).round(2)
-df_ups_cidade["situacao_ups"] = df_ups_cidade["ups_equipe_dia"].apply(classificar_situacao_ups)
+df_ups_cidade["situacao_ups"] = regras.aplicar_regras(
+    df_ups_cidade["ups_equipe_dia"],
+    regras.situacao_ups(limite_ups)
+)
 
 df_ups_cidade = df_ups_cidade.sort_values("saldo_equipes", ascending=False)
 
-nota_geral = classificar_nota_ups(
-    df_ups_cidade["ups_equipe_dia"].mean() / meta_ups
-)
+nota_geral = regras.aplicar_faixas(
+    df_ups_cidade["ups_equipe_dia"].mean() / meta_ups,
+    regras.NOTA_UPS
+)[0]
 
 col_ups1, col_ups2, col_ups3, col_ups4 = st.columns(4)
 
@@ -963,28 +946,61 @@ df_hist_filtrado = df_hist_filtrado[
     df_hist_filtrado["tipo_os"].isin(tipos_os_sel)
 ].copy()
 
-df_hist_resumo = (
-    df_hist_filtrado
-    .groupby("faixa_tempo_restante", as_index=False)
-    .agg(
-        atribuicoes=("atribuicoes", "sum")
+if minutos_hist is None:
+    df_hist_resumo = (
+        df_hist_filtrado
+        .groupby("faixa_tempo_restante", as_index=False)
+        .agg(
+            atribuicoes=("atribuicoes", "sum")
+        )
     )
-)
 
-total_atribuicoes = df_hist_resumo["atribuicoes"].sum()
-
-atribuicoes_pos_turno = df_hist_resumo.loc[
-    df_hist_resumo["faixa_tempo_restante"] == "Após fim do turno",
-    "atribuicoes"
-].sum()
-
-criticas = df_hist_resumo[
-    df_hist_resumo["faixa_tempo_restante"].isin([
+    ordem_faixas = [
+        ">4h",
+        "3h-4h",
+        "2h-3h",
+        "1h-2h",
         "30m-1h",
         "<30m",
         "Após fim do turno"
-    ])
-]["atribuicoes"].sum()
+    ]
+
+    atribuicoes_pos_turno = df_hist_resumo.loc[
+        df_hist_resumo["faixa_tempo_restante"] == "Após fim do turno",
+        "atribuicoes"
+    ].sum()
+
+    criticas = df_hist_resumo[
+        df_hist_resumo["faixa_tempo_restante"].isin([
+            "30m-1h",
+            "<30m",
+            "Após fim do turno"
+        ])
+    ]["atribuicoes"].sum()
+
+    p50_restante, p90_restante = None, None
+else:
+    faixas_txt = st.text_input(
+        "Limites das faixas (minutos)",
+        value=volumetria.FAIXAS_HISTOGRAMA_PADRAO,
+        help="Valores separados por vírgula. Começando em 0, a primeira faixa agrupa as atribuições após o fim do turno."
+    )
+
+    limites_faixas = (
+        distribuicao_minutos.ler_limites(faixas_txt)
+        or distribuicao_minutos.ler_limites(volumetria.FAIXAS_HISTOGRAMA_PADRAO)
+    )
+
+    vetores_sel = [minutos_hist[i] for i in df_hist_filtrado["posicao"]]
+
+    df_hist_resumo, ordem_faixas, indicadores = volumetria.resumir_histograma(
+        vetores_sel,
+        limites_faixas
+    )
+
+    atribuicoes_pos_turno, criticas, p50_restante, p90_restante = indicadores
+
+total_atribuicoes = df_hist_resumo["atribuicoes"].sum()
 
 pct_criticas = criticas / total_atribuicoes if total_atribuicoes else 0
 
@@ -1003,18 +1019,18 @@ colh4.metric(
     f"{atribuicoes_pos_turno:,.0f}".replace(",", ".")
 )
 
-ordem_faixas = [
-    ">4h",
-    "3h-4h",
-    "2h-3h",
-    "1h-2h",
-    "30m-1h",
-    "<30m",
-    "Após fim do turno"
-]
+if minutos_hist is not None:
+    colh5, colh6, _, _ = st.columns(4)
 
+    colh5.metric(
+        "P50 até o fim do turno",
+        "–" if pd.isna(p50_restante) else f"{p50_restante:,.0f} min".replace(",", ".")
+    )
+    colh6.metric(
+        "P90 até o fim do turno",
+        "–" if pd.isna(p90_restante) else f"{p90_restante:,.0f} min".replace(",", ".")
+    )
 
-    
 bars = (
     alt.Chart(df_hist_resumo)
     .mark_bar()
@@ -0,0 +1,78 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_LINHAS = 2_000_000
+N_CIDADES = 40
+DIAS = 365
+JANELA = 28
+LIMITE_Z = 3.0
+
+
+def z_por_laco(diario, cidade):
+    # referência: cada dia contra os anteriores, um a um
+    serie = diario.loc[cidade, "fila_media_min"]
+    z = {}
+    for data in serie.index:
+        anteriores = serie[(serie.index < data) & (serie.index >= data - pd.Timedelta(days=JANELA))]
+        if len(anteriores) < 7 or anteriores.std() == 0:
+            continue
+        z[data] = (serie[data] - anteriores.mean()) / anteriores.std()
+    return pd.Series(z, dtype=float)
+
+
+def main():
+    rng = np.random.default_rng(19)
+    atribuicao = pd.Timestamp("2025-01-01") + pd.to_timedelta(
+        rng.integers(0, DIAS * 1440, N_LINHAS), unit="min"
+    )
+    df = pd.DataFrame({
+        "CIDADE": rng.choice([f"C{i:03d}" for i in range(N_CIDADES)], N_LINHAS),
+        "ATRIBUICAO_TS": atribuicao,
+        "fila_min": rng.lognormal(np.log(90), 0.9, N_LINHAS).round(),
+    })
+    df["data"] = df["ATRIBUICAO_TS"].dt.normalize()
+    df["hora_dia"] = df["ATRIBUICAO_TS"].dt.hour
+    df["INICIO_TS"] = df["ATRIBUICAO_TS"] + pd.to_timedelta(df["fila_min"], unit="min")
+    df["hora_ini_dia"] = df["INICIO_TS"].dt.hour
+
+    # dias com acúmulo de fila injetado
+    acumulo = df["CIDADE"].eq("C003") & df["data"].isin(pd.to_datetime(["2025-05-10", "2025-09-02"]))
+    df.loc[acumulo, "fila_min"] *= 3
+
+    inicio = time.perf_counter()
+    cubo = filas.cubo_semana_hora(df)
+    t_cubo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    anomalias = filas.anomalias_diarias(df, JANELA, LIMITE_Z)
+    t_anomalias = time.perf_counter() - inicio
+
+    diario = df.groupby(["CIDADE", "data"]).agg(fila_media_min=("fila_min", "mean"))
+    inicio = time.perf_counter()
+    esperado = z_por_laco(diario, "C003")
+    t_laco = time.perf_counter() - inicio
+
+    obtido = anomalias[anomalias["CIDADE"] == "C003"].set_index("data")["z_fila_media_min"]
+    assert np.allclose(esperado, obtido.loc[esperado.index])
+    sinalizados = set(anomalias.loc[anomalias["anomalia"] & (anomalias["CIDADE"] == "C003"), "data"])
+    assert {pd.Timestamp("2025-05-10"), pd.Timestamp("2025-09-02")} <= sinalizados
+
+    print(
+        f"{N_LINHAS:,} linhas, {N_CIDADES} cidades x {DIAS} dias | cubo: {t_cubo:.2f} s | "
+        f"anomalias (todas as cidades): {t_anomalias * 1000:.0f} ms | "
+        f"laço por dia: {t_laco * 1000:.0f} ms por cidade (~{t_laco * N_CIDADES:.1f} s no total) | "
+        f"{int(anomalias['anomalia'].sum())} dias sinalizados"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_LINHAS = 3_000_000
+DIAS = 365
+N_AMOSTRAS = 200
+
+
+def backlog_por_varredura(df, instante):
+    # fluxo anterior: uma máscara sobre o frame inteiro a cada instante
+    coi = (df["CRIACAO_TS"] <= instante) & (df["ATRIBUICAO_TS"] > instante)
+    campo = (df["ATRIBUICAO_TS"] <= instante) & (df["INICIO_TS"] > instante)
+    return coi.sum(), campo.sum()
+
+
+def main():
+    rng = np.random.default_rng(23)
+    criacao = pd.Series(
+        pd.Timestamp("2025-01-01")
+        + pd.to_timedelta(rng.integers(0, DIAS * 1440, N_LINHAS), unit="min")
+    )
+    atribuicao = criacao + pd.to_timedelta(rng.exponential(180, N_LINHAS).round(), unit="min")
+    df = pd.DataFrame({
+        "CIDADE": "C000",
+        "CRIACAO_TS": criacao,
+        "ATRIBUICAO_TS": atribuicao,
+        "INICIO_TS": atribuicao + pd.to_timedelta(rng.exponential(90, N_LINHAS).round(), unit="min"),
+    })
+
+    inicio = time.perf_counter()
+    eventos = filas.eventos_backlog(df)["C000"]
+    t_eventos = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    serie = filas.serie_backlog(eventos, "2025-01-01", "2025-12-31 23:45", "15min")
+    t_serie = time.perf_counter() - inicio
+
+    amostra = serie.sample(N_AMOSTRAS, random_state=0)
+    inicio = time.perf_counter()
+    esperado = [backlog_por_varredura(df, instante) for instante in amostra.index]
+    t_varredura = (time.perf_counter() - inicio) / N_AMOSTRAS
+
+    assert (amostra.to_numpy() == np.array(esperado)).all()
+
+    print(
+        f"{N_LINHAS:,} OS | eventos: {t_eventos:.2f} s | "
+        f"{len(serie):,} instantes em {t_serie * 1000:.0f} ms | "
+        f"varredura: {t_varredura * 1000:.0f} ms por instante "
+        f"(~{t_varredura * len(serie):.0f} s para a série)"
+    )
+
+
+if __name__ == "__main__":
+    main()
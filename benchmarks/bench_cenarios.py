@@ -0,0 +1,48 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulacao_norte
+from dados_sinteticos import gerar_operacao
+
+
+N_CENARIOS = 300
+
+
+def main():
+    rng = np.random.default_rng(3)
+    df = gerar_operacao()
+    equipes = df["equipe"].unique()
+
+    cenarios = [simulacao_norte.cenario_planilha(df)] + [
+        {
+            "nome": f"Cenário {i}",
+            "desmobilizar": set(rng.choice(equipes, rng.integers(1, 15), replace=False)),
+            "12h": set(rng.choice(equipes, rng.integers(0, 15), replace=False)),
+            "capacidade_min": 480.0,
+            "capacidade_12h_min": float(rng.choice([600, 660, 720])),
+        }
+        for i in range(N_CENARIOS - 1)
+    ]
+
+    inicio = time.perf_counter()
+    comparacao = simulacao_norte.simular_cenarios(df, cenarios)
+    duracao = time.perf_counter() - inicio
+
+    # o cenário da planilha precisa bater com a simulação da página
+    _, redistribuicao, _ = simulacao_norte.simular_redistribuicao(df)
+    nao_absorvidas = redistribuicao["status"].eq("Não absorvida").sum()
+    assert comparacao.loc[0, "os_nao_absorvidas"] == nao_absorvidas
+
+    print(
+        f"{len(df):,} atividades | {N_CENARIOS} cenários em {duracao:.2f} s "
+        f"({N_CENARIOS / duracao * 60:,.0f} cenários/min)"
+    )
+
+
+if __name__ == "__main__":
+    main()
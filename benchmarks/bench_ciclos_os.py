@@ -0,0 +1,85 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ciclos_os
+
+
+N_LINHAS = 3_000_000
+N_AMOSTRAS = 50
+
+
+def ciclos_por_varredura(df, instante):
+    # referência: máscaras sobre todas as linhas a cada instante
+    aberta = df["DATA_ABERTURA_OS"] <= instante
+    atribuida = df["DATA_ATRIBUICAO_OS"] <= instante
+    vencida = df["DATA_LIMITE_OS"] <= instante
+    sem = aberta & ~atribuida
+    a_vencer = atribuida & ~vencida & df["DATA_LIMITE_OS"].notna()
+    idade = (instante - df.loc[sem, "DATA_ABERTURA_OS"]).dt.total_seconds().mean() / 86400
+    return sem.sum(), (sem & vencida).sum(), a_vencer.sum(), idade
+
+
+def main():
+    rng = np.random.default_rng(41)
+    abertura = pd.Series(
+        pd.Timestamp("2024-01-01")
+        + pd.to_timedelta(rng.integers(0, 2 * 365 * 86400, N_LINHAS), unit="s")
+    )
+    atribuicao = abertura + pd.to_timedelta(rng.exponential(2 * 86400, N_LINHAS).round(), unit="s")
+    limite = abertura + pd.to_timedelta(rng.integers(0, 4 * 86400, N_LINHAS), unit="s")
+    atribuicao[rng.random(N_LINHAS) < 0.02] = pd.NaT
+    limite[rng.random(N_LINHAS) < 0.01] = pd.NaT
+    df = pd.DataFrame({
+        "DATA_ABERTURA_OS": abertura,
+        "DATA_ATRIBUICAO_OS": atribuicao,
+        "DATA_LIMITE_OS": limite,
+        "base": rng.integers(0, 40, N_LINHAS).astype(str),
+    })
+
+    inicio = time.perf_counter()
+    indice = ciclos_os.indice_ciclos(df, ["base"])
+    t_indice = time.perf_counter() - inicio
+
+    # trocar o filtro recorta o índice, sem reler nem reordenar
+    bases = [str(b) for b in range(0, 40, 3)]
+    inicio = time.perf_counter()
+    filtrado = ciclos_os.filtrar_ciclos(indice, {"base": bases})
+    t_filtro = time.perf_counter() - inicio
+    reconstruido = ciclos_os.indice_ciclos(df[df["base"].isin(bases)])
+    pd.testing.assert_frame_equal(
+        ciclos_os.serie_ciclos(filtrado, "1D"), ciclos_os.serie_ciclos(reconstruido, "1D")
+    )
+
+    inicio = time.perf_counter()
+    serie = ciclos_os.serie_ciclos(indice, "1h")
+    t_serie = time.perf_counter() - inicio
+
+    amostra = serie.sample(N_AMOSTRAS, random_state=0)
+    inicio = time.perf_counter()
+    for instante, linha in amostra.iterrows():
+        sem, vencidas, a_vencer, idade = ciclos_por_varredura(df, instante)
+        assert linha["sem_atribuicao"] == sem
+        assert linha["vencidas_sem_atribuicao"] == vencidas
+        assert linha["atribuidas_a_vencer"] == a_vencer
+        assert np.isclose(linha["idade_media_dias_sem_atribuicao"], idade)
+    t_varredura = (time.perf_counter() - inicio) / N_AMOSTRAS
+
+    inicio = time.perf_counter()
+    ciclos_os.ciclos_em(indice, [pd.Timestamp("2025-06-15 10:00")])
+    t_consulta = time.perf_counter() - inicio
+
+    print(
+        f"{N_LINHAS:,} OS | índice: {t_indice:.2f} s | filtro: {t_filtro * 1000:.0f} ms | "
+        f"{len(serie):,} instantes (1h) em {t_serie * 1000:.0f} ms | "
+        f"1 instante: {t_consulta * 1e6:.0f} µs vs varredura {t_varredura * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
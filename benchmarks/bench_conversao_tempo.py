@@ -0,0 +1,128 @@
+import sys
+import time as relogio
+from datetime import datetime, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import conversao_tempo
+
+
+N_CELULAS = 1_000_000
+
+
+# cópias das conversões por linha que existiam nas páginas
+def converter_hora(valor):
+    if pd.isna(valor):
+        return pd.NaT
+    if isinstance(valor, time):
+        return pd.Timedelta(
+            hours=valor.hour,
+            minutes=valor.minute,
+            seconds=valor.second,
+            microseconds=valor.microsecond,
+        )
+    if isinstance(valor, (datetime, pd.Timestamp)):
+        return pd.Timedelta(
+            hours=valor.hour,
+            minutes=valor.minute,
+            seconds=valor.second,
+            microseconds=valor.microsecond,
+        )
+    if isinstance(valor, (int, float)):
+        return pd.to_timedelta(valor, unit="D")
+    return pd.to_timedelta(str(valor).replace(",", "."), errors="coerce")
+
+
+def time_to_hours(val):
+    if pd.isna(val):
+        return 0.0
+    h, m, *s = str(val).split(":")
+    s = s[0] if s else 0
+    return int(h) + int(m) / 60 + int(s) / 3600
+
+
+def cronometrar(funcao):
+    inicio = relogio.perf_counter()
+    resultado = funcao()
+    return resultado, (relogio.perf_counter() - inicio) * 1000
+
+
+def gerar_segundos(rng):
+    segundos = rng.integers(0, 86_400, N_CELULAS)
+    ausentes = rng.random(N_CELULAS) < 0.03
+    return segundos, ausentes
+
+
+def main():
+    rng = np.random.default_rng(42)
+    segundos, ausentes = gerar_segundos(rng)
+    h, resto = np.divmod(segundos, 3600)
+    m, s = np.divmod(resto, 60)
+
+    horarios = pd.Series(
+        [None if a else time(int(a_h), int(a_m), int(a_s))
+         for a, a_h, a_m, a_s in zip(ausentes, h, m, s)],
+        dtype=object,
+    )
+    textos = pd.Series(
+        [None if a else f"{a_h:02d}:{a_m:02d}:{a_s:02d}"
+         for a, a_h, a_m, a_s in zip(ausentes, h, m, s)],
+        dtype=object,
+    )
+    fracoes = pd.Series(np.where(ausentes, np.nan, segundos / 86_400))
+    datas = pd.Series(
+        pd.Timestamp("2024-01-01") + pd.to_timedelta(segundos, unit="s")
+    ).mask(ausentes)
+
+    casos = [
+        (
+            "time",
+            lambda: horarios.apply(converter_hora),
+            lambda: conversao_tempo.para_timedelta(horarios),
+        ),
+        (
+            "datetime",
+            lambda: datas.apply(converter_hora),
+            lambda: conversao_tempo.para_timedelta(datas),
+        ),
+        (
+            "fração",
+            lambda: fracoes.apply(converter_hora),
+            lambda: conversao_tempo.para_timedelta(fracoes),
+        ),
+        (
+            "texto",
+            lambda: pd.to_timedelta(textos.astype(str), errors="coerce"),
+            lambda: conversao_tempo.para_timedelta(textos),
+        ),
+        (
+            "horas",
+            lambda: textos.apply(time_to_hours),
+            lambda: conversao_tempo.para_horas(textos),
+        ),
+    ]
+
+    print(f"{N_CELULAS:,} células")
+    for nome, por_linha, vetorizado in casos:
+        esperado, t_linha = cronometrar(por_linha)
+        obtido, t_vetor = cronometrar(vetorizado)
+        if nome == "horas":
+            assert np.allclose(esperado.to_numpy(), obtido.to_numpy()), nome
+        else:
+            esperado = pd.to_timedelta(esperado).astype(conversao_tempo.TIPO_TIMEDELTA)
+            # fração de dia: arredondamento de ponto flutuante em nanossegundos
+            diferenca = (esperado - obtido).abs().max()
+            assert esperado.isna().equals(obtido.isna()), nome
+            assert diferenca <= pd.Timedelta(microseconds=1), nome
+        print(
+            f"{nome:<9} por linha: {t_linha:8.1f} ms | "
+            f"conversao_tempo: {t_vetor:7.1f} ms | {t_linha / t_vetor:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
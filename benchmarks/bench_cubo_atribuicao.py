@@ -0,0 +1,113 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cubo_atribuicao
+import regras
+
+
+N_LINHAS = 2_000_000
+N_BASES = 120
+
+
+def gerar(rng):
+    atribuicao = pd.Series(
+        pd.Timestamp("2025-01-01")
+        + pd.to_timedelta(rng.integers(0, 365 * 1440, N_LINHAS), unit="min")
+    )
+    abertura = atribuicao - pd.to_timedelta(rng.exponential(3 * 1440, N_LINHAS).round(), unit="min")
+    limite = atribuicao + pd.to_timedelta(rng.integers(0, 2 * 1440, N_LINHAS), unit="min")
+    atribuicao[rng.random(N_LINHAS) < 0.03] = pd.NaT
+    # hierarquia como na origem: a base define regional e estado, o grupo define os tipos
+    base = rng.integers(0, N_BASES, N_LINHAS)
+    grupo = rng.integers(0, 3, N_LINHAS)
+    df = pd.DataFrame({
+        "estado": np.array(["MA", "PI", "PA"])[base % 3],
+        "regional": np.array([f"R{i:02d}" for i in range(12)])[base % 12],
+        "base": np.array([f"B{i:03d}" for i in range(N_BASES)])[base],
+        "sigla": np.array([f"S{i:03d}" for i in range(2 * N_BASES)])[2 * base + rng.integers(0, 2, N_LINHAS)],
+        "grupo_os": np.array(["CORTE", "RELIGA", "INSPECAO"], dtype=object)[grupo],
+        "tipo_os": np.array([f"T{i:02d}" for i in range(15)])[5 * grupo + rng.integers(0, 5, N_LINHAS)],
+    })
+    df.loc[rng.random(N_LINHAS) < 0.01, "grupo_os"] = None
+    df["dias_abertura_atribuicao"] = (atribuicao - abertura).dt.total_seconds() / 86400
+    df["horas_ate_prazo"] = (limite - atribuicao).dt.total_seconds() / 3600
+    df["nivel_risco"] = regras.risco_prazo(atribuicao, limite, df["horas_ate_prazo"])
+    return df
+
+
+def visoes_por_frame(df):
+    # fluxo anterior: três groupby sobre as linhas filtradas a cada rerun
+    bins = df[df["dias_abertura_atribuicao"].notna()].copy()
+    bins["bin_dias_atribuicao"] = pd.cut(
+        bins["dias_abertura_atribuicao"], bins=cubo_atribuicao.BINS_DIAS, labels=cubo_atribuicao.ROTULOS_DIAS
+    )
+    hist = bins.groupby("bin_dias_atribuicao", dropna=True, observed=True).size()
+    risco = df[df["nivel_risco"] != "SEM ATRIBUIÇÃO"].groupby("nivel_risco").size()
+    tabela = (
+        df.groupby(cubo_atribuicao.CHAVES_TABELA, dropna=True)
+        .agg(
+            os_qtd=("nivel_risco", "count"),
+            media_dias_atribuicao=("dias_abertura_atribuicao", "mean"),
+            media_horas_ate_prazo=("horas_ate_prazo", "mean"),
+        )
+        .reset_index()
+    )
+    return hist, risco, tabela
+
+
+def visoes_por_cubo(cubo):
+    hist = cubo_atribuicao.distribuicao(cubo, "bin_dias_atribuicao")
+    risco = cubo_atribuicao.distribuicao(cubo, "nivel_risco", excluir=["SEM ATRIBUIÇÃO"])
+    tabela = cubo_atribuicao.agregar(cubo, cubo_atribuicao.CHAVES_TABELA)
+    cubo_atribuicao.kpis(cubo)
+    return hist, risco, tabela
+
+
+def main():
+    rng = np.random.default_rng(37)
+    df = gerar(rng)
+
+    # cubo das partições escolhidas, montado uma vez; os filtros de
+    # base/sigla/grupo/tipo mudam a cada rerun
+    inicio = time.perf_counter()
+    cubo = cubo_atribuicao.construir_cubo(df)
+    t_cubo = time.perf_counter() - inicio
+
+    bases = sorted(df["base"].unique())
+    filtros = {
+        "base": bases[: len(bases) // 2],
+        "sigla": sorted(df["sigla"].unique()),
+        "grupo_os": ["CORTE", "RELIGA"],
+        "tipo_os": [f"T{i:02d}" for i in range(0, 15, 2)],
+    }
+
+    inicio = time.perf_counter()
+    linhas = df
+    for coluna, valores in filtros.items():
+        linhas = linhas[linhas[coluna].isin(valores)]
+    hist, risco, tabela = visoes_por_frame(linhas)
+    t_frame = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    hist_c, risco_c, tabela_c = visoes_por_cubo(cubo_atribuicao.filtrar(cubo, filtros))
+    t_rollup = time.perf_counter() - inicio
+
+    assert (hist.to_numpy() == hist_c["qtd"].to_numpy()).all()
+    assert (risco.to_numpy() == risco_c["qtd"].to_numpy()).all()
+    colunas = list(tabela.columns)
+    pd.testing.assert_frame_equal(tabela, tabela_c[colunas], check_dtype=False)
+
+    print(
+        f"{N_LINHAS:,} OS -> cubo de {len(cubo):,} células em {t_cubo:.2f} s | "
+        f"filtro + visões por linhas ({len(linhas):,} OS): {t_frame * 1000:.0f} ms | "
+        f"pelo cubo: {t_rollup * 1000:.0f} ms | {t_frame / t_rollup:.0f}x"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulacao_norte
+from dados_sinteticos import gerar_operacao
+
+
+def main():
+    # operação carregada: partições apertadas, onde o empacotamento importa
+    df = gerar_operacao(cidades=20, atividades_por_dia=8)
+    print(f"{len(df):,} atividades")
+
+    linhas = []
+    for modo, orcamento_s in [("gulosa", 0), ("ffd", 0), ("bfd", 0), ("ffd", 0.05), ("bfd", 0.05)]:
+        simulacao_norte._memoria_particoes.clear()
+        inicio = time.perf_counter()
+        _, redistribuicao, _ = simulacao_norte.simular_redistribuicao(
+            df, modo=modo, orcamento_s=orcamento_s
+        )
+        duracao = time.perf_counter() - inicio
+
+        resumo = simulacao_norte.resumir_redistribuicao(redistribuicao)
+        linhas.append({
+            "modo": modo if modo == "gulosa" else f"{modo} + busca {orcamento_s * 1000:.0f} ms",
+            "taxa_absorcao": f"{resumo['taxa_absorcao']:.2%}",
+            "os_nao_absorvidas": resumo["os_nao_absorvidas"],
+            "he_necessaria_h": round(resumo["horas_extras_necessarias"], 1),
+            "receita_em_risco": round(resumo["receita_em_risco"], 2),
+            "tempo_s": round(duracao, 2),
+        })
+
+    print(pd.DataFrame(linhas).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
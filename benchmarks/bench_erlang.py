@@ -0,0 +1,65 @@
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_CIDADES = 500
+MAX_EQUIPES = 60
+ALVO_ESPERA_MIN = 30
+
+
+def equipes_por_laco(lambda_h, mu_h):
+    # referência: Erlang C escalar, equipe a equipe
+    carga = lambda_h / mu_h
+    for c in range(1, MAX_EQUIPES + 1):
+        if c <= carga:
+            continue
+        b = 1.0
+        for k in range(1, c + 1):
+            b = carga * b / (k + carga * b)
+        prob = c * b / (c - carga * (1 - b))
+        if prob / (c * mu_h - lambda_h) * 60 <= ALVO_ESPERA_MIN:
+            return c
+    return math.nan
+
+
+def main():
+    rng = np.random.default_rng(3)
+    taxas = pd.DataFrame({
+        "CIDADE": np.repeat([f"C{i:03d}" for i in range(N_CIDADES)], 24),
+        "hora_dia": np.tile(np.arange(24), N_CIDADES),
+        "lambda_h": rng.gamma(2.0, 3.0, N_CIDADES * 24),
+        "servico_medio_min": rng.uniform(30, 120, N_CIDADES * 24),
+    })
+    taxas["mu_h"] = 60 / taxas["servico_medio_min"]
+    taxas["carga_erlang"] = taxas["lambda_h"] / taxas["mu_h"]
+
+    inicio = time.perf_counter()
+    esperado = np.array([
+        equipes_por_laco(l, m) for l, m in zip(taxas["lambda_h"], taxas["mu_h"])
+    ])
+    t_laco = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    resultado = filas.dimensionar(taxas, ALVO_ESPERA_MIN, MAX_EQUIPES)
+    t_vetor = time.perf_counter() - inicio
+
+    obtido = resultado["equipes_necessarias"].to_numpy()
+    assert np.array_equal(esperado, obtido, equal_nan=True)
+    print(
+        f"{len(taxas):,} cidades-hora x {MAX_EQUIPES} equipes | "
+        f"laço: {t_laco:6.2f} s | vetorizado: {t_vetor * 1000:6.1f} ms | "
+        f"{t_laco / t_vetor:5.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
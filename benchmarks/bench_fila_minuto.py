@@ -0,0 +1,53 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_LINHAS = 3_000_000
+DIAS = 365
+
+
+def contar_por_busca(entrada, saida, minutos):
+    # referência independente: em espera = já atribuídas - já iniciadas
+    entrada = np.sort(entrada.to_numpy(dtype="datetime64[m]"))
+    saida = np.sort(saida.to_numpy(dtype="datetime64[m]"))
+    return (
+        np.searchsorted(entrada, minutos, side="right")
+        - np.searchsorted(saida, minutos, side="right")
+    )
+
+
+def main():
+    rng = np.random.default_rng(5)
+    entrada = pd.Series(
+        pd.Timestamp("2025-01-01")
+        + pd.to_timedelta(rng.integers(0, DIAS * 1440, N_LINHAS), unit="min")
+    )
+    saida = entrada + pd.to_timedelta(rng.exponential(90, N_LINHAS).round(), unit="min")
+
+    inicio = time.perf_counter()
+    fila = filas.fila_por_minuto(entrada, saida)
+    kpis = filas.kpis_fila_diaria(fila)
+    decorrido = time.perf_counter() - inicio
+
+    amostra = fila.sample(20_000, random_state=0)
+    esperado = contar_por_busca(
+        entrada, saida, amostra.index.to_numpy(dtype="datetime64[m]")
+    )
+    assert (amostra.to_numpy() == esperado).all()
+
+    print(
+        f"{N_LINHAS:,} OS -> {len(fila):,} minutos e {len(kpis)} dias em {decorrido:.2f} s | "
+        f"pico {fila.max()} | p95 diário médio {kpis['fila_p95'].mean():.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
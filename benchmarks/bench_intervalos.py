@@ -0,0 +1,73 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import intervalos
+from dados_sinteticos import gerar_operacao
+
+
+CHAVES = ["equipe", "data_turno"]
+
+
+def varrer_por_grupo(df):
+    # referência: um laço Python por equipe-dia
+    linhas = []
+    for chave, grupo in df.groupby(CHAVES, sort=True):
+        pares = sorted(zip(grupo["inicio_atividade"], grupo["fim_atividade"]))
+        cobertura = pd.Timedelta(0)
+        fim_atual = None
+        eventos = []
+        for inicio, fim in pares:
+            if fim_atual is None or inicio > fim_atual:
+                cobertura += fim - inicio
+                fim_atual = fim
+            elif fim > fim_atual:
+                cobertura += fim - fim_atual
+                fim_atual = fim
+            eventos += [(inicio, 1), (fim, -1)]
+        abertas = maximo = 0
+        for _, delta in sorted(eventos, key=lambda e: (e[0], e[1])):
+            abertas += delta
+            maximo = max(maximo, abertas)
+        linhas.append((*chave, cobertura.total_seconds() / 60, maximo))
+    return pd.DataFrame(linhas, columns=CHAVES + ["cobertura_min", "concorrencia_max"])
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    df = gerar_operacao(cidades=20, dias=120, equipes_por_cidade=8)
+    print(f"{len(df):,} atividades")
+
+    esperado, t_laco = cronometrar(lambda: varrer_por_grupo(df))
+    (resumo, _), t_varredura = cronometrar(
+        lambda: intervalos.varrer_intervalos(
+            df, CHAVES, "inicio_atividade", "fim_atividade",
+            "inicio_turno", "fim_turno",
+        )
+    )
+
+    assert np.allclose(esperado["cobertura_min"], resumo["cobertura_min"])
+    assert (esperado["concorrencia_max"].to_numpy() == resumo["concorrencia_max"].to_numpy()).all()
+    print(
+        f"laço por grupo: {t_laco:6.2f} s | varredura: {t_varredura:6.3f} s | "
+        f"{t_laco / t_varredura:5.1f}x"
+    )
+    print(
+        f"sobreposição total: {resumo['sobreposicao_min'].sum() / 60:,.1f} h | "
+        f"equipes-dia com atividades simultâneas: "
+        f"{resumo['concorrencia_max'].gt(1).mean():.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
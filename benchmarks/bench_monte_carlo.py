@@ -0,0 +1,24 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulacao_norte
+from dados_sinteticos import gerar_operacao
+
+
+def main():
+    for cidades in [10, 30]:
+        df = gerar_operacao(cidades=cidades)
+        inicio = time.perf_counter()
+        ensaios = simulacao_norte.simular_monte_carlo(df, ensaios=1000)
+        duracao = time.perf_counter() - inicio
+
+        resumo = simulacao_norte.resumir_monte_carlo(ensaios)
+        print(f"{len(df):,} atividades | 1.000 ensaios em {duracao:.2f} s")
+        print(resumo.round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
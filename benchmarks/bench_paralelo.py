@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulacao_norte
+from dados_sinteticos import gerar_operacao
+
+
+PROCESSOS = [2, 4, 8]
+MODOS = ["gulosa", "bfd"]
+ORCAMENTO = simulacao_norte.ORCAMENTO_BUSCA_S
+
+
+def cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def simular_frio(df, **kwargs):
+    # memória de partições vazia: toda partição é simulada de novo
+    simulacao_norte._memoria_particoes.clear()
+    return simulacao_norte.simular_redistribuicao(df, **kwargs)
+
+
+def medir(df, modo, nucleos):
+    _, t_serial = cronometrar(simular_frio, df, modo=modo)
+    # com todas as partições em memória sobra só a parte serial
+    # (base equipe-dia, montagem das partições, hashes e saída)
+    _, t_fixo = cronometrar(simulacao_norte.simular_redistribuicao, df, modo=modo)
+    t_particoes = t_serial - t_fixo
+    print(
+        f"{modo:<6} serial        : {t_serial:6.2f} s "
+        f"(partições {t_particoes:.2f} s | parte serial {t_fixo:.2f} s, "
+        f"{t_fixo / t_serial:.0%})"
+    )
+
+    n_particoes = len(
+        df.loc[df["desmobilizar"].eq(1), simulacao_norte.CHAVES_PARTICAO].drop_duplicates()
+    )
+    pagina = simulacao_norte.compensa_paralelo(modo, ORCAMENTO, n_particoes)
+    print(f"{modo:<6} na página     : {'pool' if pagina else 'serial'}")
+    if modo == "gulosa":
+        # a gulosa nunca vai para o pool
+        return
+
+    # o limite de trabalho é zerado só aqui, para medir o pool mesmo assim
+    limite = simulacao_norte.TRABALHO_MINIMO_PARALELO_S
+    simulacao_norte.TRABALHO_MINIMO_PARALELO_S = 0.0
+    for processos in sorted(set(PROCESSOS) | {nucleos}):
+        if processos < 2:
+            continue
+        # pool criado e aquecido fora da medição, como na página
+        with simulacao_norte.criar_executor(processos) as executor:
+            simular_frio(df.head(1000), processos=processos, modo=modo, executor=executor)
+            _, t_paralelo = cronometrar(
+                simular_frio, df, processos=processos, modo=modo, executor=executor
+            )
+
+        # limite de Amdahl: parte serial + partições divididas por igual,
+        # sem custo de serialização; só é atingível com núcleos livres
+        projecao = t_serial / (t_fixo + t_particoes / processos)
+        medido = (
+            f"{t_serial / t_paralelo:4.2f}x medido"
+            if processos <= nucleos else "sem núcleos para medir"
+        )
+        print(
+            f"{modo:<6} {processos:>2} processos  : {t_paralelo:6.2f} s "
+            f"({medido} | projeção Amdahl {projecao:4.2f}x)"
+        )
+    simulacao_norte.TRABALHO_MINIMO_PARALELO_S = limite
+
+
+def main():
+    nucleos = os.cpu_count() or 1
+    df = gerar_operacao(cidades=100)
+    print(f"{len(df):,} atividades | {nucleos} núcleo(s)")
+    for modo in MODOS:
+        medir(df, modo, nucleos)
+
+if __name__ == "__main__":
+    main()
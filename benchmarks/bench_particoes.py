@@ -0,0 +1,104 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cubo_atribuicao
+import particoes
+
+
+N_LINHAS = 1_000_000
+N_ESTADOS = 6
+REGIONAIS_POR_ESTADO = 5
+MESES = 24
+
+COLUNAS_LEITURA = cubo_atribuicao.COLUNAS_LEITURA
+
+
+def gerar_origem(rng, caminho):
+    estado = rng.integers(0, N_ESTADOS, N_LINHAS)
+    regional = estado * REGIONAIS_POR_ESTADO + rng.integers(0, REGIONAIS_POR_ESTADO, N_LINHAS)
+    abertura = pd.Timestamp("2024-01-01") + pd.to_timedelta(
+        rng.integers(0, MESES * 30 * 1440, N_LINHAS), unit="min"
+    )
+    atribuicao = abertura + pd.to_timedelta(rng.exponential(2 * 1440, N_LINHAS).round(), unit="min")
+    df = pd.DataFrame({
+        "estado": np.array([f"UF{i}" for i in range(N_ESTADOS)])[estado],
+        "regional": np.array([f"R{i:02d}" for i in range(N_ESTADOS * REGIONAIS_POR_ESTADO)])[regional],
+        "base": [f"B{i:03d}" for i in rng.integers(0, 300, N_LINHAS)],
+        "sigla": [f"S{i:02d}" for i in rng.integers(0, 40, N_LINHAS)],
+        "grupo_os": rng.choice(["CORTE", "RELIGA", "INSPECAO", "LIGACAO"], N_LINHAS),
+        "tipo_os": rng.choice([f"T{i}" for i in range(25)], N_LINHAS),
+        "numero_os": np.arange(N_LINHAS),
+        "observacao": rng.choice(["sem observação", "cliente ausente", "acesso negado"], N_LINHAS),
+        # texto dd/mm/aaaa como na origem
+        "DATA_ABERTURA_OS": abertura.strftime("%d/%m/%Y %H:%M"),
+        "DATA_ATRIBUICAO_OS": atribuicao.strftime("%d/%m/%Y %H:%M"),
+        "DATA_LIMITE_OS": (atribuicao + pd.Timedelta(hours=20)).strftime("%d/%m/%Y %H:%M"),
+    })
+    df.to_parquet(caminho, index=False)
+
+
+def ler_tudo_e_filtrar(caminho, estado, regional, meses):
+    # fluxo anterior: arquivo inteiro, datas convertidas, filtro no pandas
+    df = pd.read_parquet(caminho)
+    for col in particoes.COLUNAS_DATA:
+        df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
+    mes = particoes.mes_de(df[particoes.COLUNA_MES])
+    return df[df["estado"].isin(estado) & df["regional"].isin(regional) & np.isin(mes, meses)]
+
+
+def main():
+    rng = np.random.default_rng(31)
+    with tempfile.TemporaryDirectory() as pasta:
+        origem = Path(pasta) / "tempo_atribuicao.parquet"
+        destino = Path(pasta) / "tempo_atribuicao"
+        gerar_origem(rng, origem)
+
+        inicio = time.perf_counter()
+        dataset = particoes.garantir(origem, destino)
+        t_particionar = time.perf_counter() - inicio
+        chaves = particoes.chaves_particao(dataset)
+
+        estado, regional, meses = ["UF2"], ["R11"], ["2025-03", "2025-04", "2025-05"]
+        selecoes = {"estado": estado, "regional": regional, "mes": meses}
+
+        inicio = time.perf_counter()
+        esperado = ler_tudo_e_filtrar(origem, estado, regional, meses)
+        t_tudo = time.perf_counter() - inicio
+
+        # mesmo caminho do load_data da página: leitura, métricas e cubo
+        inicio = time.perf_counter()
+        obtido = cubo_atribuicao.ler_os(particoes.garantir(origem, destino), selecoes)
+        cubo = cubo_atribuicao.construir_cubo(obtido)
+        t_particao = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        historico = cubo_atribuicao.ler_os(dataset, {"estado": estado})
+        t_estado = time.perf_counter() - inicio
+
+        colunas = [c for c in COLUNAS_LEITURA if c != "mes"]
+        esperado = esperado[colunas].sort_values(colunas, ignore_index=True)
+        obtido_linhas = obtido[colunas].sort_values(colunas, ignore_index=True)
+        pd.testing.assert_frame_equal(esperado, obtido_linhas, check_dtype=False)
+        assert cubo["os_qtd"].sum() == len(esperado)
+
+        # origem regravada: o dataset é refeito e não sobra partição antiga
+        pd.read_parquet(origem).query("estado != 'UF2'").to_parquet(origem, index=False)
+        refeito = particoes.garantir(origem, destino)
+        assert "UF2" not in set(particoes.chaves_particao(refeito)["estado"])
+
+        print(
+            f"{N_LINHAS:,} OS -> {len(chaves)} partições em {t_particionar:.1f} s | "
+            f"arquivo inteiro + filtro: {t_tudo:.2f} s | "
+            f"1 regional x 3 meses ({len(obtido):,} OS, cubo incluso): {t_particao * 1000:.0f} ms | "
+            f"1 estado, histórico ({len(historico):,} OS): {t_estado * 1000:.0f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_LINHAS = 2_000_000
+N_CIDADES = 40
+
+
+def perfil_por_cidade(df, cidade):
+    # fluxo anterior da página: filtro e groupby a cada cidade escolhida
+    sel = df[df["CIDADE"] == cidade]
+    return pd.DataFrame({
+        "atribuicoes": sel.groupby("hora_dia").size(),
+        "inicios": sel.groupby("hora_ini_dia").size(),
+        "fila_media_min": sel.groupby("hora_dia")["fila_min"].mean(),
+        "coi_media_min": sel.groupby("hora_dia")["coi_min"].mean(),
+    })
+
+
+def main():
+    rng = np.random.default_rng(17)
+    atribuicao = pd.Timestamp("2025-01-01") + pd.to_timedelta(
+        rng.integers(0, 365 * 1440, N_LINHAS), unit="min"
+    )
+    df = pd.DataFrame({
+        "CIDADE": rng.choice([f"C{i:03d}" for i in range(N_CIDADES)], N_LINHAS),
+        "ATRIBUICAO_TS": atribuicao,
+        "fila_min": rng.lognormal(np.log(90), 0.9, N_LINHAS).round(),
+        "coi_min": rng.lognormal(np.log(180), 1.4, N_LINHAS).round(),
+    })
+    df["data"] = df["ATRIBUICAO_TS"].dt.normalize()
+    df["hora_dia"] = df["ATRIBUICAO_TS"].dt.hour
+    df["hora_ini_dia"] = (df["ATRIBUICAO_TS"] + pd.to_timedelta(df["fila_min"], unit="min")).dt.hour
+
+    inicio = time.perf_counter()
+    for cidade in sorted(df["CIDADE"].unique()):
+        perfil_por_cidade(df, cidade)
+    t_filtros = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    sketches = filas.construir_sketches(df, ["fila_min", "coi_min"])
+    perfis, _ = filas.perfil_cidades(df, sketches)
+    t_perfil = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for cidade in perfis:
+        perfis[cidade]
+    t_consulta = time.perf_counter() - inicio
+
+    esperado = perfil_por_cidade(df, "C005")
+    obtido = perfis["C005"].loc[esperado.index]
+    assert np.allclose(esperado["fila_media_min"], obtido["fila_media_min"])
+    assert (esperado["inicios"].to_numpy() == obtido["inicios"].to_numpy()).all()
+
+    print(
+        f"{N_LINHAS:,} linhas, {N_CIDADES} cidades | filtro por cidade: {t_filtros:.2f} s | "
+        f"perfil único (com sketches): {t_perfil:.2f} s | "
+        f"consulta das {N_CIDADES}: {t_consulta * 1e6:.0f} µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
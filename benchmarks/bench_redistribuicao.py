@@ -0,0 +1,78 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import simulacao_norte
+from dados_sinteticos import gerar_operacao
+
+
+def simular_varredura(df):
+    # implementação anterior: varre todas as equipes-dia a cada OS removida
+    base = simulacao_norte.criar_base_equipe_dia(df)
+    mantidas = base[base["desmobilizar"].eq(0)]
+    removidas = df[df["desmobilizar"].eq(1)].sort_values(
+        ["data_turno", "cidade_equipe", "data_atribuicao", "inicio_atividade"]
+    )
+    cargas = {
+        (r.cidade_equipe, r.data_turno, r.equipe): float(r.carga_min)
+        for r in mantidas.itertuples()
+    }
+    capacidades = {
+        (r.cidade_equipe, r.data_turno, r.equipe): float(r.capacidade_proposta_min)
+        for r in mantidas.itertuples()
+    }
+    destinos = []
+    for r in removidas.itertuples():
+        chaves = [
+            chave for chave in cargas
+            if chave[0] == r.cidade_equipe and chave[1] == r.data_turno
+        ]
+        duracao = float(r.duracao_modelo_min)
+        elegiveis = [c for c in chaves if cargas[c] + duracao <= capacidades[c]]
+        if elegiveis:
+            destino = min(
+                elegiveis,
+                key=lambda c: (cargas[c] / capacidades[c], cargas[c], c[2]),
+            )
+            cargas[destino] += duracao
+            destinos.append(destino[2])
+        else:
+            destinos.append(None)
+    return destinos, cargas
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    # escala 1 ~ um trimestre de 10 cidades; a escala multiplica as cidades
+    for escala, comparar in [(1, True), (10, True), (100, False)]:
+        df = gerar_operacao(cidades=10 * escala)
+        (_, redistribuicao, carga_final), t_heap = cronometrar(
+            simulacao_norte.simular_redistribuicao, df
+        )
+        linha = (
+            f"{escala:>3}x | {len(df):>9,} atividades | "
+            f"{len(redistribuicao):>8,} OS removidas | heap: {t_heap:7.2f} s"
+        )
+
+        if comparar:
+            (destinos, cargas), t_varredura = cronometrar(simular_varredura, df)
+            assert redistribuicao["equipe_destino"].equals(
+                pd.Series(destinos, dtype=redistribuicao["equipe_destino"].dtype)
+            )
+            assert carga_final["carga_proposta_min"].tolist() == list(cargas.values())
+            linha += f" | varredura: {t_varredura:7.2f} s ({t_varredura / t_heap:.0f}x)"
+
+        print(linha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import regras
+
+
+N_LINHAS = 1_000_000
+
+
+def classificar_situacao(x):
+    if pd.isna(x):
+        return "⚪ Sem volumetria"
+    if x > 1.2:
+        return "🔴 Alta demanda"
+    if x >= 0.8:
+        return "🟢 Demanda adequada"
+    return "🟡 Baixa demanda"
+
+
+def classificar_nota_ups(x):
+    if pd.isna(x):
+        return "Sem dados"
+    if x >= 0.90:
+        return "A"
+    if x >= 0.80:
+        return "B"
+    if x >= 0.70:
+        return "C"
+    return "D"
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    rng = np.random.default_rng(42)
+    aderencia = pd.Series(rng.uniform(0, 2, N_LINHAS))
+    aderencia[rng.random(N_LINHAS) < 0.05] = np.nan
+
+    casos = [
+        (
+            "situacao",
+            lambda: aderencia.apply(classificar_situacao),
+            lambda: regras.aplicar_regras(aderencia, regras.SITUACAO_ADERENCIA),
+        ),
+        (
+            "nota_ups",
+            lambda: aderencia.apply(classificar_nota_ups),
+            lambda: regras.aplicar_faixas(aderencia, regras.NOTA_UPS),
+        ),
+    ]
+
+    print(f"{N_LINHAS:,} linhas")
+    for nome, por_linha, vetorizado in casos:
+        esperado, t_linha = cronometrar(por_linha)
+        obtido, t_vetor = cronometrar(vetorizado)
+        assert (esperado.to_numpy() == obtido).all(), nome
+        print(
+            f"{nome:<10} apply: {t_linha:8.1f} ms | "
+            f"regras: {t_vetor:6.1f} ms | {t_linha / t_vetor:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_CIDADES = 60
+DIAS = 30
+CHEGADAS_DIA = 60
+
+
+def gerar_atribuicoes(rng):
+    n = N_CIDADES * DIAS * CHEGADAS_DIA
+    df = pd.DataFrame({
+        "CIDADE": np.repeat([f"C{i:03d}" for i in range(N_CIDADES)], DIAS * CHEGADAS_DIA),
+        "ATRIBUICAO_TS": pd.Timestamp("2025-01-01")
+        + pd.to_timedelta(rng.uniform(0, DIAS * 1440, n), unit="min"),
+        "servico_min": rng.lognormal(np.log(50), 0.5, n),
+    })
+    df["fila_min"] = np.nan
+    return df
+
+
+def lindley(chegadas, servicos):
+    # uma equipe sempre em serviço: recursão de Lindley
+    inicio, livre = [], 0.0
+    for chegada, servico in zip(chegadas, servicos):
+        livre = max(chegada, livre)
+        inicio.append(livre)
+        livre += servico
+    return np.array(inicio)
+
+
+def main():
+    rng = np.random.default_rng(11)
+    df = gerar_atribuicoes(rng)
+
+    chegadas = np.sort(rng.uniform(0, 5000, 2000))
+    servicos = rng.exponential(2.0, 2000)
+    simulado = filas.simular_fila(chegadas.tolist(), servicos.tolist(), [1] * 24)
+    assert np.allclose(simulado, lindley(chegadas, servicos))
+
+    calendario = filas.montar_calendario(4, 7, 19, 1)
+    inicio = time.perf_counter()
+    replay = filas.replay_fila(df, calendario)
+    decorrido = time.perf_counter() - inicio
+
+    assert (replay["fila_simulada_min"] >= 0).all()
+    print(
+        f"{len(df):,} atribuições ({N_CIDADES} cidades x {DIAS} dias) em {decorrido:.2f} s | "
+        f"espera simulada média {replay['fila_simulada_min'].mean():.1f} min"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import regras
+
+
+N_LINHAS = 5_000_000
+
+
+def classificar_risco(row):
+    # versão anterior de tempo_atribuicao.py, linha a linha
+    if pd.isna(row["DATA_ATRIBUICAO_OS"]) or pd.isna(row["DATA_LIMITE_OS"]):
+        return "SEM ATRIBUIÇÃO"
+
+    if (
+        row["DATA_ATRIBUICAO_OS"].date() == row["DATA_LIMITE_OS"].date()
+        and row["DATA_ATRIBUICAO_OS"].hour >= 18
+    ):
+        return "ATRIB. APÓS 18h (MESMO DIA)"
+
+    h = row["horas_ate_prazo"]
+
+    if h > 24:
+        return ">24h"
+    elif h <= 1:
+        return "<=1h"
+    elif h < 6:
+        return "1–6h"
+    elif h < 12:
+        return "6–12h"
+    else:
+        return "12–24h"
+
+
+def main():
+    rng = np.random.default_rng(29)
+    atribuicao = pd.Series(
+        pd.Timestamp("2025-01-01")
+        + pd.to_timedelta(rng.integers(0, 365 * 1440, N_LINHAS), unit="min")
+    )
+    # prazos concentrados nas primeiras horas para cobrir todas as faixas,
+    # inclusive o mesmo dia após 18h e prazos já vencidos
+    limite = atribuicao + pd.to_timedelta(
+        rng.choice([-120, 0, 30, 60, 180, 420, 720, 1000, 1440, 3000], N_LINHAS)
+        + rng.integers(0, 60, N_LINHAS),
+        unit="min",
+    )
+    atribuicao[rng.random(N_LINHAS) < 0.03] = pd.NaT
+    limite[rng.random(N_LINHAS) < 0.03] = pd.NaT
+    df = pd.DataFrame({"DATA_ATRIBUICAO_OS": atribuicao, "DATA_LIMITE_OS": limite})
+    df["horas_ate_prazo"] = (
+        df["DATA_LIMITE_OS"] - df["DATA_ATRIBUICAO_OS"]
+    ).dt.total_seconds() / 3600
+
+    inicio = time.perf_counter()
+    esperado = df.apply(classificar_risco, axis=1)
+    t_apply = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = regras.risco_prazo(
+        df["DATA_ATRIBUICAO_OS"], df["DATA_LIMITE_OS"], df["horas_ate_prazo"]
+    )
+    t_vetor = time.perf_counter() - inicio
+
+    assert (esperado.to_numpy() == obtido).all()
+    contagem = pd.Series(obtido).value_counts()
+    assert len(contagem) == 7, contagem
+
+    print(
+        f"{N_LINHAS:,} OS | apply: {t_apply:.1f} s | vetorizado: {t_vetor * 1000:.0f} ms | "
+        f"{t_apply / t_vetor:.0f}x | rótulos idênticos"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+N_LINHAS = 3_000_000
+N_CIDADES = 40
+DIAS = 365
+QS = (0.5, 0.9, 0.99)
+
+
+def main():
+    rng = np.random.default_rng(13)
+    df = pd.DataFrame({
+        "CIDADE": rng.choice([f"C{i:03d}" for i in range(N_CIDADES)], N_LINHAS),
+        "data": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, DIAS, N_LINHAS), unit="D"),
+        "hora_dia": rng.integers(0, 24, N_LINHAS),
+        "fila_min": rng.lognormal(np.log(90), 0.9, N_LINHAS).round(),
+        "coi_min": rng.lognormal(np.log(180), 1.4, N_LINHAS).round(),
+    })
+
+    inicio = time.perf_counter()
+    sketches = filas.construir_sketches(df, ["fila_min", "coi_min"])
+    t_construcao = time.perf_counter() - inicio
+
+    cidades = ["C001", "C007", "C020"]
+    periodo = (pd.Timestamp("2025-03-01"), pd.Timestamp("2025-08-31"))
+
+    inicio = time.perf_counter()
+    selecao = df["CIDADE"].isin(cidades) & df["data"].between(*periodo)
+    exato = df[selecao].groupby("hora_dia")[["fila_min", "coi_min"]].quantile(
+        list(QS), interpolation="lower"
+    ).unstack()
+    t_linhas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    indice = sketches["indice"]
+    mascara = (indice["CIDADE"].isin(cidades) & indice["data"].between(*periodo)).to_numpy()
+    aproximado = filas.quantis_sketch(sketches, mascara, QS)
+    t_sketch = time.perf_counter() - inicio
+
+    erro = 0.0
+    for coluna in ["fila_min", "coi_min"]:
+        for q in QS:
+            real = exato[(coluna, q)].to_numpy()
+            estimado = aproximado[f"{coluna}_p{int(round(q * 100))}"].to_numpy()
+            erro = max(erro, np.max(np.abs(estimado - real) / real))
+    assert erro <= filas.ERRO_RELATIVO_SKETCH + 1e-9, erro
+
+    print(
+        f"{N_LINHAS:,} linhas -> {len(indice):,} sketches em {t_construcao:.2f} s | "
+        f"consulta: linhas {t_linhas * 1000:.0f} ms, sketches {t_sketch * 1000:.0f} ms | "
+        f"erro relativo máx {erro:.2%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+
+def gerar_operacao(cidades=10, dias=90, equipes_por_cidade=5, atividades_por_dia=6, semente=7):
+    # frame no formato de carregar_e_preparar (analise_norte.py)
+    rng = np.random.default_rng(semente)
+
+    nomes_cidades = [f"C{i:03d}" for i in range(cidades)]
+    datas = pd.date_range("2025-01-01", periods=dias, freq="D")
+
+    equipes = pd.DataFrame({
+        "cidade_equipe": np.repeat(nomes_cidades, equipes_por_cidade),
+        "n_equipe": np.tile(np.arange(equipes_por_cidade), cidades),
+    })
+    equipes["equipe"] = (
+        "PI-" + equipes["cidade_equipe"].str.slice(1) + "-E" +
+        equipes["n_equipe"].astype(str).str.zfill(3)
+    )
+    sorteio = rng.random(len(equipes))
+    equipes["desmobilizar"] = (sorteio < 0.2).astype(int)
+    equipes["12h"] = ((sorteio >= 0.2) & (sorteio < 0.4)).astype(int)
+
+    equipe_dia = equipes.merge(pd.DataFrame({"data_turno": datas}), how="cross")
+    qtd = rng.poisson(atividades_por_dia, len(equipe_dia)).clip(min=1)
+    df = equipe_dia.loc[equipe_dia.index.repeat(qtd)].reset_index(drop=True)
+    n = len(df)
+
+    df["os"] = np.arange(n)
+    df["duracao_modelo_min"] = rng.lognormal(np.log(45), 0.6, n).clip(1, 720).round(1)
+    df["duracao_original_min"] = df["duracao_modelo_min"]
+    df["duracao_valida_min"] = df["duracao_modelo_min"].where(rng.random(n) > 0.1)
+    df["preco_a_cobrar"] = rng.uniform(20, 300, n).round(2)
+    df["grupo_os"] = rng.choice(["CORTE", "LN", "PLANTÃO"], n)
+    df["tipo_os"] = rng.choice(["CT", "RI", "NR"], n)
+
+    df["inicio_turno"] = df["data_turno"] + pd.Timedelta(hours=8)
+    df["fim_turno"] = df["data_turno"] + pd.Timedelta(hours=17)
+    df["fim_turno_proposto"] = df["fim_turno"] + pd.to_timedelta(df["12h"] * 2, unit="h")
+
+    ordem = df.groupby(["equipe", "data_turno"]).cumcount()
+    df["inicio_atividade"] = (
+        df["inicio_turno"] + pd.to_timedelta(ordem * 70 + rng.integers(0, 30, n), unit="min")
+    )
+    df["fim_atividade"] = df["inicio_atividade"] + pd.to_timedelta(df["duracao_modelo_min"], unit="min")
+    df["data_atribuicao"] = df["inicio_atividade"] - pd.to_timedelta(rng.integers(5, 240, n), unit="min")
+
+    for sufixo in ["atual", "proposta"]:
+        df[f"hora_extra_{sufixo}_min"] = 0.0
+        df[f"hora_extra_antes_turno_{sufixo}_min"] = 0.0
+        df[f"hora_extra_apos_turno_{sufixo}_min"] = 0.0
+    df["tempo_primeiro_servico_min"] = np.where(ordem.eq(0), 10.0, np.nan)
+    df["intervalo_entre_atividades_min"] = 15.0
+
+    return df.drop(columns="n_equipe")
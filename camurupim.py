@@ -2,6 +2,8 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+import conversao_tempo
+
 
 st.set_page_config(
     page_title="Análise Operacional — Camurupim",
@@ -92,7 +94,7 @@ def carregar_log():
     df["inicio_turno"] = pd.to_datetime(df["inicio_turno"])
     df["inicio_deslocamento_dt"] = (
         df["data"]
-        + pd.to_timedelta(df["inicio_deslocamento"].astype(str))
+        + conversao_tempo.para_timedelta(df["inicio_deslocamento"])
     )
 
     atribuida_antes = df["atribuicao"] < df["inicio_turno"]
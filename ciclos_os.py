@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+
+# =========================
+# ESTADOS DO CICLO
+# =========================
+# sem data de conclusão, o ciclo observável vai da abertura ao prazo e à
+# atribuição; cada estado é um intervalo [início, fim) por OS
+ESTADOS = ["sem_atribuicao", "vencidas_sem_atribuicao", "atribuidas_a_vencer"]
+JANELA_ATRIBUICAO_VENCIDA = pd.Timedelta(hours=24)
+
+FIM_ABERTO = np.iinfo(np.int64).max
+
+
+def _ns(valores):
+    # datetime64 -> int64 em ns, NaT vira FIM_ABERTO (nunca aconteceu)
+    ns = pd.Series(valores, copy=False).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return np.where(ns == np.iinfo(np.int64).min, FIM_ABERTO, ns)
+
+
+# =========================
+# ÍNDICE
+# =========================
+def _somas(origem_s):
+    return np.concatenate([[0], np.cumsum(origem_s)])
+
+
+def indice_ciclos(df, chaves=()):
+    # chaves: colunas de filtro; cada OS guarda o código do seu grupo para
+    # filtrar_ciclos recortar o índice sem reordenar
+    abertura = _ns(df["DATA_ABERTURA_OS"])
+    atribuicao = _ns(df["DATA_ATRIBUICAO_OS"])
+    limite = _ns(df["DATA_LIMITE_OS"])
+    if chaves:
+        codigos = df.groupby(list(chaves), dropna=False, sort=False).ngroup().to_numpy()
+    else:
+        codigos = np.zeros(len(df), dtype=np.int64)
+
+    # sem abertura a OS não entra em nenhum estado
+    com_abertura = abertura != FIM_ABERTO
+    abertura, atribuicao, limite = abertura[com_abertura], atribuicao[com_abertura], limite[com_abertura]
+    codigos = codigos[com_abertura]
+    atribuicao = np.maximum(atribuicao, abertura)
+
+    intervalos = {
+        "sem_atribuicao": (abertura, atribuicao, abertura),
+        "vencidas_sem_atribuicao": (np.maximum(limite, abertura), atribuicao, abertura),
+        # sem prazo não há "a vencer"
+        "atribuidas_a_vencer": (atribuicao, np.where(limite == FIM_ABERTO, atribuicao, limite), abertura),
+    }
+
+    indice = {}
+    for estado, (inicio, fim, origem) in intervalos.items():
+        validos = inicio < fim
+        inicio, fim, origem, grupo = inicio[validos], fim[validos], origem[validos], codigos[validos]
+        por_inicio = np.argsort(inicio, kind="stable")
+        por_fim = np.argsort(fim, kind="stable")
+        # aberturas em segundos: somas exatas em int64 mesmo com milhões de OS
+        origem_s = origem // 10**9
+        indice[estado] = {
+            "inicio": inicio[por_inicio],
+            "fim": fim[por_fim],
+            "origem_inicio": origem_s[por_inicio],
+            "origem_fim": origem_s[por_fim],
+            "grupo_inicio": grupo[por_inicio],
+            "grupo_fim": grupo[por_fim],
+            "soma_inicio": _somas(origem_s[por_inicio]),
+            "soma_fim": _somas(origem_s[por_fim]),
+        }
+
+    atrasadas = (atribuicao > limite) & (atribuicao != FIM_ABERTO)
+    por_instante = np.argsort(atribuicao[atrasadas], kind="stable")
+    indice["atribuicoes_vencidas"] = atribuicao[atrasadas][por_instante]
+    indice["grupo_vencidas"] = codigos[atrasadas][por_instante]
+
+    # um registro por grupo: valores das chaves e período coberto
+    grupos = pd.DataFrame({
+        "grupo": codigos,
+        "primeira_abertura": abertura,
+        "ultimo_evento": np.maximum(abertura, np.where(atribuicao == FIM_ABERTO, 0, atribuicao)),
+    })
+    grupos = grupos.groupby("grupo").agg(
+        primeira_abertura=("primeira_abertura", "min"),
+        ultimo_evento=("ultimo_evento", "max"),
+    )
+    if chaves:
+        valores = df.loc[com_abertura, list(chaves)].groupby(codigos, sort=False).first()
+        grupos = grupos.join(valores)
+    indice["grupos"] = grupos
+    indice["periodo"] = _periodo(grupos)
+    return indice
+
+
+def _periodo(grupos):
+    if grupos.empty:
+        return pd.NaT, pd.NaT
+    return (
+        pd.Timestamp(int(grupos["primeira_abertura"].min())),
+        pd.Timestamp(int(grupos["ultimo_evento"].max())),
+    )
+
+
+def filtrar_ciclos(indice, selecoes):
+    # {coluna: valores}, como cubo_atribuicao.filtrar; os vetores já estão
+    # ordenados, então recortar mantém a ordem e só as somas são refeitas.
+    # o resultado serve às consultas, não a um novo filtro
+    grupos = indice["grupos"]
+    escolhidos = np.ones(len(grupos), dtype=bool)
+    for coluna, valores in selecoes.items():
+        if valores is None:
+            continue
+        escolhidos &= grupos[coluna].isin(list(valores)).to_numpy()
+    grupos = grupos[escolhidos]
+    # máscara por código de grupo
+    manter = np.zeros(indice["grupos"].index.max() + 1 if len(indice["grupos"]) else 0, dtype=bool)
+    manter[grupos.index.to_numpy()] = True
+
+    filtrado = {}
+    for estado in ESTADOS:
+        intervalos = indice[estado]
+        no_inicio = manter[intervalos["grupo_inicio"]]
+        no_fim = manter[intervalos["grupo_fim"]]
+        filtrado[estado] = {
+            "inicio": intervalos["inicio"][no_inicio],
+            "fim": intervalos["fim"][no_fim],
+            "soma_inicio": _somas(intervalos["origem_inicio"][no_inicio]),
+            "soma_fim": _somas(intervalos["origem_fim"][no_fim]),
+        }
+
+    vencidas = manter[indice["grupo_vencidas"]]
+    filtrado["atribuicoes_vencidas"] = indice["atribuicoes_vencidas"][vencidas]
+    filtrado["grupos"] = grupos
+    filtrado["periodo"] = _periodo(grupos)
+    return filtrado
+
+
+# =========================
+# CONSULTAS "AS-OF"
+# =========================
+def ciclos_em(indice, instantes):
+    # vivos em T: começaram até T e ainda não terminaram
+    instantes = pd.DatetimeIndex(instantes)
+    t = instantes.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    t_s = t // 10**9
+    resultado = {}
+
+    for estado in ESTADOS:
+        intervalos = indice[estado]
+        iniciados = np.searchsorted(intervalos["inicio"], t, side="right")
+        encerrados = np.searchsorted(intervalos["fim"], t, side="right")
+        vivos = iniciados - encerrados
+        soma = intervalos["soma_inicio"][iniciados] - intervalos["soma_fim"][encerrados]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            idade = np.where(vivos > 0, (t_s - soma / np.maximum(vivos, 1)) / 86400, np.nan)
+        resultado[estado] = vivos
+        resultado[f"idade_media_dias_{estado}"] = idade
+
+    vencidas = indice["atribuicoes_vencidas"]
+    janela = JANELA_ATRIBUICAO_VENCIDA.value
+    resultado["atribuidas_apos_prazo_24h"] = (
+        np.searchsorted(vencidas, t, side="right")
+        - np.searchsorted(vencidas, t - janela, side="right")
+    )
+
+    ciclos = pd.DataFrame(resultado, index=instantes)
+    ciclos.insert(0, "abertas", ciclos["sem_atribuicao"] + ciclos["atribuidas_a_vencer"])
+    return ciclos
+
+
+def serie_ciclos(indice, freq="1D"):
+    inicio, fim = indice["periodo"]
+    if pd.isna(inicio):
+        return ciclos_em(indice, [])
+    return ciclos_em(indice, pd.date_range(inicio.floor(freq), fim, freq=freq))
@@ -0,0 +1,149 @@
+from datetime import datetime, time, timedelta
+from numbers import Number
+
+import numpy as np
+import pandas as pd
+
+
+# "H:MM" ou "HH:MM:SS(.fff)", com horas acima de 24 permitidas
+PADRAO_RELOGIO = r"^\s*(\d+):(\d{1,2})(?::(\d{1,2}(?:\.\d+)?))?\s*$"
+
+TIPO_TIMEDELTA = "timedelta64[ns]"
+
+
+def _segundos_para_timedelta(segundos):
+    # float com NaN -> timedelta64[ns] sem passar por objetos Timedelta
+    segundos = np.asarray(segundos, dtype=float)
+    nanos = np.full(len(segundos), np.iinfo(np.int64).min, dtype=np.int64)
+    validos = np.isfinite(segundos)
+    nanos[validos] = np.round(segundos[validos] * 1e9).astype(np.int64)
+    return nanos.view(TIPO_TIMEDELTA)
+
+
+def _horario_para_timedelta(valores):
+    # objetos datetime.time: extração em lote dos campos do relógio
+    segundos = np.fromiter(
+        (
+            t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+            for t in valores
+        ),
+        dtype=float,
+        count=len(valores),
+    )
+    return _segundos_para_timedelta(segundos)
+
+
+def _relogio_fixo(valores):
+    # caminho rápido para "HH:MM" e "HH:MM:SS": lê os dígitos por posição
+    caracteres = (
+        np.asarray(valores, dtype=object).astype("U9")
+        .view(np.uint32).reshape(len(valores), 9)
+        .astype(np.int64)
+    )
+    digitos = caracteres - ord("0")
+    eh_digito = (digitos >= 0) & (digitos <= 9)
+    dois_pontos = caracteres == ord(":")
+
+    base = eh_digito[:, [0, 1, 3, 4]].all(axis=1) & dois_pontos[:, 2]
+    curto = base & (caracteres[:, 5] == 0)
+    longo = (
+        base & dois_pontos[:, 5] & eh_digito[:, 6] & eh_digito[:, 7]
+        & (caracteres[:, 8] == 0)
+    )
+
+    segundos = (
+        (digitos[:, 0] * 10 + digitos[:, 1]) * 3600
+        + (digitos[:, 3] * 10 + digitos[:, 4]) * 60
+        + np.where(longo, digitos[:, 6] * 10 + digitos[:, 7], 0)
+    ).astype(float)
+    segundos[~(curto | longo)] = np.nan
+    return segundos
+
+
+def _texto_para_timedelta(texto):
+    texto = pd.Series(texto, copy=False)
+    segundos = _relogio_fixo(texto.to_numpy(dtype=object))
+    resultado = pd.Series(_segundos_para_timedelta(segundos), index=texto.index)
+
+    restantes = np.isnan(segundos) & texto.notna().to_numpy()
+    if not restantes.any():
+        return resultado
+
+    # "8:30", "12:05:30.5", decimais com vírgula...
+    sobra = texto[restantes].astype(str).str.replace(",", ".", regex=False)
+    partes = sobra.str.extract(PADRAO_RELOGIO)
+    segundos_sobra = (
+        pd.to_numeric(partes[0], errors="coerce") * 3600
+        + pd.to_numeric(partes[1], errors="coerce") * 60
+        + pd.to_numeric(partes[2], errors="coerce").fillna(0)
+    )
+    convertido = pd.Series(_segundos_para_timedelta(segundos_sobra), index=sobra.index)
+
+    # demais formatos ("1 days 02:00:00", "2h30min"...) ficam com o pandas
+    outros = convertido.isna()
+    if outros.any():
+        convertido[outros] = pd.to_timedelta(
+            sobra[outros], errors="coerce"
+        ).astype(TIPO_TIMEDELTA)
+
+    resultado[restantes] = convertido.to_numpy()
+    return resultado
+
+
+def para_timedelta(valores):
+    # aceita timedelta, datetime/Timestamp (usa a hora do dia), datetime.time,
+    # fração de dia do Excel (número) e texto de relógio
+    serie = pd.Series(valores, copy=False)
+    indice = serie.index
+
+    if pd.api.types.is_timedelta64_dtype(serie):
+        return serie.astype(TIPO_TIMEDELTA)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return (serie - serie.dt.normalize()).astype(TIPO_TIMEDELTA)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return pd.Series(
+            _segundos_para_timedelta(serie.to_numpy(dtype=float) * 86_400),
+            index=indice,
+        )
+
+    resultado = pd.Series(pd.NaT, index=indice, dtype=TIPO_TIMEDELTA)
+    presentes = serie.notna().to_numpy()
+    if not presentes.any():
+        return resultado
+
+    tipo = pd.api.types.infer_dtype(serie, skipna=True)
+    if tipo == "string":
+        return _texto_para_timedelta(serie)
+    if tipo == "time":
+        resultado[presentes] = _horario_para_timedelta(serie[presentes])
+        return resultado
+
+    # coluna mista: separa por tipo e converte cada bloco de uma vez
+    tipos = serie[presentes].map(type)
+    posicoes = np.flatnonzero(presentes)
+    eh_datetime = tipos.map(lambda t: issubclass(t, datetime)).to_numpy()
+    eh_hora = tipos.map(lambda t: issubclass(t, time)).to_numpy()
+    eh_duracao = tipos.map(lambda t: issubclass(t, (timedelta, np.timedelta64))).to_numpy()
+    eh_numero = tipos.map(
+        lambda t: issubclass(t, Number) and not issubclass(t, (bool, np.bool_))
+    ).to_numpy() & ~eh_duracao
+    eh_texto = ~(eh_datetime | eh_hora | eh_duracao | eh_numero)
+
+    blocos = [
+        (eh_datetime, lambda v: para_timedelta(pd.to_datetime(v))),
+        (eh_hora, _horario_para_timedelta),
+        (eh_duracao, pd.to_timedelta),
+        (eh_numero, lambda v: _segundos_para_timedelta(np.asarray(v, dtype=float) * 86_400)),
+        (eh_texto, lambda v: _texto_para_timedelta(pd.Series(v))),
+    ]
+    valores_presentes = serie.to_numpy(dtype=object)[posicoes]
+    for mascara, converter in blocos:
+        if mascara.any():
+            convertido = converter(valores_presentes[mascara])
+            resultado.iloc[posicoes[mascara]] = np.asarray(convertido, dtype=TIPO_TIMEDELTA)
+
+    return resultado
+
+
+def para_horas(valores, padrao=0.0):
+    return para_timedelta(valores).dt.total_seconds().div(3600).fillna(padrao)
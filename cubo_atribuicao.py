@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+import particoes
+import regras
+
+
+# =========================
+# LEITURA
+# =========================
+COLUNAS_FILTRO = ["base", "sigla", "grupo_os", "tipo_os"]
+COLUNAS_LEITURA = particoes.COLUNAS_PARTICAO + COLUNAS_FILTRO + particoes.COLUNAS_DATA
+
+
+def ler_os(dataset, selecoes):
+    # OS da seleção com as métricas de tempo e o nível de risco
+    df = particoes.ler(dataset, selecoes, COLUNAS_LEITURA)
+    for col in particoes.COLUNAS_DATA:
+        df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
+
+    df["dias_abertura_atribuicao"] = (
+        df["DATA_ATRIBUICAO_OS"] - df["DATA_ABERTURA_OS"]
+    ).dt.total_seconds() / 86400
+    df["horas_ate_prazo"] = (
+        df["DATA_LIMITE_OS"] - df["DATA_ATRIBUICAO_OS"]
+    ).dt.total_seconds() / 3600
+    df["nivel_risco"] = regras.risco_prazo(
+        df["DATA_ATRIBUICAO_OS"], df["DATA_LIMITE_OS"], df["horas_ate_prazo"]
+    )
+    return df
+
+
+# =========================
+# DIMENSÕES
+# =========================
+CHAVES_CUBO = [
+    "estado", "regional", "base", "sigla", "grupo_os", "tipo_os",
+    "nivel_risco", "bin_dias_atribuicao",
+]
+CHAVES_TABELA = ["estado", "regional", "base", "grupo_os", "tipo_os", "nivel_risco"]
+
+BINS_DIAS = [-np.inf, 0, 1, 2, 3, 5, 7, 14, np.inf]
+ROTULOS_DIAS = [
+    "Mesmo dia",
+    "1 dia",
+    "2 dias",
+    "3 dias",
+    "4–5 dias",
+    "6–7 dias",
+    "8–14 dias",
+    ">14 dias"
+]
+
+
+# =========================
+# CONSTRUÇÃO
+# =========================
+def construir_cubo(df):
+    # somas e contagens são aditivas: qualquer agrupamento das chaves sai do cubo
+    dados = df.assign(
+        bin_dias_atribuicao=pd.cut(
+            df["dias_abertura_atribuicao"], bins=BINS_DIAS, labels=ROTULOS_DIAS
+        )
+    )
+    return (
+        dados.groupby(CHAVES_CUBO, dropna=False, observed=True)
+        .agg(
+            os_qtd=("nivel_risco", "size"),
+            soma_dias=("dias_abertura_atribuicao", "sum"),
+            n_dias=("dias_abertura_atribuicao", "count"),
+            soma_horas=("horas_ate_prazo", "sum"),
+            n_horas=("horas_ate_prazo", "count"),
+        )
+        .reset_index()
+    )
+
+
+# =========================
+# AGREGAÇÕES
+# =========================
+def filtrar(cubo, selecoes):
+    # {dimensão: valores}, como particoes.filtro; chave nula fica de fora,
+    # igual ao isin sobre as linhas
+    mascara = np.ones(len(cubo), dtype=bool)
+    for coluna, valores in selecoes.items():
+        if valores is None:
+            continue
+        mascara &= cubo[coluna].isin(list(valores)).to_numpy()
+    return cubo[mascara]
+
+
+def _media(soma, n):
+    return (soma / n.where(n > 0)).astype(float)
+
+
+def agregar(cubo, chaves):
+    # linhas com chave nula ficam de fora, como no groupby(dropna=True)
+    resumo = (
+        cubo.dropna(subset=chaves)
+        .groupby(chaves, observed=True)[["os_qtd", "soma_dias", "n_dias", "soma_horas", "n_horas"]]
+        .sum()
+    )
+    resumo["media_dias_atribuicao"] = _media(resumo["soma_dias"], resumo["n_dias"])
+    resumo["media_horas_ate_prazo"] = _media(resumo["soma_horas"], resumo["n_horas"])
+    return resumo.reset_index()
+
+
+def distribuicao(cubo, chave, excluir=()):
+    # qtd, pct e rótulo "qtd | pct%" das barras dos histogramas
+    dist = agregar(cubo[~cubo[chave].isin(excluir)], [chave])[[chave, "os_qtd"]]
+    dist = dist.rename(columns={"os_qtd": "qtd"})
+    dist["pct"] = dist["qtd"] / dist["qtd"].sum() * 100
+    dist["label"] = (
+        dist["qtd"].astype(int).astype(str)
+        + " | "
+        + dist["pct"].round(1).astype(str)
+        + "%"
+    )
+    return dist
+
+
+def kpis(cubo):
+    total = cubo["os_qtd"].sum()
+    n_dias = cubo["n_dias"].sum()
+    por_risco = cubo.groupby("nivel_risco")["os_qtd"].sum() / total * 100 if total else pd.Series(dtype=float)
+    return {
+        "os": total,
+        "media_dias_atribuicao": cubo["soma_dias"].sum() / n_dias if n_dias else np.nan,
+        "pct_apos_corte": por_risco.get(regras.ROTULO_APOS_CORTE, 0.0),
+        "pct_ate_1h": por_risco.get("<=1h", 0.0),
+    }
@@ -3,6 +3,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+import conversao_tempo
+
 st.set_page_config(page_title="DPL SUL PI", layout="wide")
 
 st.title("Tempos Operacionais")
@@ -12,15 +14,8 @@ st.title("Tempos Operacionais")
 def load_data():
     df = pd.read_excel("V_TEORIA_DAS_FILAS.xlsx")
 
-    def time_to_hours(val):
-        if pd.isna(val):
-            return 0.0
-        h, m, *s = str(val).split(":")
-        s = s[0] if s else 0
-        return int(h) + int(m) / 60 + int(s) / 3600
-
-    df["DURACAO_HORAS"] = df["DURACAO"].apply(time_to_hours)
-    df["DESLOCAMENTO_HORAS"] = df["DESLOCAMENTO"].apply(time_to_hours)
+    df["DURACAO_HORAS"] = conversao_tempo.para_horas(df["DURACAO"])
+    df["DESLOCAMENTO_HORAS"] = conversao_tempo.para_horas(df["DESLOCAMENTO"])
     df["TMA_HORAS"] = df["DURACAO_HORAS"] + df["DESLOCAMENTO_HORAS"]
 
     df["DATA"] = pd.to_datetime(df["DATA"])
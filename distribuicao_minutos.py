@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+
+def indexar_minutos(df, chaves, coluna):
+    # um vetor ordenado (float32) de minutos por combinação de chaves
+    dados = df.dropna(subset=[coluna]).sort_values(chaves + [coluna])
+    grupos = dados.groupby(chaves, sort=False, dropna=False)
+
+    codigos = grupos.ngroup().to_numpy()
+    cortes = np.flatnonzero(np.diff(codigos)) + 1
+    minutos = dados[coluna].to_numpy(dtype=np.float32)
+    vetores = np.split(minutos, cortes) if len(minutos) else []
+
+    indice = grupos.size().reset_index(name="atribuicoes")
+    indice["posicao"] = np.arange(len(indice))
+
+    return indice, vetores
+
+
+def contar_faixas(vetores, limites):
+    # faixas: (-inf, l0), [l0, l1), ..., [ln, +inf)
+    limites = np.asarray(limites, dtype=np.float32)
+    abaixo = np.zeros(len(limites), dtype=np.int64)
+    total = 0
+
+    for vetor in vetores:
+        abaixo += np.searchsorted(vetor, limites, side="left")
+        total += len(vetor)
+
+    return np.diff(np.concatenate([[0], abaixo, [total]]))
+
+
+def contar_abaixo(vetores, limite):
+    return int(contar_faixas(vetores, [limite])[0])
+
+
+def percentis(vetores, qs):
+    if not vetores or not sum(len(v) for v in vetores):
+        return [np.nan] * len(qs)
+    return np.percentile(np.concatenate(vetores), qs).tolist()
+
+
+def formatar_duracao(minutos):
+    minutos = int(round(minutos))
+    sinal = "-" if minutos < 0 else ""
+    minutos = abs(minutos)
+    if minutos < 60:
+        return f"{sinal}{minutos}m"
+    horas, resto = divmod(minutos, 60)
+    return f"{sinal}{horas}h" if resto == 0 else f"{sinal}{horas}h{resto:02d}"
+
+
+def rotular_faixas(limites, rotulo_negativo="Após fim do turno"):
+    # um rótulo por faixa de contar_faixas: len(limites) + 1
+    limites = list(limites)
+    if not limites or any(b <= a for a, b in zip(limites[:-1], limites[1:])):
+        raise ValueError("limites das faixas devem ser crescentes e sem repetição")
+
+    rotulos = []
+
+    if limites[0] == 0:
+        rotulos.append(rotulo_negativo)
+    else:
+        rotulos.append(f"<{formatar_duracao(limites[0])}")
+
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        if inicio == 0 and limites[0] == 0:
+            # logo após a faixa negativa: o que resta até o próximo limite
+            rotulos.append(f"<{formatar_duracao(fim)}")
+        elif inicio < 0 or fim < 0:
+            # separador por extenso: "-30m a 0m", nunca "0--30m"
+            rotulos.append(f"{formatar_duracao(inicio)} a {formatar_duracao(fim)}")
+        else:
+            rotulos.append(f"{formatar_duracao(inicio)}-{formatar_duracao(fim)}")
+
+    # a última faixa é [ln, +inf): inclui o próprio limite
+    rotulos.append(f"≥{formatar_duracao(limites[-1])}")
+    return rotulos
+
+
+def ler_limites(texto):
+    valores = pd.to_numeric(
+        pd.Series(str(texto).replace(";", ",").split(",")).str.strip(),
+        errors="coerce"
+    ).dropna()
+    return sorted(set(valores.tolist()))
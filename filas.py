@@ -0,0 +1,519 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+
+# =========================
+# TAXAS POR CIDADE E HORA
+# =========================
+CHAVES_HORA = ["CIDADE", "hora_dia"]
+
+
+def taxas_por_hora(df, chaves=CHAVES_HORA):
+    # chegadas: atribuições por hora, em média sobre os dias observados da
+    # cidade; serviço: duração + deslocamento de quem chegou naquela hora
+    dias = (
+        df.assign(dia=df["ATRIBUICAO_TS"].dt.normalize())
+        .groupby(chaves[0])["dia"].nunique()
+        .rename("dias")
+    )
+    taxas = (
+        df.groupby(chaves, as_index=False)
+        .agg(chegadas=("ATRIBUICAO_TS", "size"), servico_medio_min=("servico_min", "mean"))
+        .merge(dias, left_on=chaves[0], right_index=True)
+    )
+    taxas["lambda_h"] = taxas["chegadas"] / taxas["dias"]
+    taxas["mu_h"] = 60 / taxas["servico_medio_min"].where(taxas["servico_medio_min"] > 0)
+    taxas["carga_erlang"] = taxas["lambda_h"] / taxas["mu_h"]
+    return taxas
+
+
+# =========================
+# ERLANG C
+# =========================
+def erlang_c(carga, equipes, bloqueio):
+    # probabilidade de espera com c equipes a partir do Erlang B das mesmas c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        espera = equipes * bloqueio / (equipes - carga * (1 - bloqueio))
+    # sem estabilidade (equipes <= carga) a fila cresce sem limite
+    return np.where(equipes > carga, np.clip(espera, 0, 1), 1.0)
+
+
+def espera_media_min(lambda_h, mu_h, equipes, prob_espera):
+    folga = equipes * mu_h - lambda_h
+    with np.errstate(divide="ignore", invalid="ignore"):
+        espera = np.where(folga > 0, prob_espera / folga * 60, np.inf)
+    return np.where(lambda_h > 0, espera, 0.0)
+
+
+def dimensionar(taxas, alvo_espera_min, max_equipes=50):
+    # menor número de equipes com espera média dentro do alvo: c = 1, 2, ...
+    # pela recorrência de Erlang B (estável para cargas altas), só nas linhas
+    # que ainda não atingiram o alvo
+    carga = taxas["carga_erlang"].to_numpy(dtype=float)
+    lambda_h = taxas["lambda_h"].to_numpy(dtype=float)
+    mu_h = taxas["mu_h"].to_numpy(dtype=float)
+
+    equipes = np.full(len(taxas), np.nan)
+    prob = np.full(len(taxas), np.nan)
+    espera = np.full(len(taxas), np.nan)
+
+    # sem tempo de serviço conhecido não há como dimensionar
+    pendentes = np.flatnonzero(~np.isnan(mu_h))
+    bloqueio = np.ones(len(pendentes))
+    for c in range(1, max_equipes + 1):
+        if not len(pendentes):
+            break
+        a = carga[pendentes]
+        bloqueio = a * bloqueio / (c + a * bloqueio)
+        p = erlang_c(a, c, bloqueio)
+        w = espera_media_min(lambda_h[pendentes], mu_h[pendentes], c, p)
+
+        atende = w <= alvo_espera_min
+        linhas = pendentes[atende]
+        equipes[linhas] = c
+        prob[linhas] = p[atende]
+        espera[linhas] = w[atende]
+        pendentes, bloqueio = pendentes[~atende], bloqueio[~atende]
+
+    resultado = taxas.copy()
+    resultado["equipes_necessarias"] = equipes
+    resultado["prob_espera"] = prob
+    resultado["espera_prevista_min"] = espera
+    return resultado
+
+
+# =========================
+# SIMULAÇÃO DE EVENTOS DISCRETOS
+# =========================
+MINUTOS_DIA = 24 * 60
+
+
+def montar_calendario(equipes_turno, inicio_turno_h=0, fim_turno_h=24, equipes_fora_turno=0):
+    # equipes em serviço por hora do dia; turno que passa da meia-noite
+    # (início > fim) é aceito
+    horas = np.arange(24)
+    if inicio_turno_h <= fim_turno_h:
+        no_turno = (horas >= inicio_turno_h) & (horas < fim_turno_h)
+    else:
+        no_turno = (horas >= inicio_turno_h) | (horas < fim_turno_h)
+    return np.where(no_turno, int(equipes_turno), int(equipes_fora_turno))
+
+
+def _espera_escala(calendario):
+    # espera[k][h]: horas até a equipe k entrar em serviço a partir da hora h
+    calendario = np.asarray(calendario, dtype=int)
+    espera = []
+    for k in range(int(calendario.max(initial=0))):
+        em_servico = calendario > k
+        proxima = np.full(24, -1)
+        for h in range(24):
+            for passo in range(24):
+                if em_servico[(h + passo) % 24]:
+                    proxima[h] = passo
+                    break
+        espera.append(proxima.tolist())
+    return espera
+
+
+def simular_fila(chegadas_min, servicos_min, calendario):
+    # fila única FIFO; a OS vai para a equipe que fica livre primeiro entre
+    # as que estão em serviço (sem interromper atendimento no fim do turno)
+    escala = _espera_escala(calendario)
+    livre = [(0.0, k) for k in range(len(escala))]
+    heapq.heapify(livre)
+
+    inicios = np.full(len(chegadas_min), np.nan)
+    if not livre:
+        return inicios
+
+    for i, (chegada, servico) in enumerate(zip(chegadas_min, servicos_min)):
+        while True:
+            livre_em, k = heapq.heappop(livre)
+            candidato = max(chegada, livre_em)
+            minuto_dia = candidato % MINUTOS_DIA
+            horas = escala[k][int(minuto_dia // 60)]
+            if horas == 0:
+                break
+            # fora da escala: a equipe volta à fila no próximo início de hora
+            heapq.heappush(livre, (candidato - minuto_dia % 60 + horas * 60, k))
+        inicios[i] = candidato
+        heapq.heappush(livre, (candidato + servico, k))
+
+    return inicios
+
+
+def replay_fila(df, calendario, chave="CIDADE"):
+    # reaplica as atribuições reais com a escala informada, cidade a cidade
+    dados = df.dropna(subset=["ATRIBUICAO_TS"]).sort_values([chave, "ATRIBUICAO_TS"])
+    servico = dados["servico_min"].fillna(
+        dados.groupby(chave)["servico_min"].transform("median")
+    ).fillna(0).clip(lower=0)
+
+    origem = dados["ATRIBUICAO_TS"].min().normalize() if len(dados) else pd.Timestamp(0)
+    chegadas = (dados["ATRIBUICAO_TS"] - origem).dt.total_seconds().to_numpy() / 60
+    servicos = servico.to_numpy(dtype=float)
+
+    inicios = np.full(len(dados), np.nan)
+    for posicoes in dados.groupby(chave, sort=False).indices.values():
+        inicios[posicoes] = simular_fila(
+            chegadas[posicoes].tolist(), servicos[posicoes].tolist(), calendario
+        )
+
+    resultado = dados[[chave, "ATRIBUICAO_TS"]].copy()
+    resultado["fila_min"] = dados["fila_min"] if "fila_min" in dados else np.nan
+    resultado["fila_simulada_min"] = inicios - chegadas
+    return resultado
+
+
+# =========================
+# FILA EM ESPERA POR MINUTO
+# =========================
+MINUTO = np.timedelta64(1, "m")
+
+
+def fila_por_minuto(entrada, saida):
+    # +1 no minuto da atribuição, -1 no minuto do início; a soma acumulada
+    # dá quantas OS estão esperando em cada minuto (intervalo [entrada, saída))
+    entrada = pd.to_datetime(pd.Series(entrada)).to_numpy(dtype="datetime64[m]")
+    saida = pd.to_datetime(pd.Series(saida)).to_numpy(dtype="datetime64[m]")
+    validos = ~(np.isnat(entrada) | np.isnat(saida))
+    entrada, saida = entrada[validos], saida[validos]
+    saida = np.maximum(saida, entrada)
+
+    if not len(entrada):
+        return pd.Series(dtype=np.int64, index=pd.DatetimeIndex([], name="minuto"))
+
+    origem = entrada.min()
+    fim = saida.max()
+    n = int((fim - origem) / MINUTO) + 1
+    eventos = (
+        np.bincount(((entrada - origem) / MINUTO).astype(np.int64), minlength=n)
+        - np.bincount(((saida - origem) / MINUTO).astype(np.int64), minlength=n)
+    )
+    return pd.Series(
+        np.cumsum(eventos),
+        index=pd.date_range(origem, periods=n, freq="min", name="minuto"),
+    )
+
+
+def reamostrar_fila(fila, regra="1h"):
+    # média no tempo e pico dentro de cada janela
+    return fila.resample(regra).agg(["mean", "max"]).rename(
+        columns={"mean": "fila_media", "max": "fila_pico"}
+    )
+
+
+def kpis_fila_diaria(fila, quantil=0.95):
+    por_dia = fila.groupby(fila.index.normalize())
+    return pd.DataFrame({
+        "fila_media": por_dia.mean(),
+        "fila_pico": por_dia.max(),
+        f"fila_p{int(quantil * 100)}": por_dia.quantile(quantil),
+    }).rename_axis("dia")
+
+
+# =========================
+# SKETCHES DE QUANTIS
+# =========================
+# histogramas com faixas logarítmicas: erro relativo limitado e soma direta
+# entre grupos (cidade, dia, hora), sem voltar às linhas
+ERRO_RELATIVO_SKETCH = 0.02
+MINIMO_SKETCH_MIN = 0.5
+MAXIMO_SKETCH_MIN = 90 * 1440
+
+GAMA_SKETCH = (1 + ERRO_RELATIVO_SKETCH) / (1 - ERRO_RELATIVO_SKETCH)
+FAIXAS_SKETCH = int(np.ceil(np.log(MAXIMO_SKETCH_MIN / MINIMO_SKETCH_MIN) / np.log(GAMA_SKETCH))) + 2
+
+CHAVES_SKETCH = ["CIDADE", "data", "hora_dia"]
+
+
+def faixa_sketch(valores):
+    # faixa 0: valores abaixo do mínimo (inclui zero); NaN -> -1
+    valores = np.asarray(valores, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        faixa = np.ceil(np.log(valores / MINIMO_SKETCH_MIN) / np.log(GAMA_SKETCH)) + 1
+    faixa = np.clip(np.nan_to_num(faixa, nan=0, neginf=0), 0, FAIXAS_SKETCH - 1)
+    faixa[valores < MINIMO_SKETCH_MIN] = 0
+    faixa[np.isnan(valores)] = -1
+    return faixa.astype(np.int64)
+
+
+def valor_faixa(faixa):
+    # ponto da faixa com erro relativo simétrico
+    faixa = np.asarray(faixa)
+    valor = MINIMO_SKETCH_MIN * 2 * GAMA_SKETCH ** (faixa - 1) / (GAMA_SKETCH + 1)
+    return np.where(faixa <= 0, 0.0, valor)
+
+
+def construir_sketches(df, colunas, chaves=CHAVES_SKETCH):
+    # formato esparso: só as faixas ocupadas de cada grupo
+    grupos = df.groupby(chaves, sort=True)
+    codigo = grupos.ngroup().to_numpy()
+    indice = grupos.size().reset_index(name="linhas")
+
+    contagens = {}
+    for coluna in colunas:
+        faixa = faixa_sketch(df[coluna].to_numpy(dtype=float))
+        validos = faixa >= 0
+        chave, contagem = np.unique(
+            codigo[validos] * FAIXAS_SKETCH + faixa[validos], return_counts=True
+        )
+        contagens[coluna] = {
+            "grupo": (chave // FAIXAS_SKETCH).astype(np.int32),
+            "faixa": (chave % FAIXAS_SKETCH).astype(np.int16),
+            "contagem": contagem.astype(np.uint32),
+        }
+
+    return {"indice": indice, "contagens": contagens}
+
+
+def quantis_contagem(contagem, qs):
+    # contagem: (..., faixas); quantis pela posição na distribuição acumulada
+    contagem = np.asarray(contagem, dtype=np.int64)
+    acumulado = np.cumsum(contagem, axis=-1)
+    total = acumulado[..., -1:]
+    resultado = []
+    for q in qs:
+        posicao = np.floor(q * np.maximum(total - 1, 0))
+        faixa = (acumulado <= posicao).sum(axis=-1)
+        resultado.append(np.where(total[..., 0] > 0, valor_faixa(faixa), np.nan))
+    return np.stack(resultado, axis=-1)
+
+
+def quantis_sketch(sketches, mascara, qs=(0.5, 0.9, 0.99), por="hora_dia"):
+    # mescla os grupos selecionados (por hora, por padrão) e lê os quantis
+    indice = sketches["indice"]
+    mascara = np.asarray(mascara, dtype=bool)
+    colunas_por = [por] if isinstance(por, str) else list(por)
+    chaves = indice.loc[mascara, colunas_por]
+    rotulos = pd.MultiIndex.from_frame(chaves.drop_duplicates().sort_values(colunas_por))
+    posicao = rotulos.get_indexer(pd.MultiIndex.from_frame(chaves))
+    if isinstance(por, str):
+        rotulos = rotulos.get_level_values(0)
+
+    rotulo_grupo = np.full(len(indice), -1, dtype=np.int64)
+    rotulo_grupo[mascara] = posicao
+
+    tabelas = []
+    for coluna, contagem in sketches["contagens"].items():
+        rotulo = rotulo_grupo[contagem["grupo"]]
+        selecionados = rotulo >= 0
+        mesclada = np.bincount(
+            rotulo[selecionados] * FAIXAS_SKETCH + contagem["faixa"][selecionados],
+            weights=contagem["contagem"][selecionados],
+            minlength=len(rotulos) * FAIXAS_SKETCH,
+        ).reshape(len(rotulos), FAIXAS_SKETCH)
+        valores = quantis_contagem(mesclada, qs)
+        tabelas.append(pd.DataFrame(
+            valores,
+            index=rotulos,
+            columns=[f"{coluna}_p{int(round(q * 100))}" for q in qs],
+        ))
+    return pd.concat(tabelas, axis=1)
+
+
+# =========================
+# PERFIL DE TODAS AS CIDADES
+# =========================
+def perfil_cidades(df, sketches, qs=(0.5, 0.9)):
+    # uma passada por (CIDADE, hora): volumes por dia observado da cidade,
+    # esperas médias e quantis dos sketches; devolve {cidade: perfil}
+    dias = df.groupby("CIDADE")["data"].nunique()
+    atribuicoes = df.groupby(["CIDADE", "hora_dia"]).agg(
+        atribuicoes=("ATRIBUICAO_TS", "size"),
+        fila_media_min=("fila_min", "mean"),
+        coi_media_min=("coi_min", "mean"),
+    )
+    inicios = (
+        df.groupby(["CIDADE", "hora_ini_dia"]).size()
+        .rename_axis(["CIDADE", "hora_dia"]).rename("inicios")
+    )
+    todos = np.ones(len(sketches["indice"]), dtype=bool)
+    quantis = quantis_sketch(sketches, todos, qs, por=["CIDADE", "hora_dia"])
+
+    horas = pd.MultiIndex.from_product([dias.index, range(24)], names=["CIDADE", "hora_dia"])
+    tabela = (
+        pd.concat([atribuicoes, inicios, quantis], axis=1)
+        .reindex(horas)
+        .fillna({"atribuicoes": 0, "inicios": 0})
+    )
+    dias_linha = dias.reindex(tabela.index.get_level_values("CIDADE")).to_numpy()
+    tabela["atribuicoes_dia"] = tabela["atribuicoes"] / dias_linha
+    tabela["inicios_dia"] = tabela["inicios"] / dias_linha
+
+    perfis = {cidade: perfil.droplevel("CIDADE") for cidade, perfil in tabela.groupby(level="CIDADE")}
+
+    quantis_cidade = quantis_sketch(sketches, todos, qs, por="CIDADE")
+    ranking = pd.DataFrame({
+        "dias": dias,
+        "atribuicoes_dia": df.groupby("CIDADE").size() / dias,
+        "fila_media_min": df.groupby("CIDADE")["fila_min"].mean(),
+        "coi_media_min": df.groupby("CIDADE")["coi_min"].mean(),
+        "hora_pico": tabela["atribuicoes"].unstack().idxmax(axis=1),
+    }).join(quantis_cidade[[c for c in quantis_cidade.columns if c.startswith("fila_min")]])
+    ranking = ranking.sort_values(f"fila_min_p{int(round(qs[-1] * 100))}", ascending=False)
+
+    return perfis, ranking.rename_axis("CIDADE").reset_index()
+
+
+# =========================
+# DIA DA SEMANA x HORA E ANOMALIAS
+# =========================
+DIAS_SEMANA = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+
+def _ocorrencias(cidades, instantes):
+    # quantas vezes cada dia da semana aparece no histórico da cidade,
+    # contado nas datas do próprio instante que está sendo agregado
+    datas = instantes.dt.normalize()
+    return (
+        pd.DataFrame({"CIDADE": cidades, "dia_semana": datas.dt.dayofweek, "data": datas})
+        .groupby(["CIDADE", "dia_semana"])["data"].nunique()
+    )
+
+
+def cubo_semana_hora(df):
+    # volumes normalizados pelo número de vezes que cada dia da semana
+    # aparece no histórico da cidade: atribuições pelas datas de
+    # atribuição, inícios pelas datas de início
+    dados = df.assign(dia_semana=df["ATRIBUICAO_TS"].dt.dayofweek)
+    dias_atribuicao = _ocorrencias(dados["CIDADE"], dados["ATRIBUICAO_TS"])
+    dias_inicio = _ocorrencias(dados["CIDADE"], dados["INICIO_TS"])
+
+    atribuicoes = dados.groupby(["CIDADE", "dia_semana", "hora_dia"]).agg(
+        atribuicoes=("ATRIBUICAO_TS", "size"),
+        fila_media_min=("fila_min", "mean"),
+    )
+    inicios = (
+        dados.assign(dia_semana=dados["INICIO_TS"].dt.dayofweek)
+        .groupby(["CIDADE", "dia_semana", "hora_ini_dia"]).size()
+        .rename_axis(["CIDADE", "dia_semana", "hora_dia"]).rename("inicios")
+    )
+
+    grade = pd.MultiIndex.from_product(
+        [dias_atribuicao.index.get_level_values("CIDADE").unique(), range(7), range(24)],
+        names=["CIDADE", "dia_semana", "hora_dia"],
+    )
+    cubo = (
+        pd.concat([atribuicoes, inicios], axis=1)
+        .reindex(grade)
+        .fillna({"atribuicoes": 0, "inicios": 0})
+    )
+    dia_semana = cubo.index.droplevel("hora_dia")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cubo["atribuicoes_dia"] = cubo["atribuicoes"] / dias_atribuicao.reindex(dia_semana).to_numpy()
+        cubo["inicios_dia"] = cubo["inicios"] / dias_inicio.reindex(dia_semana).to_numpy()
+    return cubo
+
+
+def _media_movel_anterior(matriz, janela, minimo):
+    # média e desvio das `janela` colunas anteriores (sem a atual), por linha,
+    # com somas acumuladas; NaN não entra na conta
+    presente = ~np.isnan(matriz)
+    valores = np.where(presente, matriz, 0.0)
+    zeros = np.zeros((matriz.shape[0], 1))
+
+    def janela_anterior(x):
+        acumulado = np.concatenate([zeros, np.cumsum(x, axis=1)], axis=1)
+        fim = np.arange(matriz.shape[1])
+        inicio = np.maximum(fim - janela, 0)
+        return acumulado[:, fim] - acumulado[:, inicio]
+
+    n = janela_anterior(presente.astype(float))
+    soma = janela_anterior(valores)
+    soma_quadrados = janela_anterior(valores ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = soma / n
+        variancia = (soma_quadrados - n * media ** 2) / (n - 1)
+    desvio = np.sqrt(np.clip(variancia, 0, None))
+    media[n < minimo] = np.nan
+    desvio[n < minimo] = np.nan
+    return media, desvio
+
+
+def anomalias_diarias(df, janela=28, limite_z=3.0, minimo_dias=7):
+    # z-score de cada dia contra os `janela` dias anteriores da mesma cidade,
+    # em matriz cidades x dias (sem laço por dia)
+    diario = df.groupby(["CIDADE", "data"]).agg(
+        atribuicoes=("ATRIBUICAO_TS", "size"),
+        fila_media_min=("fila_min", "mean"),
+    )
+    if diario.empty:
+        return diario.reset_index()
+
+    datas = pd.date_range(
+        diario.index.get_level_values("data").min(),
+        diario.index.get_level_values("data").max(),
+        freq="D",
+    )
+    resultado = []
+    for coluna in ["atribuicoes", "fila_media_min"]:
+        matriz = diario[coluna].unstack("data").reindex(columns=datas)
+        media, desvio = _media_movel_anterior(matriz.to_numpy(dtype=float), janela, minimo_dias)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (matriz.to_numpy(dtype=float) - media) / desvio
+        z[~np.isfinite(z)] = np.nan
+        resultado.append(
+            pd.DataFrame(z, index=matriz.index, columns=datas)
+            .rename_axis(columns="data").stack().rename(f"z_{coluna}")
+        )
+
+    anomalias = diario.join(pd.concat(resultado, axis=1), how="left")
+    # acúmulo anormal de fila: espera muito acima do histórico recente
+    anomalias["anomalia"] = anomalias["z_fila_media_min"].gt(limite_z)
+    return anomalias.reset_index()
+
+
+# =========================
+# BACKLOG COI x CAMPO
+# =========================
+# instante de um evento que ainda não aconteceu (OS ainda aberta naquele estado)
+ABERTO = np.iinfo(np.int64).max
+
+
+def _ns_aberto(serie):
+    ns = pd.Series(serie, copy=False).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return np.where(ns == np.iinfo(np.int64).min, ABERTO, ns)
+
+
+def eventos_backlog(df, chave="CIDADE"):
+    # instantes ordenados de criação, atribuição e início por chave, em ns.
+    # Espera o frame bruto: atribuição ou início sem data (NaT) é evento que
+    # ainda não aconteceu, e a OS segue aguardando. Sem CRIACAO_TS a OS não
+    # passa pelo backlog do COI; sem criação nem atribuição ela fica de fora
+    atribuicao = _ns_aberto(df["ATRIBUICAO_TS"])
+    criacao = np.minimum(_ns_aberto(df["CRIACAO_TS"]), atribuicao)
+    inicio = np.maximum(_ns_aberto(df["INICIO_TS"]), atribuicao)
+    conhecida = (criacao != ABERTO) & df[chave].notna().to_numpy()
+
+    eventos = pd.DataFrame({
+        chave: df[chave].to_numpy()[conhecida],
+        "criacao": criacao[conhecida],
+        "atribuicao": atribuicao[conhecida],
+        "inicio": inicio[conhecida],
+    })
+    return {
+        grupo: {coluna: np.sort(bloco[coluna].to_numpy()) for coluna in ["criacao", "atribuicao", "inicio"]}
+        for grupo, bloco in eventos.groupby(chave, sort=True)
+    }
+
+
+def backlog_em(eventos, instantes):
+    # consulta "as-of": em cada instante, criadas - atribuídas aguardam o COI
+    # e atribuídas - iniciadas aguardam o campo
+    instantes = pd.DatetimeIndex(instantes)
+    t = instantes.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    criadas, atribuidas, iniciadas = (
+        np.searchsorted(eventos[coluna], t, side="right")
+        for coluna in ["criacao", "atribuicao", "inicio"]
+    )
+    return pd.DataFrame(
+        {"aguardando_coi": criadas - atribuidas, "aguardando_campo": atribuidas - iniciadas},
+        index=instantes,
+    )
+
+
+def serie_backlog(eventos, inicio, fim, freq="15min"):
+    return backlog_em(eventos, pd.date_range(inicio, fim, freq=freq))
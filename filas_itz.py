@@ -1,43 +1,95 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 
+import conversao_tempo
+import filas
+
 st.set_page_config(layout="wide", page_title="Análise de Filas")
 
 # =========================
 # LOAD DATA
 # =========================
 @st.cache_data
-def load_data():
+def load_bruto():
     df = pd.read_excel("TEORIA_FILAS_ITZ.xlsx")
+
+    # =========================
+    # DATETIME (ROBUST)
+    # =========================
+    df["CRIACAO_TS"] = pd.to_datetime(df["CRIACAO_TS"], errors="coerce")
+    df["ATRIBUICAO_TS"] = pd.to_datetime(df["ATRIBUICAO_TS"], errors="coerce")
+    df["INICIO_TS"] = pd.to_datetime(df["INICIO_TS"], errors="coerce")
     return df
 
-df = load_data()
 
-# =========================
-# DATETIME (ROBUST)
-# =========================
-df["CRIACAO_TS"] = pd.to_datetime(df["CRIACAO_TS"], errors="coerce")
-df["ATRIBUICAO_TS"] = pd.to_datetime(df["ATRIBUICAO_TS"], errors="coerce")
-df["INICIO_TS"] = pd.to_datetime(df["INICIO_TS"], errors="coerce")
+@st.cache_data
+def load_data():
+    # remove broken rows
+    df = load_bruto().dropna(subset=["ATRIBUICAO_TS", "INICIO_TS"]).copy()
+
+    # =========================
+    # FEATURES
+    # =========================
+    df["hora_atr"] = df["ATRIBUICAO_TS"].dt.floor("h")
+    df["hora_ini"] = df["INICIO_TS"].dt.floor("h")
+
+    df["data"] = df["ATRIBUICAO_TS"].dt.normalize()
+    df["hora_dia"] = df["ATRIBUICAO_TS"].dt.hour
+    df["hora_ini_dia"] = df["INICIO_TS"].dt.hour
+
+    # waiting time (minutes)
+    df["fila_min"] = (df["INICIO_TS"] - df["ATRIBUICAO_TS"]).dt.total_seconds() / 60
+
+    # COI delay (minutes)
+    df["coi_min"] = (df["ATRIBUICAO_TS"] - df["CRIACAO_TS"]).dt.total_seconds() / 60
+
+    # service time: execution + travel (minutes)
+    df["servico_min"] = (
+        conversao_tempo.para_timedelta(df["DURACAO"])
+        .add(conversao_tempo.para_timedelta(df["DESLOCAMENTO"]), fill_value=pd.Timedelta(0))
+        .dt.total_seconds() / 60
+    )
+    return df
 
-# remove broken rows
-df = df.dropna(subset=["ATRIBUICAO_TS", "INICIO_TS"])
 
-# =========================
-# FEATURES
-# =========================
-df["hora_atr"] = df["ATRIBUICAO_TS"].dt.floor("h")
-df["hora_ini"] = df["INICIO_TS"].dt.floor("h")
+@st.cache_data
+def load_sketches():
+    # quantile sketches per (CIDADE, data, hora_dia), merged on demand
+    return filas.construir_sketches(load_data(), ["fila_min", "coi_min"])
 
-df["hora_dia"] = df["ATRIBUICAO_TS"].dt.hour
-df["hora_ini_dia"] = df["INICIO_TS"].dt.hour
 
-# waiting time (minutes)
-df["fila_min"] = (df["INICIO_TS"] - df["ATRIBUICAO_TS"]).dt.total_seconds() / 60
+@st.cache_data
+def load_perfis():
+    # (CIDADE, hora_dia) profile for every city, computed once
+    return filas.perfil_cidades(load_data(), load_sketches())
+
 
-# COI delay (minutes)
-df["coi_min"] = (df["ATRIBUICAO_TS"] - df["CRIACAO_TS"]).dt.total_seconds() / 60
+@st.cache_data
+def load_cubo():
+    # weekday x hour cube for every city, computed once
+    return filas.cubo_semana_hora(load_data())
+
+
+@st.cache_data
+def load_anomalias(janela, limite_z):
+    # daily z-scores for every city and day at once
+    return filas.anomalias_diarias(load_data(), janela, limite_z)
+
+
+@st.cache_data
+def load_eventos_backlog():
+    # sorted creation/assignment/start instants per city for as-of queries;
+    # from the raw frame, so OS not yet assigned or started still count
+    return filas.eventos_backlog(load_bruto())
+
+
+df = load_data()
+sketches = load_sketches()
+perfis_cidades, ranking_cidades = load_perfis()
+cubo_semana = load_cubo()
+eventos_backlog = load_eventos_backlog()
 
 # =========================
 # FILTERS
@@ -56,12 +108,16 @@ with col2:
     periodo = st.date_input("Período", [data_min, data_max])
 
 df = df[df["CIDADE"] == cidade_sel]
+selecao_sketch = sketches["indice"]["CIDADE"].eq(cidade_sel).to_numpy()
 
 if len(periodo) == 2:
     df = df[
         (df["ATRIBUICAO_TS"].dt.date >= periodo[0]) &
         (df["ATRIBUICAO_TS"].dt.date <= periodo[1])
     ]
+    selecao_sketch &= sketches["indice"]["data"].between(
+        pd.Timestamp(periodo[0]), pd.Timestamp(periodo[1])
+    ).to_numpy()
 
 # =========================
 # AGGREGATIONS (AVERAGE DAY)
@@ -78,6 +134,9 @@ fila_hora = df.groupby("hora_dia")["fila_min"].mean()
 coi_hora = df.groupby("hora_dia")["coi_min"].mean()
 field_hora = df.groupby("hora_dia")["fila_min"].mean()
 
+# Percentiles from the merged sketches (no row scan)
+quantis_hora = filas.quantis_sketch(sketches, selecao_sketch)
+
 # =========================
 # PLOTS
 # =========================
@@ -98,14 +157,18 @@ ax.grid(True, linestyle="--", alpha=0.4)
 st.pyplot(fig)
 
 # ---- 2. Waiting Time
-st.subheader("Tempo Médio de Espera por Hora")
+st.subheader("Tempo de Espera por Hora")
 
 fig, ax = plt.subplots(figsize=(10, 5))
 
-ax.plot(fila_hora.index, fila_hora.values)
+ax.plot(fila_hora.index, fila_hora.values, label="Média")
+ax.plot(quantis_hora.index, quantis_hora["fila_min_p50"], label="p50")
+ax.plot(quantis_hora.index, quantis_hora["fila_min_p90"], label="p90")
+ax.plot(quantis_hora.index, quantis_hora["fila_min_p99"], label="p99", linestyle="--")
 
 ax.set_xticks(range(24))
 ax.set_xlabel("Hora do dia")
+ax.legend()
 ax.grid(True, linestyle="--", alpha=0.4)
 
 st.pyplot(fig)
@@ -115,12 +178,329 @@ st.subheader("Decomposição do Tempo de Espera (COI vs Campo)")
 
 fig, ax = plt.subplots(figsize=(10, 5))
 
-ax.plot(coi_hora.index, coi_hora.values, label="COI")
-ax.plot(field_hora.index, field_hora.values, label="Campo")
+ax.plot(coi_hora.index, coi_hora.values, label="COI (média)")
+ax.plot(field_hora.index, field_hora.values, label="Campo (média)")
+ax.plot(quantis_hora.index, quantis_hora["coi_min_p50"], label="COI (p50)", linestyle="--")
+ax.plot(quantis_hora.index, quantis_hora["fila_min_p50"], label="Campo (p50)", linestyle="--")
 
 ax.set_xticks(range(24))
 ax.set_xlabel("Hora do dia")
 ax.legend()
 ax.grid(True, linestyle="--", alpha=0.4)
 
-st.pyplot(fig)
\ No newline at end of file
+st.pyplot(fig)
+
+# ---- 4. Staffing (Erlang C)
+st.subheader("Dimensionamento por Hora (Erlang C)")
+
+col1, col2 = st.columns(2)
+alvo_espera = col1.number_input("Espera média alvo (min)", min_value=1, max_value=480, value=30, step=5)
+max_equipes = col2.number_input("Máximo de equipes avaliadas", min_value=1, max_value=200, value=40, step=5)
+
+taxas = filas.taxas_por_hora(df)
+dimensionamento = filas.dimensionar(taxas, alvo_espera, int(max_equipes))
+
+fig, ax = plt.subplots(figsize=(10, 5))
+
+ax.bar(dimensionamento["hora_dia"], dimensionamento["equipes_necessarias"])
+
+ax.set_xticks(range(24))
+ax.set_xlabel("Hora do dia")
+ax.set_ylabel("Equipes necessárias")
+ax.grid(True, linestyle="--", alpha=0.4)
+
+st.pyplot(fig)
+
+st.dataframe(
+    dimensionamento[[
+        "hora_dia", "lambda_h", "servico_medio_min", "carga_erlang",
+        "equipes_necessarias", "prob_espera", "espera_prevista_min",
+    ]].rename(columns={
+        "hora_dia": "Hora",
+        "lambda_h": "Chegadas/h",
+        "servico_medio_min": "Serviço médio (min)",
+        "carga_erlang": "Carga (erlangs)",
+        "equipes_necessarias": "Equipes necessárias",
+        "prob_espera": "P(espera)",
+        "espera_prevista_min": "Espera prevista (min)",
+    }).style.format({
+        "Chegadas/h": "{:.2f}",
+        "Serviço médio (min)": "{:.1f}",
+        "Carga (erlangs)": "{:.2f}",
+        "Equipes necessárias": "{:.0f}",
+        "P(espera)": "{:.1%}",
+        "Espera prevista (min)": "{:.1f}",
+    }),
+    hide_index=True,
+    use_container_width=True,
+)
+
+# ---- 5. Queue replay (discrete-event simulation)
+st.subheader("Replay das Atribuições com Equipes Simuladas")
+
+sugestao = int(dimensionamento["equipes_necessarias"].median()) if dimensionamento["equipes_necessarias"].notna().any() else 1
+
+col1, col2, col3 = st.columns(3)
+equipes_turno = col1.number_input("Equipes no turno", min_value=1, max_value=200, value=max(sugestao, 1))
+turno = col2.slider("Turno (hora de início e fim)", 0, 24, (7, 19))
+equipes_fora = col3.number_input("Equipes fora do turno", min_value=0, max_value=200, value=1)
+
+calendario = filas.montar_calendario(equipes_turno, turno[0], turno[1], equipes_fora)
+replay = filas.replay_fila(df, calendario)
+
+resumo_replay = pd.DataFrame({
+    nome: [replay[coluna].mean(), *replay[coluna].quantile([0.5, 0.9, 0.95])]
+    for nome, coluna in [("Observada", "fila_min"), ("Simulada", "fila_simulada_min")]
+}, index=["Média", "p50", "p90", "p95"])
+
+fig, ax = plt.subplots(figsize=(10, 5))
+
+limite = max(np.nan_to_num(pd.concat([replay["fila_min"], replay["fila_simulada_min"]]).quantile(0.99)), 1)
+faixas = np.linspace(0, limite, 50)
+ax.hist(replay["fila_min"].clip(upper=limite), bins=faixas, alpha=0.5, label="Observada")
+ax.hist(replay["fila_simulada_min"].clip(upper=limite), bins=faixas, alpha=0.5, label="Simulada")
+
+ax.set_xlabel("Espera até o início (min)")
+ax.legend()
+ax.grid(True, linestyle="--", alpha=0.4)
+
+st.pyplot(fig)
+
+st.dataframe(resumo_replay.style.format("{:.1f}"), use_container_width=True)
+
+# staffing sweep around the chosen team count
+varredura = []
+for n in range(max(1, equipes_turno - 3), equipes_turno + 4):
+    espera = filas.replay_fila(
+        df, filas.montar_calendario(n, turno[0], turno[1], equipes_fora)
+    )["fila_simulada_min"]
+    varredura.append({
+        "Equipes no turno": n,
+        "Espera média (min)": espera.mean(),
+        "Espera p90 (min)": espera.quantile(0.9),
+    })
+
+st.dataframe(
+    pd.DataFrame(varredura).style.format({
+        "Espera média (min)": "{:.1f}",
+        "Espera p90 (min)": "{:.1f}",
+    }),
+    hide_index=True,
+    use_container_width=True,
+)
+
+# ---- 6. Queue length (minute resolution)
+st.subheader("Fila em Espera")
+
+resolucao = st.selectbox(
+    "Resolução da fila",
+    ["15min", "1h", "1D"],
+    index=1,
+    format_func={"15min": "15 minutos", "1h": "1 hora", "1D": "1 dia"}.get,
+    key="resolucao_fila",
+)
+
+fila_minuto = filas.fila_por_minuto(df["ATRIBUICAO_TS"], df["INICIO_TS"])
+fila_reamostrada = filas.reamostrar_fila(fila_minuto, resolucao)
+fila_dia = filas.kpis_fila_diaria(fila_minuto)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Pico de OS em espera", f"{fila_minuto.max():.0f}" if len(fila_minuto) else "–")
+col2.metric("p95 diário médio", f"{fila_dia['fila_p95'].mean():.1f}" if len(fila_dia) else "–")
+col3.metric("OS em espera (média)", f"{fila_minuto.mean():.1f}" if len(fila_minuto) else "–")
+
+fig, ax = plt.subplots(figsize=(10, 5))
+
+ax.fill_between(fila_reamostrada.index, fila_reamostrada["fila_pico"], alpha=0.3, label="Pico")
+ax.plot(fila_reamostrada.index, fila_reamostrada["fila_media"], label="Média")
+
+ax.set_ylabel("OS em espera")
+ax.legend()
+ax.grid(True, linestyle="--", alpha=0.4)
+fig.autofmt_xdate()
+
+st.pyplot(fig)
+
+with st.expander("Fila por dia"):
+    st.dataframe(
+        fila_dia.reset_index().rename(columns={
+            "dia": "Dia",
+            "fila_media": "Média",
+            "fila_pico": "Pico",
+            "fila_p95": "p95",
+        }).style.format({"Média": "{:.1f}", "p95": "{:.1f}"}),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+# ---- 7. City comparison (all-cities profile)
+st.subheader("Comparação entre Cidades")
+st.caption("Perfis pré-calculados sobre todo o histórico de cada cidade; volumes por dia observado.")
+
+indicadores = {
+    "atribuicoes_dia": "Atribuições por dia",
+    "inicios_dia": "Inícios por dia",
+    "fila_media_min": "Espera média (min)",
+    "fila_min_p50": "Espera p50 (min)",
+    "fila_min_p90": "Espera p90 (min)",
+    "coi_media_min": "Atraso COI médio (min)",
+}
+
+col1, col2 = st.columns([3, 1])
+cidades_comparadas = col1.multiselect(
+    "Cidades", list(perfis_cidades), default=[cidade_sel] if cidade_sel in perfis_cidades else []
+)
+indicador = col2.selectbox("Indicador", list(indicadores), format_func=indicadores.get)
+
+if cidades_comparadas:
+    colunas = min(3, len(cidades_comparadas))
+    linhas = -(-len(cidades_comparadas) // colunas)
+    fig, eixos = plt.subplots(
+        linhas, colunas, figsize=(4 * colunas, 3 * linhas), sharey=True, squeeze=False
+    )
+
+    for ax, cidade in zip(eixos.flat, cidades_comparadas):
+        perfil = perfis_cidades[cidade]
+        ax.plot(perfil.index, perfil[indicador])
+        ax.set_title(cidade)
+        ax.set_xticks(range(0, 24, 3))
+        ax.grid(True, linestyle="--", alpha=0.4)
+    for ax in list(eixos.flat)[len(cidades_comparadas):]:
+        ax.set_visible(False)
+
+    fig.supxlabel("Hora do dia")
+    fig.supylabel(indicadores[indicador])
+    fig.tight_layout()
+
+    st.pyplot(fig)
+
+st.dataframe(
+    ranking_cidades.rename(columns={
+        "CIDADE": "Cidade",
+        "dias": "Dias",
+        "atribuicoes_dia": "Atribuições/dia",
+        "fila_media_min": "Espera média (min)",
+        "fila_min_p50": "Espera p50 (min)",
+        "fila_min_p90": "Espera p90 (min)",
+        "coi_media_min": "Atraso COI médio (min)",
+        "hora_pico": "Hora de pico",
+    }).style.format({
+        "Atribuições/dia": "{:.1f}",
+        "Espera média (min)": "{:.1f}",
+        "Espera p50 (min)": "{:.1f}",
+        "Espera p90 (min)": "{:.1f}",
+        "Atraso COI médio (min)": "{:.1f}",
+    }),
+    hide_index=True,
+    use_container_width=True,
+)
+
+
+# ---- 8. Weekday x hour heatmap and abnormal days
+st.subheader("Dia da Semana x Hora e Dias Anormais")
+
+indicadores_cubo = {
+    "atribuicoes_dia": "Atribuições por dia",
+    "inicios_dia": "Inícios por dia",
+    "fila_media_min": "Espera média (min)",
+}
+
+col1, col2, col3 = st.columns(3)
+indicador_cubo = col1.selectbox(
+    "Indicador do mapa", list(indicadores_cubo), format_func=indicadores_cubo.get
+)
+janela_anomalia = col2.number_input("Janela (dias anteriores)", 7, 90, 28)
+limite_z = col3.number_input("Limite z", 1.0, 6.0, 3.0, step=0.5)
+
+mapa = cubo_semana.loc[cidade_sel, indicador_cubo].unstack("hora_dia")
+
+fig, ax = plt.subplots(figsize=(12, 3.5))
+imagem = ax.imshow(mapa.to_numpy(), aspect="auto", cmap="YlOrRd")
+ax.set_yticks(range(7))
+ax.set_yticklabels(filas.DIAS_SEMANA)
+ax.set_xticks(range(24))
+ax.set_xlabel("Hora do dia")
+fig.colorbar(imagem, ax=ax, label=indicadores_cubo[indicador_cubo])
+st.pyplot(fig)
+
+anomalias = load_anomalias(int(janela_anomalia), float(limite_z))
+anomalias_cidade = anomalias[anomalias["CIDADE"] == cidade_sel]
+if len(periodo) == 2:
+    anomalias_cidade = anomalias_cidade[
+        anomalias_cidade["data"].between(pd.Timestamp(periodo[0]), pd.Timestamp(periodo[1]))
+    ]
+sinalizados = anomalias_cidade[anomalias_cidade["anomalia"]]
+
+fig, ax = plt.subplots(figsize=(12, 3.5))
+ax.plot(anomalias_cidade["data"], anomalias_cidade["fila_media_min"], label="Espera média diária")
+ax.scatter(
+    sinalizados["data"], sinalizados["fila_media_min"], color="red", zorder=3,
+    label=f"z > {limite_z:g}",
+)
+ax.set_ylabel("Minutos")
+ax.legend()
+ax.grid(True, linestyle="--", alpha=0.4)
+st.pyplot(fig)
+
+st.caption(
+    f"{len(sinalizados)} dias com espera acima de {limite_z:g} desvios da média dos "
+    f"{int(janela_anomalia)} dias anteriores; "
+    f"{int(anomalias['anomalia'].sum())} em todas as cidades."
+)
+if not sinalizados.empty:
+    st.dataframe(
+        sinalizados.rename(columns={
+            "data": "Dia",
+            "atribuicoes": "Atribuições",
+            "fila_media_min": "Espera média (min)",
+            "z_atribuicoes": "z atribuições",
+            "z_fila_media_min": "z espera",
+        }).drop(columns=["CIDADE", "anomalia"]).style.format({
+            "Espera média (min)": "{:.1f}",
+            "z atribuições": "{:.1f}",
+            "z espera": "{:.1f}",
+        }),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+# ---- 9. Backlog: waiting for COI vs waiting for field
+st.subheader("Backlog: Aguardando COI vs Aguardando Campo")
+
+resolucoes = {"15min": "15 minutos", "1h": "1 hora", "4h": "4 horas"}
+resolucao_backlog = st.selectbox(
+    "Resolução do backlog",
+    list(resolucoes),
+    format_func=resolucoes.get,
+    key="resolucao_backlog",
+)
+
+if len(periodo) == 2 and cidade_sel in eventos_backlog:
+    backlog = filas.serie_backlog(
+        eventos_backlog[cidade_sel],
+        pd.Timestamp(periodo[0]),
+        pd.Timestamp(periodo[1]) + pd.Timedelta(days=1),
+        resolucao_backlog,
+    )
+
+    fig, ax = plt.subplots(figsize=(12, 4))
+    ax.stackplot(
+        backlog.index,
+        backlog["aguardando_coi"],
+        backlog["aguardando_campo"],
+        labels=["Aguardando COI (criada, não atribuída)", "Aguardando campo (atribuída, não iniciada)"],
+        alpha=0.8,
+    )
+    ax.set_ylabel("OS em backlog")
+    ax.legend(loc="upper left")
+    ax.grid(True, linestyle="--", alpha=0.4)
+    st.pyplot(fig)
+
+    total = backlog.sum(axis=1)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Backlog médio", f"{total.mean():.1f}")
+    col2.metric("Pico de backlog", f"{total.max()}")
+    col3.metric(
+        "Parcela no COI",
+        f"{backlog['aguardando_coi'].sum() / total.sum():.0%}" if total.sum() else "-",
+    )
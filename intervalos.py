@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+
+NS_MINUTO = 60 * 10**9
+NAT = np.iinfo(np.int64).min
+
+
+def _ns(serie):
+    # instantes exatos em int64 ns; NaT vira NAT
+    return pd.to_datetime(serie).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _fim_acumulado(grupo, inicio, fim):
+    # maior fim visto até a linha anterior dentro do grupo; na primeira
+    # linha vale o próprio início (sem lacuna nem sobreposição). O cummax
+    # reinicia nas fronteiras de grupo e fica em int64, sem perda de precisão
+    acumulado = pd.Series(fim, copy=False).groupby(grupo, sort=False).cummax().to_numpy()
+    primeira = np.ones(len(grupo), dtype=bool)
+    primeira[1:] = grupo[1:] != grupo[:-1]
+    anterior = np.empty_like(acumulado)
+    anterior[1:] = acumulado[:-1]
+    anterior[primeira] = inicio[primeira]
+    return anterior, primeira
+
+
+def _uniao(grupo, inicio, fim, n_grupos):
+    anterior, primeira = _fim_acumulado(grupo, inicio, fim)
+    contribuicao = np.maximum(fim - np.maximum(inicio, anterior), 0)
+    lacuna = np.maximum(inicio - anterior, 0)
+    cobertura = np.bincount(grupo, weights=contribuicao / NS_MINUTO, minlength=n_grupos)
+    return cobertura, anterior, primeira, lacuna
+
+
+def varrer_intervalos(df, chaves, inicio, fim, inicio_turno=None, fim_turno=None):
+    # uma passada ordenada por (grupo, início): tempo ocupado, cobertura
+    # (união), sobreposição, concorrência máxima e ociosidade dentro do turno
+    grupos = df.groupby(chaves, sort=True, dropna=False)
+    codigo = grupos.ngroup().to_numpy()
+    resumo = grupos.size().reset_index(name="atividades")
+    n_grupos = len(resumo)
+
+    s = _ns(df[inicio])
+    e = _ns(df[fim])
+    validos = (s != NAT) & (e != NAT)
+    e = np.maximum(e, s)
+
+    linhas = np.flatnonzero(validos)
+    linhas = linhas[np.lexsort((s[linhas], codigo[linhas]))]
+    g, s_ord, e_ord = codigo[linhas], s[linhas], e[linhas]
+
+    ocupado = np.bincount(g, weights=(e_ord - s_ord) / NS_MINUTO, minlength=n_grupos)
+    cobertura, anterior, primeira, lacuna = _uniao(g, s_ord, e_ord, n_grupos)
+
+    # concorrência: +1 no início, -1 no fim; fins antes de inícios no mesmo
+    # instante, para atividades encadeadas não contarem como simultâneas.
+    # cada grupo soma zero, então o cumsum ordenado por grupo não vaza
+    tempos = np.concatenate([s_ord, e_ord])
+    deltas = np.concatenate([np.ones(len(g), dtype=np.int64), -np.ones(len(g), dtype=np.int64)])
+    grupo_evento = np.concatenate([g, g])
+    ordem = np.lexsort((deltas, tempos, grupo_evento))
+    abertas = np.cumsum(deltas[ordem])
+    concorrencia = np.zeros(n_grupos, dtype=np.int64)
+    np.maximum.at(concorrencia, grupo_evento[ordem], abertas)
+
+    resumo["sem_horario"] = np.bincount(codigo[~validos], minlength=n_grupos)
+    resumo["tempo_ocupado_min"] = ocupado
+    resumo["cobertura_min"] = cobertura
+    resumo["sobreposicao_min"] = ocupado - cobertura
+    resumo["concorrencia_max"] = concorrencia
+    resumo["ociosidade_entre_atividades_min"] = np.bincount(
+        g, weights=lacuna / NS_MINUTO, minlength=n_grupos
+    )
+
+    if inicio_turno is not None and fim_turno is not None:
+        # turno da equipe-dia: primeiro valor informado de cada grupo
+        t0_grupo, t1_grupo = (
+            pd.Series(pd.to_datetime(df[coluna]).to_numpy(dtype="datetime64[ns]"))
+            .groupby(codigo).first()
+            .reindex(range(n_grupos)).to_numpy(dtype="datetime64[ns]").view(np.int64)
+            for coluna in (inicio_turno, fim_turno)
+        )
+        com_turno = (t0_grupo != NAT) & (t1_grupo != NAT)
+        turno = np.where(com_turno, np.maximum(t1_grupo - t0_grupo, 0) / NS_MINUTO, np.nan)
+
+        # intervalos recortados ao turno mantêm a ordem por início
+        recorte = com_turno[g]
+        gr = g[recorte]
+        s_turno = np.clip(s_ord[recorte], t0_grupo[gr], t1_grupo[gr])
+        e_turno = np.clip(e_ord[recorte], t0_grupo[gr], t1_grupo[gr])
+        cobertura_turno, anterior_turno, _, lacuna_turno = _uniao(gr, s_turno, e_turno, n_grupos)
+
+        maior = np.zeros(n_grupos)
+        np.maximum.at(maior, gr, lacuna_turno / NS_MINUTO)
+        com_atividade = np.bincount(gr, minlength=n_grupos) > 0
+        if len(gr):
+            primeiras = np.flatnonzero(np.diff(gr, prepend=-1))
+            ultimas = np.append(primeiras[1:], len(gr)) - 1
+            fim_coberto = np.maximum(anterior_turno[ultimas], e_turno[ultimas])
+            inicio_ocioso = (s_turno[primeiras] - t0_grupo[gr[primeiras]]) / NS_MINUTO
+            fim_ocioso = (t1_grupo[gr[ultimas]] - fim_coberto) / NS_MINUTO
+            np.maximum.at(maior, gr[primeiras], inicio_ocioso)
+            np.maximum.at(maior, gr[ultimas], fim_ocioso)
+        maior = np.where(com_atividade, maior, turno)
+
+        resumo["turno_min"] = turno
+        resumo["cobertura_turno_min"] = cobertura_turno
+        resumo["ociosidade_turno_min"] = turno - cobertura_turno
+        resumo["maior_ociosidade_min"] = maior
+
+    # por linha: maior fim anterior da equipe-dia e folga até a atividade
+    fim_anterior = np.full(len(df), NAT)
+    intervalo = np.full(len(df), np.nan)
+    fim_anterior[linhas] = np.where(primeira, NAT, anterior)
+    intervalo[linhas] = np.where(primeira, np.nan, (s_ord - anterior) / NS_MINUTO)
+
+    linha = pd.DataFrame(index=df.index)
+    linha["fim_anterior"] = pd.Series(fim_anterior.view("datetime64[ns]"), index=df.index)
+    linha["intervalo_entre_atividades_min"] = np.maximum(intervalo, 0)
+    linha["sobreposicao"] = intervalo < 0
+    linha["simultaneas"] = 0
+    if len(linhas):
+        # atividades abertas no início de cada linha, contando ela mesma
+        posicao = np.empty(len(ordem), dtype=np.int64)
+        posicao[ordem] = np.arange(len(ordem))
+        simultaneas = np.zeros(len(df), dtype=np.int64)
+        simultaneas[linhas] = abertas[posicao[: len(g)]]
+        linha["simultaneas"] = simultaneas
+
+    return resumo, linha
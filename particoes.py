@@ -0,0 +1,105 @@
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+# =========================
+# LAYOUT DO DATASET
+# =========================
+COLUNAS_PARTICAO = ["estado", "regional", "mes"]
+# tipos fixos: sem isso códigos como "01" voltariam do caminho como int 1
+ESQUEMA_PARTICAO = pa.schema([(coluna, pa.string()) for coluna in COLUNAS_PARTICAO])
+COLUNAS_DATA = ["DATA_ABERTURA_OS", "DATA_ATRIBUICAO_OS", "DATA_LIMITE_OS"]
+COLUNA_MES = "DATA_ABERTURA_OS"
+SEM_MES = "sem_data"
+
+LINHAS_POR_GRUPO = 128_000
+# versão da origem usada na última partição; arquivos com "_" não entram no dataset
+MANIFESTO = "_origem.json"
+
+
+def mes_de(datas):
+    # "AAAA-MM" direto do datetime64, sem strftime linha a linha
+    valores = pd.Series(datas, copy=False).to_numpy(dtype="datetime64[ns]")
+    meses = np.datetime_as_string(valores.astype("datetime64[M]"), unit="M")
+    meses[np.isnat(valores)] = SEM_MES
+    return meses
+
+
+def particionar(origem, destino):
+    # parquet único -> estado=/regional=/mes=/part-*.parquet
+    df = pq.read_table(origem).to_pandas()
+    for col in COLUNAS_DATA:
+        df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
+    df["mes"] = mes_de(df[COLUNA_MES])
+
+    # ordenar por data deixa as estatísticas dos row groups seletivas
+    df = df.sort_values(COLUNAS_PARTICAO + [COLUNA_MES], kind="stable")
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        destino,
+        format="parquet",
+        partitioning=COLUNAS_PARTICAO,
+        partitioning_flavor="hive",
+        max_rows_per_group=LINHAS_POR_GRUPO,
+        existing_data_behavior="delete_matching",
+    )
+
+
+def abrir(destino):
+    return ds.dataset(
+        destino,
+        format="parquet",
+        partitioning=ds.partitioning(ESQUEMA_PARTICAO, flavor="hive"),
+    )
+
+
+def versao(origem):
+    # muda sempre que o parquet de origem é regravado
+    info = Path(origem).stat()
+    return [info.st_mtime_ns, info.st_size]
+
+
+def garantir(origem, destino):
+    # refaz o dataset inteiro quando a origem mudou desde a última partição
+    manifesto = Path(destino) / MANIFESTO
+    atual = versao(origem)
+    if not manifesto.exists() or json.loads(manifesto.read_text()) != atual:
+        shutil.rmtree(destino, ignore_errors=True)
+        particionar(origem, destino)
+        manifesto.write_text(json.dumps(atual))
+    return abrir(destino)
+
+
+# =========================
+# CONSULTAS
+# =========================
+def chaves_particao(dataset):
+    # lidas dos caminhos dos arquivos, sem abrir nenhum deles
+    chaves = [
+        ds.get_partition_keys(fragmento.partition_expression)
+        for fragmento in dataset.get_fragments()
+    ]
+    return pd.DataFrame(chaves, columns=COLUNAS_PARTICAO).drop_duplicates(ignore_index=True)
+
+
+def filtro(selecoes):
+    # {coluna: valores} -> expressão única; None deixa a coluna livre
+    expressao = None
+    for coluna, valores in selecoes.items():
+        if valores is None:
+            continue
+        condicao = pc.field(coluna).isin(list(valores))
+        expressao = condicao if expressao is None else expressao & condicao
+    return expressao
+
+
+def ler(dataset, selecoes, colunas=None):
+    return dataset.to_table(columns=colunas, filter=filtro(selecoes)).to_pandas()
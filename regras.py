@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+
+# =========================
+# LIMITES CONFIGURÁVEIS
+# =========================
+FAIXA_CONTRATUAL_MIN = 0.8
+FAIXA_CONTRATUAL_MAX = 1.2
+
+SITUACAO_ADERENCIA = {
+    "regras": [
+        (">", FAIXA_CONTRATUAL_MAX, "🔴 Alta demanda"),
+        (">=", FAIXA_CONTRATUAL_MIN, "🟢 Demanda adequada"),
+    ],
+    "padrao": "🟡 Baixa demanda",
+    "sem_dados": "⚪ Sem volumetria",
+}
+
+# limites multiplicam a volumetria da linha (referência)
+DIAGNOSTICO_DEMANDA = {
+    "regras": [
+        ("<", FAIXA_CONTRATUAL_MIN, "Demanda insuficiente"),
+        ("<=", FAIXA_CONTRATUAL_MAX, "Dentro da faixa contratual"),
+    ],
+    "padrao": "Demanda acima da volumetria",
+}
+
+NOTA_UPS = {
+    "limites": [0.70, 0.80, 0.90],
+    "rotulos": ["D", "C", "B", "A"],
+    "sem_dados": "Sem dados",
+}
+
+RISCO_UTILIZACAO = {
+    "regras": [
+        (">", 0.95, "Alto"),
+        (">", 0.85, "Moderado"),
+    ],
+    "padrao": "Baixo",
+}
+
+
+# horas entre atribuição e prazo; sem_dados quando falta uma das datas
+RISCO_PRAZO = {
+    "regras": [
+        (">", 24, ">24h"),
+        ("<=", 1, "<=1h"),
+        ("<", 6, "1–6h"),
+        ("<", 12, "6–12h"),
+    ],
+    "padrao": "12–24h",
+    "sem_dados": "SEM ATRIBUIÇÃO",
+}
+HORA_CORTE_MESMO_DIA = 18
+ROTULO_APOS_CORTE = "ATRIB. APÓS 18h (MESMO DIA)"
+
+
+def situacao_ups(limite_ups):
+    return {
+        "regras": [(">=", limite_ups, "🟢 Saudável")],
+        "padrao": "🔴 Abaixo do aceitável",
+        "sem_dados": "⚪ Sem dados",
+    }
+
+
+# =========================
+# MOTOR DE CLASSIFICAÇÃO
+# =========================
+OPERADORES = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+}
+
+
+def como_float(valores):
+    if np.isscalar(valores) or valores is None or valores is pd.NA:
+        valores = [valores]
+    return pd.to_numeric(
+        pd.Series(valores, copy=False), errors="coerce"
+    ).to_numpy(dtype=float, na_value=np.nan)
+
+
+def selecionar(condicoes, padrao):
+    # condições avaliadas em ordem: a primeira verdadeira define o rótulo
+    mascaras = [np.asarray(mascara, dtype=bool) for mascara, _ in condicoes]
+    rotulos = np.array([rotulo for _, rotulo in condicoes] + [padrao], dtype=object)
+    indices = np.select(mascaras, np.arange(len(mascaras)), default=len(mascaras))
+    return rotulos[indices]
+
+
+def aplicar_regras(valores, tabela, referencia=None, prioridades=()):
+    x = como_float(valores)
+    condicoes = list(prioridades)
+
+    if "sem_dados" in tabela:
+        condicoes.insert(0, (np.isnan(x), tabela["sem_dados"]))
+
+    fator = 1.0 if referencia is None else como_float(referencia)
+    with np.errstate(invalid="ignore"):
+        for operador, limite, rotulo in tabela["regras"]:
+            condicoes.append((OPERADORES[operador](x, limite * fator), rotulo))
+
+    return selecionar(condicoes, tabela["padrao"])
+
+
+def aplicar_faixas(valores, tabela):
+    # faixas fechadas à esquerda: limites[i-1] <= x < limites[i]
+    x = como_float(valores)
+    rotulos = np.asarray(tabela["rotulos"], dtype=object)
+    resultado = rotulos[np.digitize(x, tabela["limites"])]
+    if "sem_dados" in tabela:
+        resultado[np.isnan(x)] = tabela["sem_dados"]
+    return resultado
+
+
+def risco_prazo(atribuicao, limite, horas_ate_prazo):
+    # atribuída no dia do prazo depois do corte tem prioridade sobre as faixas
+    atribuicao = pd.Series(atribuicao, copy=False)
+    limite = pd.Series(limite, copy=False)
+    apos_corte = (
+        atribuicao.dt.normalize().eq(limite.dt.normalize())
+        & atribuicao.dt.hour.ge(HORA_CORTE_MESMO_DIA)
+    ).to_numpy()
+    return aplicar_regras(
+        horas_ate_prazo, RISCO_PRAZO, prioridades=[(apos_corte, ROTULO_APOS_CORTE)]
+    )
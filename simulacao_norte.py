@@ -0,0 +1,925 @@
+import hashlib
+import heapq
+import multiprocessing
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import intervalos
+from tarefas import TarefaCancelada
+
+
+CHAVES_EQUIPE_DIA = ["cidade_equipe", "data_turno", "equipe", "desmobilizar", "12h"]
+
+
+# =========================
+# CAPACIDADE OBSERVADA
+# =========================
+CAPACIDADE_PADRAO_MIN = 480.0
+CAPACIDADE_12H_MIN = 720.0
+
+EXTENSAO_TURNO_12H_MIN = 120.0
+INTERVALO_REFEICAO_MIN = 60.0
+# turnos acima disso descontam o intervalo de refeição
+TURNO_COM_INTERVALO_MIN = 360.0
+DESLOCAMENTO_POR_ATIVIDADE_MIN = 0.0
+
+
+def capacidade_observada(
+    df,
+    intervalo_min=INTERVALO_REFEICAO_MIN,
+    deslocamento_min=DESLOCAMENTO_POR_ATIVIDADE_MIN,
+):
+    # minutos produtivos por equipe-dia a partir dos limites do turno;
+    # NaN quando o turno não permite calcular (ausente ou inválido)
+    turnos = df.groupby(CHAVES_EQUIPE_DIA, as_index=False).agg(
+        inicio_turno=("inicio_turno", "min"),
+        fim_turno=("fim_turno", "max"),
+        atividades=("os", "count"),
+    )
+    duracao_turno = (
+        turnos["fim_turno"] - turnos["inicio_turno"]
+    ).dt.total_seconds().div(60)
+    deslocamento = turnos["atividades"] * float(deslocamento_min)
+
+    for sufixo, extensao in [("atual", 0.0), ("12h", EXTENSAO_TURNO_12H_MIN)]:
+        turno = (duracao_turno + extensao).where(duracao_turno.between(1, 24 * 60))
+        intervalo = np.where(turno > TURNO_COM_INTERVALO_MIN, float(intervalo_min), 0.0)
+        capacidade = turno - intervalo - deslocamento
+        turnos[f"capacidade_{sufixo}_min"] = capacidade.where(capacidade > 0)
+
+    return turnos[CHAVES_EQUIPE_DIA + ["capacidade_atual_min", "capacidade_12h_min"]]
+
+
+def perfil_capacidade(capacidades):
+    # mediana por equipe: cobre os dias em que o turno não foi informado
+    return capacidades.groupby("equipe", as_index=False)[
+        ["capacidade_atual_min", "capacidade_12h_min"]
+    ].median()
+
+
+def completar_capacidade(capacidades, perfil=None):
+    if perfil is None:
+        perfil = perfil_capacidade(capacidades)
+    completas = capacidades.merge(perfil, on="equipe", how="left", suffixes=("", "_perfil"))
+    for coluna, padrao in [
+        ("capacidade_atual_min", CAPACIDADE_PADRAO_MIN),
+        ("capacidade_12h_min", CAPACIDADE_12H_MIN),
+    ]:
+        completas[coluna] = (
+            completas[coluna]
+            .fillna(completas[f"{coluna}_perfil"])
+            .fillna(padrao)
+        )
+    return completas[CHAVES_EQUIPE_DIA + ["capacidade_atual_min", "capacidade_12h_min"]]
+
+
+def _utilizacao(carga, capacidade):
+    return carga / capacidade if capacidade > 0 else float("inf")
+
+
+def criar_base_equipe_dia(df, capacidades=None):
+    base = (
+        df.groupby(CHAVES_EQUIPE_DIA, as_index=False)
+        .agg(
+            atividades=("os", "count"),
+            duracao_total_min=("duracao_modelo_min", "sum"),
+            receita=("preco_a_cobrar", "sum"),
+            hora_extra_min=("hora_extra_atual_min", "sum"),
+            hora_extra_antes_min=("hora_extra_antes_turno_atual_min", "sum"),
+            hora_extra_apos_min=("hora_extra_apos_turno_atual_min", "sum"),
+            hora_extra_proposta_min=("hora_extra_proposta_min", "sum"),
+            hora_extra_antes_proposta_min=("hora_extra_antes_turno_proposta_min", "sum"),
+            hora_extra_apos_proposta_min=("hora_extra_apos_turno_proposta_min", "sum"),
+            primeiro_servico_min=("tempo_primeiro_servico_min", "max"),
+            intervalo_medio_min=("intervalo_entre_atividades_min", "mean"),
+        )
+    )
+
+    # carga = união dos intervalos modelados (início + duração do modelo),
+    # sem contar duas vezes atividades sobrepostas; OS sem horário entram
+    # com a duração inteira
+    modelado = df[CHAVES_EQUIPE_DIA + ["inicio_atividade", "inicio_turno", "fim_turno"]].assign(
+        fim_modelo=df["inicio_atividade"] + pd.to_timedelta(df["duracao_modelo_min"], unit="min")
+    )
+    varredura, _ = intervalos.varrer_intervalos(
+        modelado, CHAVES_EQUIPE_DIA, "inicio_atividade", "fim_modelo",
+        "inicio_turno", "fim_turno",
+    )
+    base = base.merge(
+        varredura[CHAVES_EQUIPE_DIA + [
+            "tempo_ocupado_min", "cobertura_min", "sobreposicao_min",
+            "concorrencia_max", "ociosidade_turno_min", "maior_ociosidade_min",
+        ]],
+        on=CHAVES_EQUIPE_DIA,
+        how="left",
+    )
+    base["carga_min"] = (
+        base["cobertura_min"] + base["duracao_total_min"] - base["tempo_ocupado_min"]
+    ).clip(lower=0)
+
+    # capacidades: saída de completar_capacidade; sem ela, valores fixos
+    if capacidades is None:
+        base["capacidade_atual_min"] = CAPACIDADE_PADRAO_MIN
+        base["capacidade_12h_min"] = CAPACIDADE_12H_MIN
+    else:
+        base = base.merge(capacidades, on=CHAVES_EQUIPE_DIA, how="left")
+        base["capacidade_atual_min"] = base["capacidade_atual_min"].fillna(CAPACIDADE_PADRAO_MIN)
+        base["capacidade_12h_min"] = base["capacidade_12h_min"].fillna(CAPACIDADE_12H_MIN)
+    base["capacidade_proposta_min"] = np.where(
+        base["12h"].eq(1), base["capacidade_12h_min"], base["capacidade_atual_min"]
+    )
+    base["utilizacao_atual"] = base["carga_min"] / base["capacidade_atual_min"].where(
+        base["capacidade_atual_min"] > 0
+    )
+    base["tempo_sem_execucao_atual_min"] = (
+        base["capacidade_atual_min"] - base["carga_min"]
+    ).clip(lower=0)
+    return base
+
+
+def consolidar_equipe_dia(base):
+    # linhas da mesma equipe-dia que diferem só em desmobilizar/12h:
+    # a carga soma, a capacidade é da equipe e não pode somar
+    return base.groupby(CHAVES_PARTICAO + ["equipe"], as_index=False).agg(
+        carga_min=("carga_min", "sum"),
+        capacidade_atual_min=("capacidade_atual_min", "max"),
+        capacidade_12h_min=("capacidade_12h_min", "max"),
+        capacidade_proposta_min=("capacidade_proposta_min", "max"),
+    )
+
+
+# =========================
+# FILA DE PRIORIDADE POR CIDADE E DIA
+# =========================
+CHAVES_PARTICAO = ["cidade_equipe", "data_turno"]
+
+# abaixo disso o custo de subir os processos supera o ganho
+PARTICOES_MINIMAS_PARALELO = 200
+# a gulosa é quase toda serial (montagem da base e das partições): só a
+# busca local tem trabalho por partição que pague o envio aos processos
+TRABALHO_MINIMO_PARALELO_S = 2.0
+
+
+# segundos por partição medidos nas execuções seriais, por (modo, orçamento);
+# o orçamento da busca é só um teto e quase nunca é gasto inteiro
+_custo_particao = {}
+
+
+def compensa_paralelo(modo, orcamento_s, n_particoes):
+    # sem medição ainda, a primeira execução é serial e mede o custo
+    custo = _custo_particao.get((modo, orcamento_s), 0.0)
+    return modo != "gulosa" and n_particoes * custo >= TRABALHO_MINIMO_PARALELO_S
+
+
+def simular_particao(equipes, cargas, capacidades, duracoes):
+    # critério de desempate do modelo: menor utilização, depois menor
+    # carga, depois nome da equipe
+    cargas = list(cargas)
+    fila = [
+        (_utilizacao(carga, capacidade), carga, equipe, i)
+        for i, (equipe, carga, capacidade) in enumerate(zip(equipes, cargas, capacidades))
+    ]
+    heapq.heapify(fila)
+
+    destinos = []
+    for duracao in duracoes:
+        # retira da fila até achar a equipe menos utilizada que comporta
+        # a OS; as que não comportam voltam para a fila
+        descartadas = []
+        destino = -1
+
+        while fila:
+            entrada = heapq.heappop(fila)
+            i = entrada[-1]
+            if cargas[i] + duracao <= capacidades[i]:
+                destino = i
+                break
+            descartadas.append(entrada)
+
+        if destino >= 0:
+            cargas[destino] += duracao
+            heapq.heappush(fila, (
+                _utilizacao(cargas[destino], capacidades[destino]),
+                cargas[destino],
+                equipes[destino],
+                destino,
+            ))
+
+        for entrada in descartadas:
+            heapq.heappush(fila, entrada)
+
+        destinos.append(destino)
+
+    return destinos, cargas
+
+
+# =========================
+# EMPACOTAMENTO (FFD / BFD + BUSCA LOCAL)
+# =========================
+MODOS_REDISTRIBUICAO = {
+    "gulosa": "Equipe menos utilizada (atual)",
+    "ffd": "First-fit decreasing",
+    "bfd": "Best-fit decreasing",
+}
+
+ORCAMENTO_BUSCA_S = 0.05
+
+
+def _cabe(cargas, capacidades, i, duracao):
+    return cargas[i] + duracao <= capacidades[i]
+
+
+def _busca_local(cargas, capacidades, duracoes, destinos, limite):
+    # melhora o empacotamento enquanto houver tempo, priorizando a
+    # quantidade de OS absorvidas e depois os minutos absorvidos:
+    # 1) move uma OS já alocada para abrir espaço a uma não absorvida
+    # 2) troca uma OS alocada por uma não absorvida maior
+    # 3) libera uma OS alocada para encaixar duas ou mais menores
+    equipes = range(len(cargas))
+    melhorou = True
+
+    while melhorou and time.perf_counter() < limite:
+        melhorou = _liberar_para_menores(cargas, capacidades, duracoes, destinos)
+        pendentes = sorted(
+            (k for k, destino in enumerate(destinos) if destino < 0),
+            key=lambda k: -duracoes[k],
+        )
+
+        for u in pendentes:
+            if time.perf_counter() >= limite:
+                break
+            alocadas = [k for k, destino in enumerate(destinos) if destino >= 0]
+
+            for x in alocadas:
+                b = destinos[x]
+                if cargas[b] - duracoes[x] + duracoes[u] > capacidades[b]:
+                    continue
+                c = next(
+                    (c for c in equipes if c != b and _cabe(cargas, capacidades, c, duracoes[x])),
+                    None,
+                )
+                if c is None:
+                    continue
+                cargas[b] += duracoes[u] - duracoes[x]
+                cargas[c] += duracoes[x]
+                destinos[x], destinos[u] = c, b
+                melhorou = True
+                break
+            else:
+                for x in alocadas:
+                    b = destinos[x]
+                    if duracoes[x] >= duracoes[u]:
+                        continue
+                    if cargas[b] - duracoes[x] + duracoes[u] > capacidades[b]:
+                        continue
+                    cargas[b] += duracoes[u] - duracoes[x]
+                    destinos[x], destinos[u] = -1, b
+                    melhorou = True
+                    break
+
+    return destinos
+
+
+def _liberar_para_menores(cargas, capacidades, duracoes, destinos):
+    pendentes = sorted(
+        (k for k, destino in enumerate(destinos) if destino < 0),
+        key=lambda k: duracoes[k],
+    )
+    if len(pendentes) < 2:
+        return False
+
+    alocadas = sorted(
+        (k for k, destino in enumerate(destinos) if destino >= 0),
+        key=lambda k: -duracoes[k],
+    )
+    for x in alocadas:
+        b = destinos[x]
+        carga = cargas[b] - duracoes[x]
+        encaixadas = []
+        for u in pendentes:
+            if carga + duracoes[u] <= capacidades[b]:
+                carga += duracoes[u]
+                encaixadas.append(u)
+        if len(encaixadas) >= 2:
+            cargas[b] = carga
+            destinos[x] = -1
+            for u in encaixadas:
+                destinos[u] = b
+            return True
+
+    return False
+
+
+def _absorcao(destinos, duracoes):
+    # objetivo do empacotamento: quantidade de OS, depois minutos
+    absorvidas = [duracao for destino, duracao in zip(destinos, duracoes) if destino >= 0]
+    return len(absorvidas), sum(absorvidas)
+
+
+def empacotar_particao(equipes, cargas, capacidades, duracoes, modo="bfd", orcamento_s=ORCAMENTO_BUSCA_S):
+    limite = time.perf_counter() + orcamento_s
+    capacidades = list(capacidades)
+    duracoes = list(duracoes)
+    gulosa = simular_particao(equipes, cargas, capacidades, duracoes)
+    cargas = list(cargas)
+
+    # equipes na mesma ordem de preferência da regra gulosa
+    ordem_equipes = sorted(
+        range(len(equipes)),
+        key=lambda i: (_utilizacao(cargas[i], capacidades[i]), cargas[i], equipes[i]),
+    )
+    destinos = [-1] * len(duracoes)
+
+    for k in sorted(range(len(duracoes)), key=lambda k: -duracoes[k]):
+        candidatas = [i for i in ordem_equipes if _cabe(cargas, capacidades, i, duracoes[k])]
+        if not candidatas:
+            continue
+        if modo == "bfd":
+            destino = min(candidatas, key=lambda i: capacidades[i] - cargas[i] - duracoes[k])
+        else:
+            destino = candidatas[0]
+        cargas[destino] += duracoes[k]
+        destinos[k] = destino
+
+    # "decreasing" favorece os minutos; quando a regra gulosa absorve mais
+    # OS, a busca local parte dela e o modo nunca fica abaixo do padrão
+    if _absorcao(gulosa[0], duracoes) > _absorcao(destinos, duracoes):
+        destinos, cargas = gulosa
+
+    destinos = _busca_local(cargas, capacidades, duracoes, destinos, limite)
+    return destinos, cargas
+
+
+def resolver_particao(particao, modo="gulosa", orcamento_s=ORCAMENTO_BUSCA_S):
+    if modo == "gulosa":
+        return simular_particao(*particao)
+    return empacotar_particao(*particao, modo=modo, orcamento_s=orcamento_s)
+
+
+def simular_lote(particoes, modo="gulosa", orcamento_s=ORCAMENTO_BUSCA_S):
+    return [resolver_particao(particao, modo, orcamento_s) for particao in particoes]
+
+
+# lotes por processo: vários por trabalhador equilibram cidades de tamanhos
+# diferentes e dão granularidade ao progresso
+LOTES_POR_PROCESSO = 4
+LOTES_SERIAIS = 50
+
+
+def criar_executor(processos):
+    # forkserver: os trabalhadores não herdam as threads da página
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+    return ProcessPoolExecutor(max_workers=processos, mp_context=contexto)
+
+
+def _lotes(n, quantidade):
+    tamanho = max(1, -(-n // max(1, quantidade)))
+    return [range(i, min(i + tamanho, n)) for i in range(0, n, tamanho)]
+
+
+def executar_particoes(
+    particoes, processos=1, modo="gulosa", orcamento_s=ORCAMENTO_BUSCA_S,
+    executor=None, ao_concluir=None, cancelar=None,
+):
+    # ao_concluir(indices, resultados) a cada lote pronto, em qualquer ordem;
+    # cancelar (threading.Event) descarta os lotes pendentes. O executor
+    # pode vir de fora para uma tarefa inteira usar um único pool
+    resultados = [None] * len(particoes)
+    paralelo = processos > 1 and len(particoes) >= PARTICOES_MINIMAS_PARALELO
+    acompanhado = ao_concluir is not None or cancelar is not None
+
+    if not paralelo:
+        inicio = time.perf_counter()
+        for lote in _lotes(len(particoes), LOTES_SERIAIS if acompanhado else 1):
+            if cancelar is not None and cancelar.is_set():
+                raise TarefaCancelada()
+            parcial = simular_lote([particoes[i] for i in lote], modo, orcamento_s)
+            resultados[lote.start:lote.stop] = parcial
+            if ao_concluir is not None:
+                ao_concluir(lote, parcial)
+        if particoes:
+            _custo_particao[(modo, orcamento_s)] = (time.perf_counter() - inicio) / len(particoes)
+        return resultados
+
+    # lotes contíguos gravados pela posição: a saída é a mesma da serial
+    tarefa = partial(simular_lote, modo=modo, orcamento_s=orcamento_s)
+    proprio = executor is None
+    if proprio:
+        executor = criar_executor(processos)
+    pendentes = {}
+    try:
+        pendentes = {
+            executor.submit(tarefa, [particoes[i] for i in lote]): lote
+            for lote in _lotes(len(particoes), processos * LOTES_POR_PROCESSO)
+        }
+        while pendentes:
+            prontos, _ = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+            if cancelar is not None and cancelar.is_set():
+                raise TarefaCancelada()
+            for futuro in prontos:
+                lote = pendentes.pop(futuro)
+                parcial = futuro.result()
+                resultados[lote.start:lote.stop] = parcial
+                if ao_concluir is not None:
+                    ao_concluir(lote, parcial)
+    finally:
+        # cancelamento (também o levantado por ao_concluir) ou erro: os
+        # lotes ainda na fila não seguram o pool compartilhado
+        for futuro in pendentes:
+            futuro.cancel()
+        if proprio:
+            executor.shutdown(wait=True, cancel_futures=True)
+    return resultados
+
+
+# resultados por partição, indexados pelo conteúdo da partição: filtros
+# novos só simulam as partições que ainda não foram vistas
+MAX_PARTICOES_MEMORIA = 200_000
+
+_memoria_particoes = OrderedDict()
+_trava_memoria = threading.Lock()
+
+
+def impressao_particao(particao):
+    return hashlib.blake2b(
+        pickle.dumps(particao, protocol=pickle.HIGHEST_PROTOCOL),
+        digest_size=16,
+    ).digest()
+
+
+def executar_particoes_memorizadas(
+    particoes, processos=1, modo="gulosa", orcamento_s=ORCAMENTO_BUSCA_S,
+    executor=None, ao_concluir=None, cancelar=None,
+):
+    parametros = (modo, orcamento_s) if modo != "gulosa" else (modo,)
+    chaves = [impressao_particao(parametros + particao) for particao in particoes]
+
+    with _trava_memoria:
+        resultados = [_memoria_particoes.get(chave) for chave in chaves]
+        for chave, resultado in zip(chaves, resultados):
+            if resultado is not None:
+                _memoria_particoes.move_to_end(chave)
+
+    pendentes = [i for i, resultado in enumerate(resultados) if resultado is None]
+    memorizadas = [i for i, resultado in enumerate(resultados) if resultado is not None]
+    if ao_concluir is not None and memorizadas:
+        ao_concluir(memorizadas, [resultados[i] for i in memorizadas])
+
+    def concluir_pendentes(lote, parcial):
+        # cada lote entra na memória ao terminar: um cancelamento não perde
+        # as partições já simuladas
+        indices = [pendentes[i] for i in lote]
+        with _trava_memoria:
+            for i, resultado in zip(indices, parcial):
+                resultados[i] = resultado
+                _memoria_particoes[chaves[i]] = resultado
+            while len(_memoria_particoes) > MAX_PARTICOES_MEMORIA:
+                _memoria_particoes.popitem(last=False)
+        if ao_concluir is not None:
+            ao_concluir(indices, parcial)
+
+    # processos é o teto: sem trabalho suficiente a simulação fica serial
+    if not compensa_paralelo(modo, orcamento_s, len(pendentes)):
+        processos = 1
+    executar_particoes(
+        [particoes[i] for i in pendentes], processos, modo, orcamento_s,
+        executor=executor, ao_concluir=concluir_pendentes, cancelar=cancelar,
+    )
+    return resultados
+
+
+def _acumular_parciais(acumulado, cidades, indices, resultados, posicoes, receita):
+    # totais por cidade das partições já simuladas
+    for i, (destinos, _) in zip(indices, resultados):
+        destinos = np.asarray(destinos)
+        linha = acumulado.setdefault(cidades[i], {
+            "cidade_equipe": cidades[i],
+            "os_removidas": 0,
+            "os_absorvidas": 0,
+            "os_nao_absorvidas": 0,
+            "receita_em_risco": 0.0,
+        })
+        absorvidas = int((destinos >= 0).sum())
+        linha["os_removidas"] += len(destinos)
+        linha["os_absorvidas"] += absorvidas
+        linha["os_nao_absorvidas"] += len(destinos) - absorvidas
+        linha["receita_em_risco"] += float(receita[posicoes[i]][destinos < 0].sum())
+    return [dict(linha) for linha in acumulado.values()]
+
+
+def simular_redistribuicao(
+    df, processos=1, modo="gulosa", orcamento_s=ORCAMENTO_BUSCA_S, capacidades=None,
+    progresso=None, cancelar=None, executor=None,
+):
+    # progresso(feitas, total, parciais) é chamado a cada lote concluído, com
+    # os totais por cidade até ali; cancelar (threading.Event) interrompe
+    base = criar_base_equipe_dia(df, capacidades)
+    mantidas = consolidar_equipe_dia(base[base["desmobilizar"].eq(0)])
+    removidas = df[df["desmobilizar"].eq(1)].sort_values(
+        ["data_turno", "cidade_equipe", "data_atribuicao", "inicio_atividade"]
+    )
+
+    chaves_equipe = list(zip(
+        mantidas["cidade_equipe"].tolist(),
+        mantidas["data_turno"].tolist(),
+        mantidas["equipe"].tolist(),
+    ))
+    cargas = dict(zip(chaves_equipe, mantidas["carga_min"].astype(float).tolist()))
+    capacidade_equipe = dict(zip(
+        chaves_equipe, mantidas["capacidade_proposta_min"].astype(float).tolist()
+    ))
+
+    equipes_particao = {}
+    for chave in cargas:
+        equipes_particao.setdefault(chave[:2], []).append(chave)
+
+    duracoes = removidas["duracao_modelo_min"].to_numpy(dtype=float)
+    posicoes_particao = removidas.groupby(CHAVES_PARTICAO, sort=False).indices
+
+    chaves_particao = [p for p in posicoes_particao if p in equipes_particao]
+    particoes = [
+        (
+            [chave[2] for chave in equipes_particao[p]],
+            [cargas[chave] for chave in equipes_particao[p]],
+            [capacidade_equipe[chave] for chave in equipes_particao[p]],
+            duracoes[posicoes_particao[p]].tolist(),
+        )
+        for p in chaves_particao
+    ]
+    receita = removidas["preco_a_cobrar"].to_numpy(dtype=float)
+    posicoes = [posicoes_particao[p] for p in chaves_particao]
+
+    ao_concluir = None
+    if progresso is not None:
+        cidades = [p[0] for p in chaves_particao]
+        acumulado = {}
+        feitas = [0]
+
+        def ao_concluir(indices, parcial):
+            feitas[0] += len(indices)
+            progresso(feitas[0], len(particoes), _acumular_parciais(
+                acumulado, cidades, indices, parcial, posicoes, receita
+            ))
+
+    resultados = executar_particoes_memorizadas(
+        particoes, processos, modo, orcamento_s,
+        executor=executor, ao_concluir=ao_concluir, cancelar=cancelar,
+    )
+
+    equipe_destino = np.full(len(removidas), None, dtype=object)
+    for p, (destinos, cargas_finais) in zip(chaves_particao, resultados):
+        chaves = equipes_particao[p]
+        for chave, carga in zip(chaves, cargas_finais):
+            cargas[chave] = carga
+        equipe_destino[posicoes_particao[p]] = [
+            chaves[i][2] if i >= 0 else None for i in destinos
+        ]
+
+    absorvida = pd.notna(equipe_destino)
+    redistribuicao = pd.DataFrame({
+        "os": removidas["os"].to_numpy(),
+        "cidade_equipe": removidas["cidade_equipe"].to_numpy(),
+        "data_turno": removidas["data_turno"].to_numpy(),
+        "equipe_origem": removidas["equipe"].to_numpy(),
+        "equipe_destino": equipe_destino,
+        "duracao_min": duracoes,
+        "receita": receita,
+        "status": np.where(absorvida, "Absorvida", "Não absorvida"),
+    })
+
+    carga_final = pd.DataFrame(
+        [chave + (carga, capacidade_equipe[chave]) for chave, carga in cargas.items()],
+        columns=[
+            "cidade_equipe", "data_turno", "equipe",
+            "carga_proposta_min", "capacidade_proposta_min",
+        ],
+    )
+    if not carga_final.empty:
+        carga_final["utilizacao_proposta"] = (
+            carga_final["carga_proposta_min"] /
+            carga_final["capacidade_proposta_min"].where(carga_final["capacidade_proposta_min"] > 0)
+        )
+        carga_final["tempo_sem_execucao_proposto_min"] = (
+            carga_final["capacidade_proposta_min"] -
+            carga_final["carga_proposta_min"]
+        ).clip(lower=0)
+
+    return base, redistribuicao, carga_final
+
+
+def resumir_redistribuicao(redistribuicao):
+    if redistribuicao.empty:
+        return {
+            "os_removidas": 0, "os_absorvidas": 0, "os_nao_absorvidas": 0,
+            "taxa_absorcao": 1.0, "horas_extras_necessarias": 0.0,
+            "receita_em_risco": 0.0,
+        }
+    nao_absorvida = redistribuicao["status"].eq("Não absorvida")
+    return {
+        "os_removidas": len(redistribuicao),
+        "os_absorvidas": int((~nao_absorvida).sum()),
+        "os_nao_absorvidas": int(nao_absorvida.sum()),
+        "taxa_absorcao": (~nao_absorvida).mean(),
+        "horas_extras_necessarias": redistribuicao.loc[nao_absorvida, "duracao_min"].sum() / 60,
+        "receita_em_risco": redistribuicao.loc[nao_absorvida, "receita"].sum(),
+    }
+
+
+# =========================
+# CENÁRIOS ALTERNATIVOS
+# =========================
+def cenario_planilha(df, nome="Planilha"):
+    # capacidade None: usa a capacidade de cada equipe-dia da base
+    return {
+        "nome": nome,
+        "desmobilizar": set(df.loc[df["desmobilizar"].eq(1), "equipe"].dropna()),
+        "12h": set(df.loc[df["12h"].eq(1), "equipe"].dropna()),
+        "capacidade_min": None,
+        "capacidade_12h_min": None,
+    }
+
+
+def preparar_cenarios(df, capacidades=None):
+    # base equipe-dia e fila de OS montadas uma vez e reaproveitadas
+    # por todos os cenários
+    base = consolidar_equipe_dia(criar_base_equipe_dia(df, capacidades))
+    particoes = pd.MultiIndex.from_frame(
+        base[CHAVES_PARTICAO].drop_duplicates()
+    )
+
+    ordem = df.sort_values(
+        ["data_turno", "cidade_equipe", "data_atribuicao", "inicio_atividade"]
+    )
+    ordem = ordem[ordem["equipe"].notna()]
+
+    return {
+        "equipe": base["equipe"].to_numpy(dtype=object),
+        "carga": base["carga_min"].to_numpy(dtype=float),
+        "capacidade": base["capacidade_atual_min"].to_numpy(dtype=float),
+        "capacidade_12h": base["capacidade_12h_min"].to_numpy(dtype=float),
+        "particao": particoes.get_indexer(
+            pd.MultiIndex.from_frame(base[CHAVES_PARTICAO])
+        ),
+        "os_equipe": ordem["equipe"].to_numpy(dtype=object),
+        "os_particao": particoes.get_indexer(
+            pd.MultiIndex.from_frame(ordem[CHAVES_PARTICAO])
+        ),
+        "os_duracao": ordem["duracao_modelo_min"].to_numpy(dtype=float),
+        "os_receita": ordem["preco_a_cobrar"].to_numpy(dtype=float),
+    }
+
+
+def avaliar_cenario(preparo, cenario):
+    equipe = preparo["equipe"]
+    desmobilizada = np.isin(equipe, list(cenario["desmobilizar"]))
+    capacidade_padrao = cenario.get("capacidade_min")
+    capacidade_12h = cenario.get("capacidade_12h_min")
+    capacidade = np.where(
+        np.isin(equipe, list(cenario["12h"])),
+        preparo["capacidade_12h"] if capacidade_12h is None else float(capacidade_12h),
+        preparo["capacidade"] if capacidade_padrao is None else float(capacidade_padrao),
+    )
+
+    removida = np.isin(preparo["os_equipe"], list(cenario["desmobilizar"]))
+    os_particao = preparo["os_particao"][removida]
+    os_duracao = preparo["os_duracao"][removida]
+    os_receita = preparo["os_receita"][removida]
+
+    # equipes mantidas por partição (a base já vem ordenada por partição)
+    mantida = ~desmobilizada
+    particao = preparo["particao"][mantida]
+    inicios = np.searchsorted(particao, os_particao, side="left")
+    fins = np.searchsorted(particao, os_particao, side="right")
+    equipes_m = equipe[mantida]
+    cargas_m = preparo["carga"][mantida]
+    capacidades_m = capacidade[mantida]
+
+    absorvida = np.zeros(len(os_duracao), dtype=bool)
+    ordem = np.argsort(os_particao, kind="stable")
+    cortes = np.flatnonzero(np.diff(os_particao[ordem])) + 1
+
+    for grupo in np.split(ordem, cortes) if len(ordem) else []:
+        i, j = inicios[grupo[0]], fins[grupo[0]]
+        if os_particao[grupo[0]] < 0 or i == j:
+            continue
+        destinos, _ = simular_particao(
+            equipes_m[i:j], cargas_m[i:j], capacidades_m[i:j],
+            os_duracao[grupo].tolist(),
+        )
+        absorvida[grupo] = np.asarray(destinos) >= 0
+
+    capacidade_total = capacidades_m.sum()
+    carga_total = cargas_m.sum() + os_duracao[absorvida].sum()
+
+    return {
+        "cenario": cenario["nome"],
+        "equipes_desmobilizadas": len(set(equipe[desmobilizada])),
+        "equipes_12h": len(set(equipe[mantida]) & set(cenario["12h"])),
+        "equipes_dia": int(mantida.sum()),
+        "capacidade_h": capacidade_total / 60,
+        "utilizacao_proposta": carga_total / capacidade_total if capacidade_total else np.nan,
+        "os_removidas": len(os_duracao),
+        "os_nao_absorvidas": int((~absorvida).sum()),
+        "taxa_absorcao": absorvida.mean() if len(absorvida) else 1.0,
+        "horas_nao_absorvidas": os_duracao[~absorvida].sum() / 60,
+        "receita_em_risco": os_receita[~absorvida].sum(),
+    }
+
+
+def simular_cenarios(df, cenarios, capacidades=None, progresso=None, cancelar=None):
+    preparo = preparar_cenarios(df, capacidades)
+    resultados = []
+    for cenario in cenarios:
+        if cancelar is not None and cancelar.is_set():
+            raise TarefaCancelada()
+        resultados.append(avaliar_cenario(preparo, cenario))
+        if progresso is not None:
+            progresso(len(resultados), len(cenarios))
+    return pd.DataFrame(resultados)
+
+
+# =========================
+# MONTE CARLO DA ABSORÇÃO
+# =========================
+CHAVES_DURACAO = ["cidade_equipe", "grupo_os", "tipo_os"]
+
+# limite de valores sorteados por lote (ensaios x atividades)
+SORTEIOS_POR_LOTE = 4_000_000
+
+
+def _codigos(df, chaves):
+    return df.groupby(chaves, sort=False, dropna=False).ngroup().to_numpy()
+
+
+def _somar_segmentos(valores, inicios):
+    # soma por segmento ao longo das colunas (valores: ensaios x itens)
+    if valores.shape[1] == 0:
+        return np.zeros((valores.shape[0], len(inicios)), dtype=valores.dtype)
+    return np.add.reduceat(valores, inicios, axis=1)
+
+
+def _absorver(cargas, capacidades, duracoes, particao_os, passo_os):
+    # regra de simular_particao vetorizada nos ensaios: a k-ésima OS de
+    # todas as cidades-dia de uma vez, para a equipe que comporta com menor
+    # utilização, depois menor carga, depois nome (ordem das colunas)
+    absorvida = np.zeros(duracoes.shape, dtype=bool)
+    ordem = np.argsort(passo_os, kind="stable")
+    cortes = np.flatnonzero(np.diff(passo_os[ordem], prepend=-1))
+
+    for colunas in np.split(ordem, cortes[1:]) if len(ordem) else []:
+        p = particao_os[colunas]
+        carga = cargas[:, p, :]
+        capacidade = capacidades[p]
+        duracao = duracoes[:, colunas]
+
+        cabe = carga + duracao[:, :, None] <= capacidade
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chave = np.where(cabe & (capacidade > 0), carga / capacidade, np.inf)
+        candidata = cabe & (chave == chave.min(axis=2, keepdims=True))
+        chave = np.where(candidata, carga, np.inf)
+        candidata &= chave == chave.min(axis=2, keepdims=True)
+
+        ok = candidata.any(axis=2)
+        ensaio, coluna = np.nonzero(ok)
+        destino = candidata.argmax(axis=2)[ensaio, coluna]
+        cargas[ensaio, p[coluna], destino] += duracao[ensaio, coluna]
+        absorvida[:, colunas] = ok
+
+    return absorvida
+
+
+def simular_monte_carlo(
+    df, ensaios=1000, semente=0, capacidades=None, sortear=True,
+    progresso=None, cancelar=None,
+):
+    # em cada ensaio as OS removidas passam pela mesma regra da gulosa,
+    # equipe a equipe, com as durações sorteadas; sortear=False usa a
+    # duração do modelo e reproduz simular_redistribuicao. progresso(feitos,
+    # total) a cada lote de ensaios; cancelar (threading.Event) interrompe
+    rng = np.random.default_rng(semente)
+    # base montada antes de reordenar: as somas saem na mesma ordem da gulosa
+    base = criar_base_equipe_dia(df, capacidades)
+    df = df[df["equipe"].notna() & df["cidade_equipe"].notna() & df["data_turno"].notna()]
+    df = df.sort_values(
+        ["data_turno", "cidade_equipe", "data_atribuicao", "inicio_atividade"]
+    ).reset_index(drop=True)
+
+    # distribuição empírica por (cidade, grupo_os, tipo_os)
+    grupo = _codigos(df, CHAVES_DURACAO)
+    valida = df["duracao_valida_min"].notna().to_numpy()
+    ordem_validas = np.flatnonzero(valida)[np.argsort(grupo[valida], kind="stable")]
+    amostras = df["duracao_valida_min"].to_numpy(dtype=float)[ordem_validas]
+    contagem = np.bincount(grupo[valida], minlength=grupo.max() + 1 if len(grupo) else 0)
+    inicio_grupo = np.concatenate([[0], np.cumsum(contagem)[:-1]])
+    n_amostras = contagem[grupo]
+    pos_amostra = inicio_grupo[grupo]
+    fixa = df["duracao_modelo_min"].to_numpy(dtype=float)
+
+    # linhas equipe-dia mantidas e equipes consolidadas (flags diferentes
+    # da mesma equipe-dia somam carga, não capacidade)
+    linhas = base[base["desmobilizar"].eq(0)].reset_index(drop=True)
+    equipes = consolidar_equipe_dia(linhas)
+    chaves_equipe = CHAVES_PARTICAO + ["equipe"]
+    equipe_linha_base = pd.MultiIndex.from_frame(equipes[chaves_equipe]).get_indexer(
+        pd.MultiIndex.from_frame(linhas[chaves_equipe])
+    )
+    inicios_equipe_base = np.flatnonzero(np.diff(equipe_linha_base, prepend=-1))
+    carga_base = linhas["carga_min"].to_numpy(dtype=float)
+
+    equipe_linha = pd.MultiIndex.from_frame(linhas[CHAVES_EQUIPE_DIA]).get_indexer(
+        pd.MultiIndex.from_frame(df[CHAVES_EQUIPE_DIA])
+    )
+    linhas_mantidas = np.flatnonzero(equipe_linha >= 0)
+    linhas_mantidas = linhas_mantidas[np.argsort(equipe_linha[linhas_mantidas], kind="stable")]
+    inicios_linha = np.flatnonzero(np.diff(equipe_linha[linhas_mantidas], prepend=-1))
+    soma_fixa = _somar_segmentos(fixa[None, linhas_mantidas], inicios_linha)
+
+    # equipes de cada cidade-dia em colunas, na ordem do nome; colunas
+    # vazias têm capacidade -inf e nunca comportam
+    particoes = pd.MultiIndex.from_frame(equipes[CHAVES_PARTICAO].drop_duplicates())
+    particao_equipe = particoes.get_indexer(pd.MultiIndex.from_frame(equipes[CHAVES_PARTICAO]))
+    coluna_equipe = equipes.groupby(CHAVES_PARTICAO, sort=False).cumcount().to_numpy()
+    largura = int(coluna_equipe.max()) + 1 if len(equipes) else 0
+    capacidade = np.full((len(particoes), largura), -np.inf)
+    capacidade[particao_equipe, coluna_equipe] = equipes["capacidade_proposta_min"].to_numpy(dtype=float)
+
+    # OS removidas agrupadas por cidade-dia, na ordem da simulação; as de
+    # cidades-dia sem equipe mantida nunca são absorvidas
+    removida = df["desmobilizar"].eq(1).to_numpy()
+    particao_os = particoes.get_indexer(
+        pd.MultiIndex.from_frame(df.loc[removida, CHAVES_PARTICAO])
+    )
+    linhas_removidas = np.flatnonzero(removida)
+    ordem = np.argsort(particao_os, kind="stable")
+    linhas_removidas, particao_os = linhas_removidas[ordem], particao_os[ordem]
+    inicios_os = np.flatnonzero(np.diff(particao_os, prepend=-2))
+    passo_os = np.arange(len(particao_os)) - np.repeat(
+        inicios_os, np.diff(np.append(inicios_os, len(particao_os)))
+    )
+    com_equipe = particao_os >= 0
+    receita = df["preco_a_cobrar"].to_numpy(dtype=float)[linhas_removidas]
+
+    if not sortear:
+        ensaios = min(ensaios, 1)
+    lote = max(1, min(ensaios, SORTEIOS_POR_LOTE // max(len(df), 1)))
+    resultados = []
+
+    for feitos in range(0, ensaios, lote):
+        if cancelar is not None and cancelar.is_set():
+            raise TarefaCancelada()
+        n = min(lote, ensaios - feitos)
+        if sortear and len(amostras):
+            sorteio = np.floor(rng.random((n, len(df)), dtype=np.float32) * n_amostras).astype(np.int64)
+            sorteadas = amostras[np.minimum(pos_amostra + sorteio, len(amostras) - 1)]
+            duracoes = np.where(n_amostras > 0, sorteadas, fixa)
+        else:
+            duracoes = np.broadcast_to(fixa, (n, len(df)))
+
+        # carga da base (união dos intervalos) deslocada pela diferença
+        # entre as durações sorteadas e as do modelo
+        soma = _somar_segmentos(duracoes[:, linhas_mantidas], inicios_linha)
+        carga_linha = np.clip(carga_base + (soma - soma_fixa), 0, None)
+        cargas = np.zeros((n,) + capacidade.shape)
+        cargas[:, particao_equipe, coluna_equipe] = _somar_segmentos(carga_linha, inicios_equipe_base)
+
+        duracao_os = duracoes[:, linhas_removidas]
+        absorvida = np.zeros(duracao_os.shape, dtype=bool)
+        absorvida[:, com_equipe] = _absorver(
+            cargas, capacidade, duracao_os[:, com_equipe],
+            particao_os[com_equipe], passo_os[com_equipe],
+        )
+
+        resultados.append(pd.DataFrame({
+            "os_absorvidas": absorvida.sum(axis=1),
+            "os_nao_absorvidas": (~absorvida).sum(axis=1),
+            "horas_nao_absorvidas": np.where(absorvida, 0, duracao_os).sum(axis=1) / 60,
+            "receita_em_risco": (~absorvida * receita).sum(axis=1),
+        }))
+        if progresso is not None:
+            progresso(feitos + n, ensaios)
+
+    if not resultados:
+        return pd.DataFrame(columns=[
+            "os_absorvidas", "os_nao_absorvidas", "horas_nao_absorvidas",
+            "receita_em_risco", "taxa_absorcao",
+        ])
+
+    ensaios_df = pd.concat(resultados, ignore_index=True)
+    total = len(linhas_removidas)
+    ensaios_df["taxa_absorcao"] = ensaios_df["os_absorvidas"] / total if total else 1.0
+    return ensaios_df
+
+
+def resumir_monte_carlo(ensaios_df, confianca=0.95):
+    cauda = (1 - confianca) / 2
+    return ensaios_df.quantile([cauda, 0.5, 1 - cauda]).T.set_axis(
+        ["limite_inferior", "mediana", "limite_superior"], axis=1
+    ).assign(media=ensaios_df.mean())
@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# tarefas concluídas guardadas para as próximas execuções da página
+MAX_TAREFAS_GUARDADAS = 16
+
+
+class TarefaCancelada(Exception):
+    pass
+
+
+class Tarefa:
+    def __init__(self, grupo):
+        self.id = uuid.uuid4().hex
+        self.grupo = grupo
+        self.estado = "na fila"
+        self.feitas = 0
+        self.total = 0
+        self.parciais = []
+        self.resultado = None
+        self.erro = None
+        self.criada_em = time.time()
+        self.cancelar = threading.Event()
+        self._trava = threading.Lock()
+
+    def registrar(self, feitas, total, parciais=None):
+        # parciais: retrato atual dos resultados parciais (substitui o anterior)
+        if self.cancelar.is_set():
+            raise TarefaCancelada(self.id)
+        with self._trava:
+            self.feitas, self.total = feitas, total
+            if parciais is not None:
+                self.parciais = list(parciais)
+
+    def _definir(self, estado, resultado=None, erro=None):
+        with self._trava:
+            self.estado = estado
+            self.resultado = resultado
+            self.erro = erro
+
+    def situacao(self):
+        with self._trava:
+            return {
+                "id": self.id,
+                "estado": self.estado,
+                "feitas": self.feitas,
+                "total": self.total,
+                "parciais": list(self.parciais),
+            }
+
+    @property
+    def ativa(self):
+        with self._trava:
+            return self.estado in ("na fila", "executando")
+
+
+class GerenciadorTarefas:
+    def __init__(self, trabalhadores=2):
+        self._executor = ThreadPoolExecutor(
+            max_workers=trabalhadores, thread_name_prefix="tarefa"
+        )
+        self._tarefas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def submeter(self, grupo, funcao, *args, **kwargs):
+        # uma tarefa ativa por grupo: a nova cancela as anteriores
+        tarefa = Tarefa(grupo)
+        with self._trava:
+            for anterior in self._tarefas.values():
+                if anterior.grupo == grupo and anterior.ativa:
+                    anterior.cancelar.set()
+            self._tarefas[tarefa.id] = tarefa
+            self._descartar_antigas()
+
+        self._executor.submit(self._executar, tarefa, funcao, args, kwargs)
+        return tarefa
+
+    def obter(self, id_tarefa):
+        with self._trava:
+            return self._tarefas.get(id_tarefa)
+
+    def cancelar(self, id_tarefa):
+        tarefa = self.obter(id_tarefa)
+        if tarefa is not None:
+            tarefa.cancelar.set()
+
+    def _executar(self, tarefa, funcao, args, kwargs):
+        if tarefa.cancelar.is_set():
+            tarefa._definir("cancelada")
+            return
+        tarefa._definir("executando")
+        try:
+            resultado = funcao(
+                *args, progresso=tarefa.registrar, cancelar=tarefa.cancelar, **kwargs
+            )
+        except TarefaCancelada:
+            tarefa._definir("cancelada")
+        except Exception as erro:
+            tarefa._definir("cancelada" if tarefa.cancelar.is_set() else "erro", erro=erro)
+        else:
+            tarefa._definir("concluída", resultado=resultado)
+
+    def _descartar_antigas(self):
+        inativas = [id_ for id_, tarefa in self._tarefas.items() if not tarefa.ativa]
+        for id_ in inativas[:max(0, len(inativas) - MAX_TAREFAS_GUARDADAS)]:
+            del self._tarefas[id_]
@@ -1,135 +1,148 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import altair as alt
 
+import ciclos_os
+import cubo_atribuicao
+import particoes
+import regras
+
 st.set_page_config(layout="wide")
 
+ORIGEM = "tempo_atribuicao.parquet"
+DATASET = "tempo_atribuicao"
+
 # =========================
-# LOAD DATA
+# DATASET (HIVE: estado / regional / mes)
+# versao: mtime/size of the source parquet, so every cache below is
+# rebuilt when the source file is rewritten
 # =========================
+@st.cache_resource
+def dataset_os(versao):
+    return particoes.garantir(ORIGEM, DATASET)
+
+
 @st.cache_data
-def load_data():
-    df = pd.read_parquet("tempo_atribuicao.parquet")
-
-    for col in [
-        "DATA_ABERTURA_OS",
-        "DATA_ATRIBUICAO_OS",
-        "DATA_LIMITE_OS",
-    ]:
-        df[col] = pd.to_datetime(
-            df[col],
-            errors="coerce",
-            dayfirst=True
-        )
-    return df
+def load_particoes(versao):
+    return particoes.chaves_particao(dataset_os(versao))
 
-df = load_data()
 
 # =========================
-# METRICS
+# LOAD DATA
 # =========================
-df["dias_abertura_atribuicao"] = (
-    df["DATA_ATRIBUICAO_OS"] - df["DATA_ABERTURA_OS"]
-).dt.total_seconds() / 86400
+@st.cache_data
+def load_data(versao, estado, regional, mes):
+    # CUBE of the chosen partitions — base/sigla/grupo_os/tipo_os are
+    # filtered on it and every view below is a roll-up of it
+    df = cubo_atribuicao.ler_os(
+        dataset_os(versao),
+        {"estado": estado, "regional": regional, "mes": mes}
+    )
+    return cubo_atribuicao.construir_cubo(df)
 
-df["horas_ate_prazo"] = (
-    df["DATA_LIMITE_OS"] - df["DATA_ATRIBUICAO_OS"]
-).dt.total_seconds() / 3600
 
-# =========================
-# RISK CLASSIFICATION
-# =========================
-def classificar_risco(row):
-    if pd.isna(row["DATA_ATRIBUICAO_OS"]) or pd.isna(row["DATA_LIMITE_OS"]):
-        return "SEM ATRIBUIÇÃO"
-
-    if (
-        row["DATA_ATRIBUICAO_OS"].date() == row["DATA_LIMITE_OS"].date()
-        and row["DATA_ATRIBUICAO_OS"].hour >= 18
-    ):
-        return "ATRIB. APÓS 18h (MESMO DIA)"
-
-    h = row["horas_ate_prazo"]
-
-    if h > 24:
-        return ">24h"
-    elif h <= 1:
-        return "<=1h"
-    elif h < 6:
-        return "1–6h"
-    elif h < 12:
-        return "6–12h"
-    else:
-        return "12–24h"
-
-df["nivel_risco"] = df.apply(classificar_risco, axis=1)
+@st.cache_data
+def load_ciclos(versao, estado, regional, mes):
+    # lifecycle interval index, built once per partition selection like the
+    # cube; base/sigla/grupo_os/tipo_os are cut from it in memory
+    df = particoes.ler(
+        dataset_os(versao),
+        {"estado": estado, "regional": regional, "mes": mes},
+        cubo_atribuicao.COLUNAS_FILTRO + particoes.COLUNAS_DATA
+    )
+    for col in particoes.COLUNAS_DATA:
+        df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
+    return ciclos_os.indice_ciclos(df, cubo_atribuicao.COLUNAS_FILTRO)
 
 # =========================
 # SIDEBAR — CASCADING FILTERS
-# estado → regional → base → sigla → grupo_os → tipo_os
+# estado → regional → mes → base → sigla → grupo_os → tipo_os
+# partition levels come from the dataset paths; the rest from the
+# cube of the selected partitions
 # =========================
 st.sidebar.header("Filtros")
 
+versao = tuple(particoes.versao(ORIGEM))
+chaves = load_particoes(versao)
+
 estado = st.sidebar.multiselect(
     "Estado",
-    sorted(df["estado"].dropna().unique()),
-    default=sorted(df["estado"].dropna().unique())
+    sorted(chaves["estado"].dropna().unique()),
+    default=sorted(chaves["estado"].dropna().unique())
 )
-df_f = df[df["estado"].isin(estado)]
+chaves = chaves[chaves["estado"].isin(estado)]
 
 regional = st.sidebar.multiselect(
     "Regional",
-    sorted(df_f["regional"].dropna().unique()),
-    default=sorted(df_f["regional"].dropna().unique())
+    sorted(chaves["regional"].dropna().unique()),
+    default=sorted(chaves["regional"].dropna().unique())
+)
+chaves = chaves[chaves["regional"].isin(regional)]
+
+mes = st.sidebar.multiselect(
+    "Mês de abertura",
+    sorted(chaves["mes"].dropna().unique()),
+    default=sorted(chaves["mes"].dropna().unique())
 )
-df_f = df_f[df_f["regional"].isin(regional)]
+
+# the cube is cached per partition selection: changing the filters
+# below only rolls it up again
+cubo = load_data(versao, tuple(estado), tuple(regional), tuple(mes))
+opcoes = cubo[cubo_atribuicao.COLUNAS_FILTRO]
 
 base = st.sidebar.multiselect(
     "Base",
-    sorted(df_f["base"].dropna().unique()),
-    default=sorted(df_f["base"].dropna().unique())
+    sorted(opcoes["base"].dropna().unique()),
+    default=sorted(opcoes["base"].dropna().unique())
 )
-df_f = df_f[df_f["base"].isin(base)]
+opcoes = opcoes[opcoes["base"].isin(base)]
 
 sigla = st.sidebar.multiselect(
     "Sigla",
-    sorted(df_f["sigla"].dropna().unique()),
-    default=sorted(df_f["sigla"].dropna().unique())
+    sorted(opcoes["sigla"].dropna().unique()),
+    default=sorted(opcoes["sigla"].dropna().unique())
 )
-df_f = df_f[df_f["sigla"].isin(sigla)]
+opcoes = opcoes[opcoes["sigla"].isin(sigla)]
 
 grupo_os = st.sidebar.multiselect(
     "Grupo OS",
-    sorted(df_f["grupo_os"].dropna().unique()),
-    default=sorted(df_f["grupo_os"].dropna().unique())
+    sorted(opcoes["grupo_os"].dropna().unique()),
+    default=sorted(opcoes["grupo_os"].dropna().unique())
 )
-df_f = df_f[df_f["grupo_os"].isin(grupo_os)]
+opcoes = opcoes[opcoes["grupo_os"].isin(grupo_os)]
 
 tipo_os = st.sidebar.multiselect(
     "Tipo OS",
-    sorted(df_f["tipo_os"].dropna().unique()),
-    default=sorted(df_f["tipo_os"].dropna().unique())
+    sorted(opcoes["tipo_os"].dropna().unique()),
+    default=sorted(opcoes["tipo_os"].dropna().unique())
 )
-df_f = df_f[df_f["tipo_os"].isin(tipo_os)]
+
+filtros = {
+    "base": base,
+    "sigla": sigla,
+    "grupo_os": grupo_os,
+    "tipo_os": tipo_os,
+}
+cubo_f = cubo_atribuicao.filtrar(cubo, filtros)
 
 # =========================
 # KPIs
 # =========================
 c1, c2, c3, c4 = st.columns(4)
 """
-c1.metric("OS analisadas", f"{len(df_f):,}".replace(",", "."))
+kpis = cubo_atribuicao.kpis(cubo_f)
+c1.metric("OS analisadas", f"{kpis['os']:,}".replace(",", "."))
 c2.metric(
     "Média dias criação → atribuição",
-    round(df_f["dias_abertura_atribuicao"].mean(), 2)
+    round(kpis["media_dias_atribuicao"], 2)
 )
 c3.metric(
     "% Atrib. após 18h",
-    round((df_f["nivel_risco"] == "ATRIB. APÓS 18h (MESMO DIA)").mean() * 100, 2)
+    round(kpis["pct_apos_corte"], 2)
 )
 c4.metric(
     "% <=1h",
-    round((df_f["nivel_risco"] == "<=1h").mean() * 100, 2)
+    round(kpis["pct_ate_1h"], 2)
 )
 
 """
@@ -137,41 +150,9 @@ c4.metric(
 # =========================
 # HISTOGRAM — DIAS ATÉ ATRIBUIÇÃO (NO NULLS + LABELS)
 # =========================
-df_bins = df_f[df_f["dias_abertura_atribuicao"].notna()].copy()
-
-bins = [-np.inf, 0, 1, 2, 3, 5, 7, 14, np.inf]
-labels = [
-    "Mesmo dia",
-    "1 dia",
-    "2 dias",
-    "3 dias",
-    "4–5 dias",
-    "6–7 dias",
-    "8–14 dias",
-    ">14 dias"
-]
-
-df_bins["bin_dias_atribuicao"] = pd.cut(
-    df_bins["dias_abertura_atribuicao"],
-    bins=bins,
-    labels=labels
-)
+labels = cubo_atribuicao.ROTULOS_DIAS
 
-df_hist = (
-    df_bins
-    .groupby("bin_dias_atribuicao", dropna=True)
-    .size()
-    .reset_index(name="qtd")
-)
-
-total_hist = df_hist["qtd"].sum()
-df_hist["pct"] = df_hist["qtd"] / total_hist * 100
-df_hist["label"] = (
-    df_hist["qtd"].astype(int).astype(str)
-    + " | "
-    + df_hist["pct"].round(1).astype(str)
-    + "%"
-)
+df_hist = cubo_atribuicao.distribuicao(cubo_f, "bin_dias_atribuicao")
 
 hist_bar = (
     alt.Chart(df_hist)
@@ -207,25 +188,10 @@ st.altair_chart(
 # =========================
 # RISK DISTRIBUTION (NO NULLS + LABELS)
 # =========================
-df_risk = df_f[
-    (df_f["nivel_risco"].notna())
-    & (df_f["nivel_risco"] != "SEM ATRIBUIÇÃO")
-].copy()
-
-df_risk_plot = (
-    df_risk
-    .groupby("nivel_risco", dropna=True)
-    .size()
-    .reset_index(name="qtd")
-)
-
-total_risk = df_risk_plot["qtd"].sum()
-df_risk_plot["pct"] = df_risk_plot["qtd"] / total_risk * 100
-df_risk_plot["label"] = (
-    df_risk_plot["qtd"].astype(int).astype(str)
-    + " | "
-    + df_risk_plot["pct"].round(1).astype(str)
-    + "%"
+df_risk_plot = cubo_atribuicao.distribuicao(
+    cubo_f,
+    "nivel_risco",
+    excluir=[regras.RISCO_PRAZO["sem_dados"]]
 )
 
 risk_order = [
@@ -273,21 +239,78 @@ st.altair_chart(
 # =========================
 st.subheader("Tabela resumida")
 
-table = (
-    df_f
-    .groupby(
-        ["estado", "regional", "base", "grupo_os", "tipo_os", "nivel_risco"],
-        dropna=True
-    )
-    .agg(
-        os_qtd=("nivel_risco", "count"),
-        media_dias_atribuicao=("dias_abertura_atribuicao", "mean"),
-        media_horas_ate_prazo=("horas_ate_prazo", "mean")
-    )
-    .reset_index()
-)
+table = cubo_atribuicao.agregar(cubo_f, cubo_atribuicao.CHAVES_TABELA)[
+    cubo_atribuicao.CHAVES_TABELA
+    + ["os_qtd", "media_dias_atribuicao", "media_horas_ate_prazo"]
+]
 
 st.dataframe(
     table.sort_values("os_qtd", ascending=False),
     use_container_width=True
-)
\ No newline at end of file
+)
+
+# =========================
+# BACKLOG & AGING AT TIME T (AS-OF)
+# =========================
+st.subheader("Backlog e envelhecimento no instante T")
+
+indice_ciclos = ciclos_os.filtrar_ciclos(
+    load_ciclos(versao, tuple(estado), tuple(regional), tuple(mes)),
+    filtros
+)
+inicio_hist, fim_hist = indice_ciclos["periodo"]
+
+if pd.notna(inicio_hist):
+    serie = ciclos_os.serie_ciclos(indice_ciclos, "1D")
+
+    instante = st.slider(
+        "Instante T",
+        min_value=inicio_hist.floor("h").to_pydatetime(),
+        max_value=fim_hist.ceil("h").to_pydatetime(),
+        value=fim_hist.floor("h").to_pydatetime(),
+        step=pd.Timedelta(hours=1).to_pytimedelta(),
+        format="DD/MM/YYYY HH:mm"
+    )
+    no_instante = ciclos_os.ciclos_em(indice_ciclos, [instante]).iloc[0]
+
+    k1, k2, k3, k4, k5 = st.columns(5)
+    k1.metric("OS abertas", f"{int(no_instante['abertas']):,}".replace(",", "."))
+    k2.metric("Sem atribuição", f"{int(no_instante['sem_atribuicao']):,}".replace(",", "."))
+    k3.metric("Sem atribuição e vencidas", f"{int(no_instante['vencidas_sem_atribuicao']):,}".replace(",", "."))
+    k4.metric("Atribuídas após o prazo (24h)", f"{int(no_instante['atribuidas_apos_prazo_24h']):,}".replace(",", "."))
+    k5.metric(
+        "Idade média sem atribuição (dias)",
+        "-" if pd.isna(no_instante["idade_media_dias_sem_atribuicao"])
+        else round(no_instante["idade_media_dias_sem_atribuicao"], 2)
+    )
+
+    df_serie = (
+        serie[["sem_atribuicao", "vencidas_sem_atribuicao", "atribuidas_a_vencer"]]
+        .rename_axis("instante")
+        .reset_index()
+        .melt("instante", var_name="estado_os", value_name="qtd")
+    )
+
+    serie_line = (
+        alt.Chart(df_serie)
+        .mark_line()
+        .encode(
+            x=alt.X("instante:T", title=None),
+            y=alt.Y("qtd:Q", title="Quantidade de OS"),
+            color=alt.Color("estado_os:N", title="Estado"),
+            tooltip=["instante:T", "estado_os:N", "qtd:Q"]
+        )
+    )
+
+    serie_rule = (
+        alt.Chart(pd.DataFrame({"instante": [instante]}))
+        .mark_rule(strokeDash=[4, 4], color="gray")
+        .encode(x="instante:T")
+    )
+
+    st.altair_chart(serie_line + serie_rule, use_container_width=True)
+    st.caption(
+        "Sem data de conclusão, a OS fica sem atribuição da abertura até a atribuição "
+        "e 'a vencer' da atribuição até o prazo. Atribuídas após o prazo: últimas 24h antes de T."
+    )
+
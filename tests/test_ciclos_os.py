@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ciclos_os
+
+
+def gerar_os(n=5_000, semente=3):
+    rng = np.random.default_rng(semente)
+    abertura = pd.Series(
+        pd.Timestamp("2025-01-01")
+        + pd.to_timedelta(rng.integers(0, 60 * 86400, n), unit="s")
+    )
+    atribuicao = abertura + pd.to_timedelta(rng.exponential(86400, n).round(), unit="s")
+    limite = abertura + pd.to_timedelta(rng.integers(0, 3 * 86400, n), unit="s")
+    atribuicao[rng.random(n) < 0.05] = pd.NaT
+    limite[rng.random(n) < 0.05] = pd.NaT
+    abertura[rng.random(n) < 0.01] = pd.NaT
+    base = pd.Series(rng.choice(["A", "B", "C"], n), dtype=object)
+    base[rng.random(n) < 0.02] = None
+    return pd.DataFrame({
+        "DATA_ABERTURA_OS": abertura,
+        "DATA_ATRIBUICAO_OS": atribuicao,
+        "DATA_LIMITE_OS": limite,
+        "base": base,
+        "sigla": rng.choice(["X", "Y"], n),
+    })
+
+
+def test_filtrar_ciclos_igual_a_reconstruir():
+    df = gerar_os()
+    indice = ciclos_os.indice_ciclos(df, ["base", "sigla"])
+    selecoes = {"base": ["A", "C"], "sigla": ["Y"]}
+
+    filtrado = ciclos_os.filtrar_ciclos(indice, selecoes)
+    linhas = df["base"].isin(selecoes["base"]) & df["sigla"].isin(selecoes["sigla"])
+    reconstruido = ciclos_os.indice_ciclos(df[linhas])
+
+    assert filtrado["periodo"] == reconstruido["periodo"]
+    pd.testing.assert_frame_equal(
+        ciclos_os.serie_ciclos(filtrado, "6h"), ciclos_os.serie_ciclos(reconstruido, "6h")
+    )
+
+
+def test_filtrar_ciclos_sem_selecao_mantem_tudo():
+    df = gerar_os()
+    indice = ciclos_os.indice_ciclos(df, ["base"])
+    pd.testing.assert_frame_equal(
+        ciclos_os.serie_ciclos(ciclos_os.filtrar_ciclos(indice, {"base": None}), "1D"),
+        ciclos_os.serie_ciclos(ciclos_os.indice_ciclos(df), "1D"),
+    )
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import distribuicao_minutos
+
+
+def test_rotulos_padrao():
+    assert distribuicao_minutos.rotular_faixas([0, 30, 60, 90]) == [
+        "Após fim do turno", "<30m", "30m-1h", "1h-1h30", "≥1h30",
+    ]
+
+
+def test_limite_entra_na_faixa_seguinte():
+    # 30 e 90 caem em "30m-1h" e "≥1h30", como os rótulos indicam
+    vetores = [np.array([-1, 30, 90], dtype=np.float32)]
+    contagem = distribuicao_minutos.contar_faixas(vetores, [0, 30, 60, 90])
+    assert contagem.tolist() == [1, 0, 1, 0, 1]
+
+
+def test_rotulos_com_limites_negativos():
+    rotulos = distribuicao_minutos.rotular_faixas([-90, -30, 0, 60])
+    assert rotulos == ["<-1h30", "-1h30 a -30m", "-30m a 0m", "0m-1h", "≥1h"]
+    assert len(rotulos) == 5
+
+
+def test_duracao_negativa():
+    assert distribuicao_minutos.formatar_duracao(-90) == "-1h30"
+    assert distribuicao_minutos.formatar_duracao(-120) == "-2h"
+    assert distribuicao_minutos.formatar_duracao(-5) == "-5m"
+
+
+@pytest.mark.parametrize("limites", [[], [30, 0], [0, 30, 30]])
+def test_limites_invalidos(limites):
+    with pytest.raises(ValueError):
+        distribuicao_minutos.rotular_faixas(limites)
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filas
+
+
+def os_backlog():
+    return pd.DataFrame({
+        "CIDADE": ["A", "A", "A", "A"],
+        "CRIACAO_TS": pd.to_datetime([
+            "2025-01-01 08:00", "2025-01-01 09:00", "2025-01-01 10:00", None,
+        ]),
+        # a segunda ainda não foi atribuída; a terceira foi, mas não iniciou
+        "ATRIBUICAO_TS": pd.to_datetime([
+            "2025-01-01 08:30", None, "2025-01-01 10:30", "2025-01-01 11:00",
+        ]),
+        "INICIO_TS": pd.to_datetime([
+            "2025-01-01 09:00", None, None, "2025-01-01 11:30",
+        ]),
+    })
+
+
+def test_os_sem_atribuicao_segue_aguardando_coi():
+    eventos = filas.eventos_backlog(os_backlog())["A"]
+    backlog = filas.backlog_em(eventos, pd.to_datetime([
+        "2025-01-01 08:15", "2025-01-01 09:30", "2025-01-02 00:00",
+    ]))
+    assert backlog["aguardando_coi"].tolist() == [1, 1, 1]
+    assert backlog["aguardando_campo"].tolist() == [0, 0, 1]
+
+
+def test_os_sem_criacao_entra_direto_na_fila_de_campo():
+    eventos = filas.eventos_backlog(os_backlog())["A"]
+    backlog = filas.backlog_em(eventos, pd.to_datetime(["2025-01-01 11:15"]))
+    assert backlog["aguardando_coi"].tolist() == [1]
+    assert backlog["aguardando_campo"].tolist() == [2]
+
+
+def test_os_sem_nenhuma_data_fica_de_fora():
+    df = pd.DataFrame({
+        "CIDADE": ["A"],
+        "CRIACAO_TS": pd.to_datetime([None]),
+        "ATRIBUICAO_TS": pd.to_datetime([None]),
+        "INICIO_TS": pd.to_datetime([None]),
+    })
+    assert filas.eventos_backlog(df) == {}
+
+
+def test_cubo_normaliza_inicios_pelas_datas_de_inicio():
+    # duas segundas de atribuição; os inícios caem em uma única terça
+    atribuicao = pd.to_datetime(["2025-01-06 23:00", "2025-01-13 10:00"])
+    inicio = pd.to_datetime(["2025-01-07 01:00", "2025-01-14 01:00"])
+    df = pd.DataFrame({
+        "CIDADE": "A",
+        "ATRIBUICAO_TS": atribuicao,
+        "INICIO_TS": inicio,
+        "data": atribuicao.normalize(),
+        "hora_dia": atribuicao.hour,
+        "hora_ini_dia": inicio.hour,
+        "fila_min": (inicio - atribuicao).total_seconds() / 60,
+    })
+    cubo = filas.cubo_semana_hora(df).loc["A"]
+    # segunda: 2 datas de atribuição; terça: 2 datas de início
+    assert cubo.loc[(0, 23), "atribuicoes_dia"] == 0.5
+    assert cubo.loc[(1, 1), "inicios_dia"] == 1.0
+    assert cubo["inicios_dia"].fillna(0).sum() == 1.0
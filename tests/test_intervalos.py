@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import intervalos
+
+
+def atividades_encadeadas(n_grupos, por_grupo=3):
+    # cada atividade começa exatamente no fim da anterior, com segundos
+    # quebrados e grupos espalhados no tempo (o caso que perdia precisão)
+    linhas = []
+    for grupo in range(n_grupos):
+        instante = pd.Timestamp("2025-01-01 08:00") + pd.Timedelta(days=grupo, seconds=37 * grupo)
+        for _ in range(por_grupo):
+            fim = instante + pd.Timedelta(minutes=47, seconds=13)
+            linhas.append((grupo, instante, fim))
+            instante = fim
+    return pd.DataFrame(linhas, columns=["equipe", "inicio", "fim"])
+
+
+def test_atividades_encadeadas_nao_se_sobrepoem():
+    for n_grupos in (25, 9_000):
+        df = atividades_encadeadas(n_grupos)
+        resumo, linha = intervalos.varrer_intervalos(df, ["equipe"], "inicio", "fim")
+
+        assert not linha["sobreposicao"].any()
+        assert (resumo["sobreposicao_min"] == 0).all()
+        assert (resumo["concorrencia_max"] == 1).all()
+        assert (resumo["ociosidade_entre_atividades_min"] == 0).all()
+
+        seguintes = linha["fim_anterior"].notna()
+        assert seguintes.sum() == n_grupos * 2
+        assert (linha.loc[seguintes, "fim_anterior"] == df.loc[seguintes, "inicio"]).all()
+        assert (linha.loc[seguintes, "intervalo_entre_atividades_min"] == 0).all()
+
+
+def test_sobreposicao_e_lacuna_exatas():
+    df = pd.DataFrame({
+        "equipe": ["A", "A", "A", "B", "B"],
+        "inicio": pd.to_datetime([
+            "2025-01-01 08:00", "2025-01-01 08:30", "2025-01-01 10:00",
+            "2025-01-01 08:00", "2025-01-01 09:00",
+        ]),
+        "fim": pd.to_datetime([
+            "2025-01-01 09:00", "2025-01-01 09:30", "2025-01-01 10:15",
+            "2025-01-01 09:00", "2025-01-01 09:10",
+        ]),
+    })
+    resumo, linha = intervalos.varrer_intervalos(df, ["equipe"], "inicio", "fim")
+    resumo = resumo.set_index("equipe")
+
+    assert resumo.loc["A", "cobertura_min"] == 105
+    assert resumo.loc["A", "sobreposicao_min"] == 30
+    assert resumo.loc["A", "ociosidade_entre_atividades_min"] == 30
+    assert resumo.loc["A", "concorrencia_max"] == 2
+    assert resumo.loc["B", "sobreposicao_min"] == 0
+    assert linha["sobreposicao"].tolist() == [False, True, False, False, False]
+    assert np.isnan(linha.loc[0, "intervalo_entre_atividades_min"])
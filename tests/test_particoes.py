@@ -0,0 +1,46 @@
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import particoes
+
+
+def gravar_origem(caminho, estados):
+    pd.DataFrame({
+        "estado": estados,
+        "regional": ["007"] * len(estados),
+        "base": ["B1"] * len(estados),
+        "DATA_ABERTURA_OS": ["02/03/2025 08:00"] * len(estados),
+        "DATA_ATRIBUICAO_OS": ["02/03/2025 09:00"] * len(estados),
+        "DATA_LIMITE_OS": ["03/03/2025 09:00"] * len(estados),
+    }).to_parquet(caminho, index=False)
+
+
+def test_codigos_numericos_voltam_como_texto(tmp_path):
+    origem, destino = tmp_path / "origem.parquet", tmp_path / "dataset"
+    gravar_origem(origem, ["01", "01", "22"])
+    dataset = particoes.garantir(origem, destino)
+
+    chaves = particoes.chaves_particao(dataset).sort_values("estado", ignore_index=True)
+    assert chaves["estado"].tolist() == ["01", "22"]
+    assert chaves["regional"].tolist() == ["007", "007"]
+    assert chaves["mes"].tolist() == ["2025-03", "2025-03"]
+
+    lidas = particoes.ler(dataset, {"estado": ["01"], "regional": ["007"]}, ["estado", "base"])
+    assert lidas["estado"].tolist() == ["01", "01"]
+
+
+def test_garantir_refaz_quando_a_origem_muda(tmp_path):
+    origem, destino = tmp_path / "origem.parquet", tmp_path / "dataset"
+    gravar_origem(origem, ["01", "22"])
+    particoes.garantir(origem, destino)
+
+    gravar_origem(origem, ["22"])
+    # mtime diferente mesmo em sistemas de arquivos com resolução grossa
+    os.utime(origem, ns=(0, os.stat(origem).st_mtime_ns + 10**9))
+    dataset = particoes.garantir(origem, destino)
+    assert particoes.chaves_particao(dataset)["estado"].tolist() == ["22"]
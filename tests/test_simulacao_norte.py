@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "benchmarks"))
+
+import simulacao_norte
+from dados_sinteticos import gerar_operacao
+
+
+def sem_variancia(df):
+    # uma única duração por (cidade, grupo, tipo): todo sorteio devolve a do modelo
+    df = df.copy()
+    df["duracao_modelo_min"] = df.groupby(simulacao_norte.CHAVES_DURACAO)[
+        "duracao_modelo_min"
+    ].transform("first")
+    df["duracao_valida_min"] = df["duracao_modelo_min"]
+    return df
+
+
+def test_monte_carlo_sem_variancia_reproduz_gulosa():
+    df = sem_variancia(gerar_operacao(cidades=8, dias=30, atividades_por_dia=9))
+    _, redistribuicao, _ = simulacao_norte.simular_redistribuicao(df)
+    gulosa = simulacao_norte.resumir_redistribuicao(redistribuicao)
+
+    ensaios = simulacao_norte.simular_monte_carlo(df, ensaios=5)
+    assert (ensaios["os_absorvidas"] == gulosa["os_absorvidas"]).all()
+    assert (ensaios["os_nao_absorvidas"] == gulosa["os_nao_absorvidas"]).all()
+    np.testing.assert_allclose(ensaios["receita_em_risco"], gulosa["receita_em_risco"])
+    np.testing.assert_allclose(
+        ensaios["horas_nao_absorvidas"], gulosa["horas_extras_necessarias"]
+    )
+
+
+def test_monte_carlo_duracao_fixa_reproduz_gulosa():
+    df = gerar_operacao(cidades=8, dias=30, atividades_por_dia=9)
+    _, redistribuicao, _ = simulacao_norte.simular_redistribuicao(df)
+    gulosa = simulacao_norte.resumir_redistribuicao(redistribuicao)
+
+    fixa = simulacao_norte.simular_monte_carlo(df, ensaios=100, sortear=False)
+    assert len(fixa) == 1
+    assert fixa["os_absorvidas"].iloc[0] == gulosa["os_absorvidas"]
+    assert fixa["taxa_absorcao"].iloc[0] == gulosa["taxa_absorcao"]
+
+
+def test_monte_carlo_equipe_dia_com_flags_diferentes():
+    # a mesma equipe-dia dividida pela flag 12h tem uma capacidade só
+    df = gerar_operacao(cidades=3, dias=10, atividades_por_dia=9)
+    mantida = df["desmobilizar"].eq(0)
+    metade = mantida & (df.groupby(["equipe", "data_turno"]).cumcount() % 2 == 1)
+    df.loc[metade, "12h"] = 1 - df.loc[metade, "12h"]
+
+    _, redistribuicao, _ = simulacao_norte.simular_redistribuicao(df)
+    gulosa = simulacao_norte.resumir_redistribuicao(redistribuicao)
+    fixa = simulacao_norte.simular_monte_carlo(df, sortear=False)
+    assert fixa["os_absorvidas"].iloc[0] == gulosa["os_absorvidas"]
+
+
+def test_empacotamento_sem_busca_nunca_absorve_menos_que_gulosa():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        n = int(rng.integers(1, 6))
+        equipes = [f"E{i}" for i in range(n)]
+        capacidades = rng.integers(60, 480, n).astype(float)
+        cargas = np.minimum(rng.integers(0, 400, n), capacidades).astype(float)
+        duracoes = rng.integers(10, 240, int(rng.integers(1, 15))).astype(float)
+
+        gulosa, _ = simulacao_norte.simular_particao(equipes, cargas, capacidades, duracoes)
+        for modo in ["ffd", "bfd"]:
+            destinos, _ = simulacao_norte.empacotar_particao(
+                equipes, cargas, capacidades, duracoes, modo=modo, orcamento_s=0
+            )
+            assert sum(d >= 0 for d in destinos) >= sum(d >= 0 for d in gulosa)
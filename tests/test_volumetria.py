@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import volumetria
+
+
+def test_equipes_referencia_media_da_janela():
+    df = pd.DataFrame({
+        "regional_nome": ["A"] * 5 + ["B"] * 2,
+        "cidade": ["x"] * 5 + ["y"] * 2,
+        "mes": [1, 2, 3, 4, 5, 4, 5],
+        "qtd_equipe": [1, 2, 3, 4, 5, 10, 20],
+    })
+    equipes = volumetria.equipes_mensais(df)
+
+    abril = volumetria.equipes_referencia(equipes, 4, 1).set_index("cidade")
+    assert abril["qtd_equipe_atual"].to_dict() == {"x": 4, "y": 10}
+
+    # meses sem registro ficam fora da média, não contam como zero
+    trimestre = volumetria.equipes_referencia(equipes, 4, 3).set_index("cidade")
+    assert trimestre["qtd_equipe_atual"].to_dict() == {"x": 3, "y": 10}
+
+    janeiro = volumetria.equipes_referencia(equipes, 1, 1).set_index("cidade")
+    assert np.isnan(janeiro.loc["y", "qtd_equipe_atual"])
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+import distribuicao_minutos
+
+
+# =========================
+# EQUIPES POR MÊS
+# =========================
+MESES_ANO = list(range(1, 13))
+
+
+def equipes_mensais(df):
+    serie = (
+        df
+        .pivot_table(
+            index=["regional_nome", "cidade"],
+            columns="mes",
+            values="qtd_equipe",
+            aggfunc="mean"
+        )
+        .reindex(columns=MESES_ANO)
+    )
+
+    # somas acumuladas por mês (coluna 0 = antes de janeiro)
+    valores = serie.to_numpy(dtype=float)
+    zeros = np.zeros((len(serie), 1))
+    soma_acum = np.hstack([zeros, np.nancumsum(valores, axis=1)])
+    meses_acum = np.hstack([zeros, np.cumsum(~np.isnan(valores), axis=1)])
+
+    return serie.index, soma_acum, meses_acum
+
+
+def equipes_referencia(equipes, mes_ref, janela):
+    # média das equipes nos `janela` meses até mes_ref: diferença de duas
+    # colunas acumuladas
+    indice, soma_acum, meses_acum = equipes
+
+    inicio = max(mes_ref - janela, 0)
+    soma = soma_acum[:, mes_ref] - soma_acum[:, inicio]
+    meses = meses_acum[:, mes_ref] - meses_acum[:, inicio]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(meses > 0, soma / meses, np.nan)
+
+    return pd.DataFrame(
+        {"qtd_equipe_atual": media},
+        index=indice
+    ).reset_index()
+
+
+# =========================
+# HISTOGRAMA DE ATRIBUIÇÕES
+# =========================
+# histograma em minutos: um vetor ordenado por combinação destas chaves
+CHAVES_HISTOGRAMA = ["regional_id", "mes", "base", "cidade", "processo", "tipo_os"]
+
+FAIXAS_HISTOGRAMA_PADRAO = "0, 30, 60, 120, 180, 240"
+
+# atribuições com menos de 1h até o fim do turno
+LIMITE_CRITICO_MIN = 60
+
+
+def ler_histograma(arquivo):
+    df = pd.read_excel(arquivo)
+
+    df.columns = (
+        df.columns
+        .str.lower()
+        .str.strip()
+        .str.replace(" ", "_", regex=False)
+    )
+
+    for col in ["mes", "regional_id", "atribuicoes"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    # base em minutos (uma linha por atribuição) permite refazer as faixas
+    if "minutos_restantes" in df.columns:
+        df["minutos_restantes"] = pd.to_numeric(df["minutos_restantes"], errors="coerce")
+        return distribuicao_minutos.indexar_minutos(
+            df,
+            CHAVES_HISTOGRAMA,
+            "minutos_restantes"
+        )
+
+    return df, None
+
+
+def resumir_histograma(vetores, limites):
+    # contagem por faixa, ordem de exibição (maior tempo restante primeiro)
+    # e indicadores: após o fim do turno, críticas, p50 e p90
+    rotulos = distribuicao_minutos.rotular_faixas(limites)
+    resumo = pd.DataFrame({
+        "faixa_tempo_restante": rotulos,
+        "atribuicoes": distribuicao_minutos.contar_faixas(vetores, limites)
+    })
+
+    pos_turno = distribuicao_minutos.contar_abaixo(vetores, 0)
+    criticas = distribuicao_minutos.contar_abaixo(vetores, LIMITE_CRITICO_MIN)
+    p50, p90 = distribuicao_minutos.percentis(vetores, [50, 90])
+
+    return resumo, rotulos[::-1], (pos_turno, criticas, p50, p90)